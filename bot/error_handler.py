@@ -3,10 +3,16 @@ from telegram.ext import ContextTypes
 from utils.logger import logger
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-    logger.error("Exception while handling an update:", exc_info=context.error)
-
-    if update:
-        logger.error(f"Error in update: {update}")
+    if isinstance(update, Update):
+        logger.error(
+            "Exception while handling update %s (user %s, data %r)",
+            update.update_id,
+            update.effective_user.id if update.effective_user else None,
+            update.callback_query.data if update.callback_query else None,
+            exc_info=context.error
+        )
+    else:
+        logger.error("Exception while handling an update:", exc_info=context.error)
 
     if update and isinstance(update, Update) and update.effective_chat:
         try:
@@ -23,4 +29,4 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
                 parse_mode="Markdown"
             )
         except Exception as e:
-            logger.error(f"Error while sending error message: {e}")
\ No newline at end of file
+            logger.error("Error while sending error message: %s", e)
\ No newline at end of file
@@ -5,17 +5,51 @@ from telegram.ext import (
     CommandHandler,
     CallbackQueryHandler,
     MessageHandler,
+    InlineQueryHandler,
     filters
 )
 from bot.error_handler import error_handler
-from handlers.commands import start, shutdown, show_current_context, show_menu
+from bot.webhook import run_webhook, delete_webhook
+from bot.update_processor import PerUserUpdateProcessor
+from bot.rate_limiter import OutboundRateLimiter
+from bot.monitoring import start_monitoring
+from handlers.commands import start, shutdown, show_current_context, show_menu, show_traces, \
+    profile_command, memprofile_command
 from handlers.buttons import button_handler
 from handlers.messages import handle_message
+from handlers.search import inline_search, log_command
+from handlers.pickers import close_picker_on_command
 from utils import CLICKUP_API_TOKEN
-from utils.config import TELEGRAM_BOT_TOKEN
+from utils.config import (
+    TELEGRAM_BOT_TOKEN,
+    CONVERSATION_FLUSH_INTERVAL,
+    STATE_SYNC_INTERVAL,
+    SPRINT_SYNC_TICK,
+    BOT_MODE,
+    WEBHOOK_DELETE_ON_STOP,
+    MAX_CONCURRENT_UPDATES,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_GROUP_RATE,
+    TELEGRAM_MAX_RETRIES
+)
 from utils.logger import logger
-from services.tasks import auto_save_task
-from services.user_manager import save_user_data_if_dirty, load_initial_user_data, set_application
+from services.tasks import (
+    auto_save_task,
+    conversation_flush_task,
+    state_sync_task,
+    state_maintenance_task,
+    sprint_sync_task
+)
+from services.state_backend import state_backend
+from services.user_manager import (
+    save_user_data_if_dirty,
+    load_initial_user_data,
+    set_application,
+    flush_conversation_state,
+    restore_conversation_state
+)
 from services.database import init_db
 
 
@@ -32,14 +66,34 @@ def main() -> None:
     init_db()
     logger.info("База данных инициализирована")
 
-    user_data = load_initial_user_data()
-    logger.info(f"Загружены данные для {len(user_data)} пользователей")
+    state_backend.init()
+
+    user_count = load_initial_user_data()
+    logger.info(f"Найдены сохранённые контексты для {user_count} пользователей")
+
+    restored = restore_conversation_state()
+    logger.info(f"Восстановлено {restored} незавершённых диалогов")
 
     try:
-        application = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+        builder = (
+            ApplicationBuilder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .concurrent_updates(PerUserUpdateProcessor(MAX_CONCURRENT_UPDATES))
+            .rate_limiter(OutboundRateLimiter(
+                global_per_second=TELEGRAM_GLOBAL_RATE,
+                chat_per_second=TELEGRAM_CHAT_RATE,
+                chat_burst=TELEGRAM_CHAT_BURST,
+                group_per_minute=TELEGRAM_GROUP_RATE,
+                max_retries=TELEGRAM_MAX_RETRIES
+            ))
+            .post_init(start_monitoring)
+        )
+        if BOT_MODE == "webhook" and WEBHOOK_DELETE_ON_STOP:
+            builder = builder.post_stop(delete_webhook)
+        application = builder.build()
         logger.info("Приложение Telegram создано")
     except Exception as e:
-        logger.error(f"Ошибка создания приложения: {e}")
+        logger.error("Ошибка создания приложения: %s", e)
         return
 
     set_application(application)
@@ -48,10 +102,16 @@ def main() -> None:
         CommandHandler("shutdown", shutdown),
         CommandHandler("context", show_current_context),
         CommandHandler("menu", show_menu),
+        CommandHandler("log", log_command),
+        CommandHandler("traces", show_traces),
+        CommandHandler("profile", profile_command),
+        CommandHandler("memprofile", memprofile_command),
         CallbackQueryHandler(button_handler),
+        InlineQueryHandler(inline_search),
         MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message)
     ]
     application.add_handlers(handlers)
+    application.add_handler(MessageHandler(filters.COMMAND, close_picker_on_command), group=-1)
     logger.info(f"Зарегистрировано {len(handlers)} обработчиков")
 
     application.job_queue.run_repeating(
@@ -59,6 +119,27 @@ def main() -> None:
         interval=300,
         first=10
     )
+    application.job_queue.run_repeating(
+        callback=conversation_flush_task,
+        interval=CONVERSATION_FLUSH_INTERVAL,
+        first=CONVERSATION_FLUSH_INTERVAL
+    )
+    application.job_queue.run_repeating(
+        callback=state_maintenance_task,
+        interval=600,
+        first=60
+    )
+    application.job_queue.run_repeating(
+        callback=sprint_sync_task,
+        interval=SPRINT_SYNC_TICK,
+        first=SPRINT_SYNC_TICK
+    )
+    if state_backend.shared:
+        application.job_queue.run_repeating(
+            callback=state_sync_task,
+            interval=STATE_SYNC_INTERVAL,
+            first=STATE_SYNC_INTERVAL
+        )
     logger.info("Фоновая задача автосохранения запущена")
 
     application.add_error_handler(error_handler)
@@ -67,6 +148,7 @@ def main() -> None:
     def signal_handler(signum, frame):
         logger.info(f"Получен сигнал {signum}, инициирую выключение...")
         save_user_data_if_dirty()
+        flush_conversation_state()
         asyncio.create_task(application.stop())
 
     signal.signal(signal.SIGINT, signal_handler)
@@ -74,11 +156,14 @@ def main() -> None:
     logger.info("Обработчики сигналов настроены")
 
     try:
-        logger.info("Запуск бота...")
-        application.run_polling()
+        logger.info(f"Запуск бота в режиме {BOT_MODE}...")
+        if BOT_MODE == "webhook":
+            run_webhook(application)
+        else:
+            application.run_polling()
         logger.info("Бот успешно остановлен")
     except Exception as e:
-        logger.exception(f"Критическая ошибка: {e}")
+        logger.exception("Критическая ошибка: %s", e)
     finally:
         logger.info("Работа бота завершена")
 
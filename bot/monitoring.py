@@ -0,0 +1,41 @@
+import asyncio
+from telegram.ext import Application
+from handlers.background import running_jobs
+from services import clickup
+from services.user_manager import user_data, dirty_users, user_logging_state
+from utils.config import METRICS_HOST, METRICS_PORT
+from utils.logger import logger, log_queue_handler
+from utils.metrics import Gauge, monitor_event_loop_lag, start_metrics_server
+
+monitoring_tasks = set()
+
+
+def register_gauges(application: Application) -> None:
+    update_processor = application.update_processor
+    rate_limiter = application.bot.rate_limiter
+
+    Gauge("bot_active_users", "User contexts loaded in memory", lambda: len(user_data))
+    Gauge("bot_dirty_users", "User contexts waiting to be saved", lambda: len(dirty_users))
+    Gauge("bot_conversation_states", "Unfinished conversations", lambda: len(user_logging_state))
+    Gauge("bot_background_jobs", "Running background jobs", lambda: len(running_jobs))
+    Gauge("log_records_dropped", "Log records dropped because the log queue was full", lambda: log_queue_handler.dropped)
+    Gauge("clickup_cache_entries", "Entries in the ClickUp response cache", lambda: len(clickup.cache))
+    Gauge(
+        "bot_update_queue_depth",
+        "Updates waiting for or holding a per-user slot",
+        lambda: getattr(update_processor, "total_pending", 0)
+    )
+    if rate_limiter is not None:
+        Gauge("telegram_edits_coalesced", "Superseded message edits dropped", lambda: rate_limiter.coalesced)
+        Gauge("telegram_requests_retried", "Requests retried after RetryAfter", lambda: rate_limiter.retried)
+
+
+async def start_monitoring(application: Application) -> None:
+    register_gauges(application)
+    monitoring_tasks.add(asyncio.create_task(monitor_event_loop_lag()))
+
+    if METRICS_PORT:
+        try:
+            monitoring_tasks.add(await start_metrics_server(METRICS_HOST, METRICS_PORT))
+        except OSError as e:
+            logger.error("Не удалось запустить сервер метрик: %s", e)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+from cachetools import TTLCache
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+from utils.logger import logger
+from utils.tracing import span
+
+JSONResult = Union[bool, Dict[str, Any], List[Dict[str, Any]]]
+
+COALESCED_ENDPOINTS = {"editMessageText", "editMessageReplyMarkup"}
+
+
+class SlidingWindowLimiter:
+    def __init__(self, limit: int, period: float) -> None:
+        self.limit = limit
+        self.period = period
+        self.calls = deque()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= self.period:
+                    self.calls.popleft()
+                if len(self.calls) < self.limit:
+                    self.calls.append(now)
+                    return now
+                await asyncio.sleep(self.period - (now - self.calls[0]))
+
+    def refund(self, reserved: float) -> None:
+        try:
+            self.calls.remove(reserved)
+        except ValueError:
+            pass
+
+
+class OutboundRateLimiter(BaseRateLimiter[int]):
+    def __init__(
+        self,
+        global_per_second: int = 30,
+        chat_per_second: int = 1,
+        chat_burst: int = 3,
+        group_per_minute: int = 20,
+        max_retries: int = 3
+    ) -> None:
+        self.global_limiter = SlidingWindowLimiter(global_per_second, 1.0)
+        self.chat_per_second = chat_per_second
+        self.chat_burst = max(chat_burst, chat_per_second)
+        self.group_per_minute = group_per_minute
+        self.max_retries = max_retries
+        self.chat_limiters = TTLCache(maxsize=10000, ttl=120)
+        self.edit_generations = TTLCache(maxsize=10000, ttl=300)
+        self.retry_after_event = asyncio.Event()
+        self.retry_after_event.set()
+        self.coalesced = 0
+        self.retried = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def chat_limiter(self, chat_id: Union[int, str]) -> SlidingWindowLimiter:
+        limiter = self.chat_limiters.get(chat_id)
+        if limiter is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            if is_group:
+                limiter = SlidingWindowLimiter(self.group_per_minute, 60.0)
+            else:
+                # A handler usually edits and then sends, so short bursts are allowed at the same average rate.
+                limiter = SlidingWindowLimiter(self.chat_burst, self.chat_burst / self.chat_per_second)
+        self.chat_limiters[chat_id] = limiter
+        return limiter
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, JSONResult]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int]
+    ) -> JSONResult:
+        max_retries = rate_limit_args if rate_limit_args is not None else self.max_retries
+        chat_id = data.get("chat_id")
+        message_id = data.get("message_id")
+
+        if isinstance(chat_id, str) and chat_id.lstrip("-").isdigit():
+            chat_id = int(chat_id)
+
+        message_key = None
+        generation = 0
+        if endpoint in COALESCED_ENDPOINTS and chat_id is not None and message_id is not None:
+            message_key = (chat_id, message_id)
+            generation = self.edit_generations.get(message_key, 0) + 1
+            self.edit_generations[message_key] = generation
+
+        coalescible = message_key is not None
+
+        for attempt in range(max_retries + 1):
+            await self.retry_after_event.wait()
+            chat_limiter = None
+            reserved = 0.0
+            if chat_id is not None:
+                chat_limiter = self.chat_limiter(chat_id)
+                reserved = await chat_limiter.acquire()
+
+            if coalescible and self.edit_generations.get(message_key, generation) != generation:
+                if chat_limiter:
+                    chat_limiter.refund(reserved)
+                self.coalesced += 1
+                return True
+
+            await self.global_limiter.acquire()
+
+            try:
+                with span(f"telegram.{endpoint}", attempt=attempt):
+                    return await callback(*args, **kwargs)
+            except RetryAfter as exc:
+                if attempt == max_retries:
+                    logger.error("Rate limit hit on %s after %s retries", endpoint, max_retries)
+                    raise
+
+                self.retried += 1
+                delay = float(exc.retry_after if isinstance(exc.retry_after, (int, float))
+                              else exc.retry_after.total_seconds()) + 0.1
+                logger.warning("Rate limit hit on %s, retrying in %.1fs", endpoint, delay)
+                self.retry_after_event.clear()
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self.retry_after_event.set()
+
+        return True
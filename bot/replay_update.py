@@ -0,0 +1,37 @@
+import argparse
+import json
+import time
+import httpx
+from utils.config import WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET
+
+
+def load_updates(path: str) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read().strip()
+
+    if content.startswith("["):
+        return json.loads(content)
+    if content.startswith("{") and "\n{" not in content:
+        return [json.loads(content)]
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="POST recorded Telegram updates to the local webhook")
+    parser.add_argument("path", help="JSON file with one update, a list of updates or JSON lines")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}/{WEBHOOK_PATH.strip('/')}")
+    parser.add_argument("--secret", default=WEBHOOK_SECRET)
+    args = parser.parse_args()
+
+    headers = {"X-Telegram-Bot-Api-Secret-Token": args.secret} if args.secret else {}
+
+    with httpx.Client(timeout=10.0) as client:
+        for update in load_updates(args.path):
+            started = time.perf_counter()
+            response = client.post(args.url, json=update, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"update {update.get('update_id')}: {response.status_code} in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Hashable, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from utils.tracing import start_trace
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_concurrent_updates: int) -> None:
+        super().__init__(max_concurrent_updates=max_concurrent_updates)
+        self._key_locks: Dict[Hashable, asyncio.Lock] = {}
+        self._pending: Dict[Hashable, int] = {}
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        # The base implementation takes a concurrency slot before do_process_update, so updates
+        # waiting for their user's turn would hold slots. The slot is taken after the user lock.
+        await self.do_process_update(update, coroutine)
+
+    @staticmethod
+    def update_key(update: object) -> Optional[Hashable]:
+        if isinstance(update, Update):
+            if update.effective_user:
+                return "user", update.effective_user.id
+            if update.effective_chat:
+                return "chat", update.effective_chat.id
+        return None
+
+    @staticmethod
+    def trace_attributes(update: object) -> Dict[str, Any]:
+        if not isinstance(update, Update):
+            return {}
+        attributes: Dict[str, Any] = {"update_id": update.update_id}
+        if update.effective_user:
+            attributes["user_id"] = update.effective_user.id
+        if update.callback_query:
+            attributes["callback_data"] = update.callback_query.data
+        elif update.inline_query:
+            attributes["inline_query_length"] = len(update.inline_query.query)
+        elif update.message and update.message.text:
+            text = update.message.text
+            if text.startswith("/"):
+                attributes["command"] = text.split()[0]
+            else:
+                attributes["message_length"] = len(text)
+        return attributes
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.update_key(update)
+        with start_trace("update", **self.trace_attributes(update)) as trace:
+            if key is None:
+                async with self._semaphore:
+                    await coroutine
+                return
+
+            lock = self._key_locks.setdefault(key, asyncio.Lock())
+            self._pending[key] = self._pending.get(key, 0) + 1
+            queued_at = time.perf_counter()
+            try:
+                async with lock:
+                    async with self._semaphore:
+                        trace.set(queue_wait_ms=round((time.perf_counter() - queued_at) * 1000, 2))
+                        await coroutine
+            finally:
+                self._pending[key] -= 1
+                if not self._pending[key]:
+                    del self._pending[key]
+                    del self._key_locks[key]
+
+    def queue_depths(self) -> Dict[Hashable, int]:
+        return dict(self._pending)
+
+    @property
+    def total_pending(self) -> int:
+        return sum(self._pending.values())
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -0,0 +1,43 @@
+from telegram import Update
+from telegram.ext import Application
+from utils.config import (
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_MAX_CONNECTIONS
+)
+from utils.logger import logger
+
+
+def get_webhook_url() -> str:
+    return f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH.strip('/')}"
+
+
+async def delete_webhook(application: Application) -> None:
+    try:
+        await application.bot.delete_webhook()
+        logger.info("Webhook удалён")
+    except Exception as e:
+        logger.error("Ошибка удаления webhook: %s", e)
+
+
+def run_webhook(application: Application) -> None:
+    if not WEBHOOK_URL:
+        logger.error("WEBHOOK_URL не задан, webhook режим невозможен")
+        return
+
+    if not WEBHOOK_SECRET:
+        logger.warning("WEBHOOK_SECRET не задан, входящие запросы не проверяются")
+
+    logger.info(f"Запуск webhook на {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH.strip('/')}")
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=WEBHOOK_PATH.strip('/'),
+        webhook_url=get_webhook_url(),
+        secret_token=WEBHOOK_SECRET or None,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+        allowed_updates=Update.ALL_TYPES
+    )
@@ -0,0 +1,85 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import ContextTypes
+from utils.config import MAX_BACKGROUND_JOBS
+from utils.logger import logger
+from utils.tracing import start_trace
+from handlers.router import callback_data
+
+JobKey = Tuple[int, str]
+Job = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]
+
+USER_CANCEL = "cancelled by user"
+
+running_jobs: Dict[JobKey, asyncio.Task] = {}
+current_job: ContextVar[Optional[JobKey]] = ContextVar("current_job", default=None)
+# Jobs run outside the update processor so that their cancel button stays responsive.
+# They get their own bounded pool and run one at a time per user.
+job_slots = asyncio.Semaphore(MAX_BACKGROUND_JOBS)
+user_job_locks: Dict[int, asyncio.Lock] = {}
+user_job_pending: Dict[int, int] = {}
+
+
+async def run_in_background(update: Update, context: ContextTypes.DEFAULT_TYPE, action: str, job: Job) -> None:
+    query = update.callback_query
+    key = (update.effective_user.id, action)
+
+    task = running_jobs.get(key)
+    if task and not task.done():
+        await query.answer("⏳ Уже выполняется, подождите...")
+        return
+
+    await query.answer()
+    running_jobs[key] = context.application.create_task(
+        _run_job(key, update, context, job),
+        update=update,
+        name=f"job:{key[0]}:{action}"
+    )
+
+
+async def _run_job(key: JobKey, update: Update, context: ContextTypes.DEFAULT_TYPE, job: Job) -> None:
+    user_id = key[0]
+    current_job.set(key)
+    lock = user_job_locks.setdefault(user_id, asyncio.Lock())
+    user_job_pending[user_id] = user_job_pending.get(user_id, 0) + 1
+    try:
+        async with lock, job_slots:
+            with start_trace(f"job.{key[1]}", user_id=user_id):
+                await job(update, context)
+    except asyncio.CancelledError as cancelled:
+        by_user = cancelled.args[:1] == (USER_CANCEL,)
+        logger.info("Job %s of user %s cancelled%s", key[1], user_id, " by user" if by_user else "")
+        try:
+            await update.callback_query.edit_message_text("❌ Операция отменена")
+        except Exception as e:
+            logger.error("Error reporting cancelled job: %s", e)
+        if not by_user:
+            raise
+    finally:
+        user_job_pending[user_id] -= 1
+        if not user_job_pending[user_id]:
+            del user_job_pending[user_id]
+            del user_job_locks[user_id]
+        if running_jobs.get(key) is asyncio.current_task():
+            del running_jobs[key]
+
+
+def cancel_jobs(user_id: int, action: Optional[str] = None) -> int:
+    cancelled = 0
+    for (job_user_id, job_action), task in list(running_jobs.items()):
+        if job_user_id == user_id and (action is None or job_action == action) and not task.done():
+            task.cancel(USER_CANCEL)
+            cancelled += 1
+    return cancelled
+
+
+async def report_progress(update: Update, text: str) -> None:
+    key = current_job.get()
+    reply_markup = None
+    if key:
+        reply_markup = InlineKeyboardMarkup(
+            [[InlineKeyboardButton("✖️ Отменить", callback_data=callback_data("job_cancel", key[1]))]]
+        )
+    await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
@@ -1,137 +1,173 @@
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+import asyncio
+from telegram import Update
 from telegram.ext import ContextTypes
-from services.user_manager import get_user_context, update_user_context, user_logging_state
-from services import clickup, database, get_sprint_tasks_summary, get_all_tasks_in_sprint, cache_task, \
-    get_user_sprint_statistics
-from utils.formatting import format_workspaces, format_sprints, format_members, format_tasks
+from services.user_manager import get_user_context, update_user_context_fields, get_conversation_state, \
+    set_conversation_state, clear_conversation_state
+from services.state_backend import state_backend
+from services.conversation import ConversationState
+from services.task_index import index_sprint_tasks, find_task
+from services.sprint_sync import touch_sprint
+from services.prefetch import prefetch_workspace, prefetch_sprint, prefetch_user_tasks
+from services import clickup, database, get_all_tasks_in_sprint, cache_sprint_tasks
 from utils.logger import logger
+from utils.metrics import timed_handler
 from handlers import show_current_context, show_menu
+from handlers.background import run_in_background, report_progress, cancel_jobs
+from handlers.throttle import apply_throttle
+from handlers.reports import load_report, send_report, show_report_page
+from handlers.pickers import open_picker, page_picker, remember_pick, close_picker
+from handlers.router import register, register_legacy, resolve
 
 
+@timed_handler
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
-    data = query.data
-
-    if data == "change_workspace":
-        await change_workspace(update, context)
-    elif data == "change_sprint":
-        await change_sprint(update, context)
-    elif data == "change_user":
-        await change_user(update, context)
-    elif data == "log_my_time":
-        await log_my_time(update, context)
-    elif data == "show_stats":
-        await show_statistics(update, context)
-    elif data == "show_all_tasks":
-        await show_all_tasks(update, context)
-    elif data == "refresh_tasks":
-        await refresh_tasks(update, context)
-        await show_menu(update, context)
-    elif data == "current_context":
-        await show_current_context(update, context)
-    elif data == "show_menu":
-        await show_menu(update, context)
-    elif data == "show_tasks_without_estimate":
-        await show_tasks_without_estimate(update, context)
-    elif data == "change_task_estimate":
-        await change_task_estimate(update, context)
-
-    elif data.startswith("ws_"):
-        workspace_id = data.split("_", 1)[1]
-        update_user_context(user_id, "current_workspace", workspace_id)
-        update_user_context(user_id, "current_sprint", None)
-        update_user_context(user_id, "current_user", None)
-        update_user_context(user_id, "current_workspace_data", None)
-        update_user_context(user_id, "current_sprint_data", None)
-        update_user_context(user_id, "current_user_name", None)
-        await query.edit_message_text(f"✅ Workspace установлен\n")
-        await show_current_context(update, context)
-
-    elif data.startswith("sprint_"):
-        sprint_id = data.split("_", 1)[1]
-        update_user_context(user_id, "current_sprint", sprint_id)
-        update_user_context(user_id, "current_user", None)
-        update_user_context(user_id, "current_sprint_data", None)
-        update_user_context(user_id, "current_user_name", None)
-        await query.edit_message_text(f"✅ Спринт установлен\n")
-        await show_current_context(update, context)
-
-    elif data.startswith("user_"):
-        parts = data.split("_", 2)
-        user_id_str = parts[1]
-        user_name = parts[2] if len(parts) > 2 else f"User {user_id_str}"
-        update_user_context(user_id, "current_user", user_id_str)
-        update_user_context(user_id, "current_user_name", user_name)
-        await query.edit_message_text(f"✅ Пользователь установлен: {user_name}\n")
-        await show_current_context(update, context)
-
-    elif data.startswith("task_"):
-        task_id = data.split("_", 1)[1]
-        if user_id in user_logging_state:
-            user_logging_state[user_id]["task_id"] = task_id
-
-            task_name = next((t["name"] for t in user_logging_state[user_id]["tasks"]
-                              if t["id"] == task_id), "Задача")
-
-            estimated = next((t["estimated_minutes"] for t in user_logging_state[user_id]["tasks"]
-                              if t["id"] == task_id), "Оценка")
-
-            estimated_hrs = int(estimated) / 60 if estimated else 0
-            logged_minutes = database.get_task_time_for_user(task_id, user_logging_state[user_id]["clickup_user_id"])
-            logged_hours = logged_minutes / 60.0
-
-            await query.edit_message_text(
-                f"Выбрана задача: {task_name}\n\n"
-                f"Оценка задачи (в часах): {estimated_hrs:.1f}\n"
-                f"Залогированное время (в часах): {logged_hours:.1f}\n\n"
-                "Введите время в формате:\n"
-                "• 1.5h - полтора часа\n"
-                "• 90m - 90 минут\n"
-                "• 2h30m - 2 часа 30 минут\n\n"
-                "Или просто число (в минутах): 150"
-            )
 
-    elif data.startswith("estimate_task_"):
-        task_id = data.split('_', 2)[2]
-        await handle_estimate_task(update, context, task_id)
+    resolved = resolve(query.data)
+    if resolved is None:
+        logger.warning("Unknown callback data from user %s: %r", user_id, query.data)
+        await query.answer("⚠️ Неизвестная кнопка")
+        return
+    action, handler, args = resolved
+    if action != "pick":
+        close_picker(user_id)
 
-    elif data == "cancel_estimate":
-        if user_id in user_logging_state:
-            del user_logging_state[user_id]
-        await query.edit_message_text("❌ Изменение оценки отменено")
+    if await apply_throttle(update, action):
+        return
 
-    elif data == "log_cancel":
-        if user_id in user_logging_state:
-            del user_logging_state[user_id]
-        await query.edit_message_text("❌ Логирование времени отменено")
+    context_data = get_user_context(user_id)
+    touch_sprint(context_data.current_sprint, context_data.current_workspace, user_id)
 
+    if handler is None:
+        await query.answer("⌛ Кнопка устарела, откройте меню заново")
+        return
 
-async def change_workspace(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    try:
-        await update.callback_query.edit_message_text("🔄 Загружаю список workspace...")
-        workspaces = await clickup.get_clickup_teams()
+    if action in BACKGROUND_JOBS:
+        await run_in_background(update, context, action, handler)
+        return
 
-        if not workspaces:
-            await update.callback_query.edit_message_text("❌ Не удалось получить список workspace")
-            return
+    await query.answer()
+    await handler(update, context, *args)
+
+
+@timed_handler
+async def select_workspace(update: Update, context: ContextTypes.DEFAULT_TYPE, workspace_id: str) -> None:
+    user_id = update.effective_user.id
+    update_user_context_fields(
+        user_id,
+        current_workspace=workspace_id,
+        current_sprint=None,
+        current_user=None,
+        current_workspace_data=None,
+        current_sprint_data=None,
+        current_user_name=None
+    )
+    remember_pick(user_id, "ws", workspace_id)
+    prefetch_workspace(user_id, workspace_id)
+    await update.callback_query.edit_message_text(f"✅ Workspace установлен\n")
+    await show_current_context(update, context)
+
+
+@timed_handler
+async def select_sprint(update: Update, context: ContextTypes.DEFAULT_TYPE, sprint_id: str) -> None:
+    user_id = update.effective_user.id
+    update_user_context_fields(
+        user_id,
+        current_sprint=sprint_id,
+        current_user=None,
+        current_sprint_data=None,
+        current_user_name=None
+    )
+    remember_pick(user_id, "sprint", sprint_id)
+    touch_sprint(sprint_id, get_user_context(user_id).current_workspace, user_id)
+    prefetch_sprint(user_id, sprint_id)
+    await update.callback_query.edit_message_text(f"✅ Спринт установлен\n")
+    await show_current_context(update, context)
+
+
+@timed_handler
+async def select_user(update: Update, context: ContextTypes.DEFAULT_TYPE, member_id: str) -> None:
+    user_id = update.effective_user.id
+    sprint_id = get_user_context(user_id).current_sprint
+
+    members = await clickup.get_clickup_list_members(sprint_id) if sprint_id else []
+    user_name = next((member.username for member in members if member.id == member_id), f"User {member_id}")
+
+    update_user_context_fields(user_id, current_user=member_id, current_user_name=user_name)
+    remember_pick(user_id, "user", member_id)
+    if sprint_id:
+        prefetch_user_tasks(user_id, sprint_id, member_id)
+    await update.callback_query.edit_message_text(f"✅ Пользователь установлен: {user_name}\n")
+    await show_current_context(update, context)
+
+
+@timed_handler
+async def select_task(update: Update, context: ContextTypes.DEFAULT_TYPE, task_id: str) -> None:
+    user_id = update.effective_user.id
+    state = get_conversation_state(user_id)
+    if not state or state.action != "log_time":
+        await update.callback_query.edit_message_text("⌛ Список устарел, откройте его заново")
+        return
+    if task_id not in state.task_ids:
+        await update.callback_query.edit_message_text("❌ Ошибка: задача не найдена")
+        return
+
+    state.task_id = task_id
+    set_conversation_state(user_id, state)
+    remember_pick(user_id, "task", task_id)
+
+    await update.callback_query.edit_message_text(log_time_prompt(state, task_id))
+
+
+def log_time_prompt(state: ConversationState, task_id: str) -> str:
+    task = find_task(state.sprint_id, task_id)
+    task_name = task.name if task else "Задача"
+    estimated = task.estimated_minutes if task else None
+
+    estimated_hrs = int(estimated) / 60 if estimated else 0
+    logged_minutes = database.get_task_time_for_user(task_id, state.clickup_user_id)
+    logged_hours = logged_minutes / 60.0
+
+    return (
+        f"Выбрана задача: {task_name}\n\n"
+        f"Оценка задачи (в часах): {estimated_hrs:.1f}\n"
+        f"Залогированное время (в часах): {logged_hours:.1f}\n\n"
+        "Введите время в формате:\n"
+        "• 1.5h - полтора часа\n"
+        "• 90m - 90 минут\n"
+        "• 2h30m - 2 часа 30 минут\n\n"
+        "Или просто число (в минутах): 150"
+    )
+
+
+async def cancel_job(update: Update, context: ContextTypes.DEFAULT_TYPE, action: str) -> None:
+    cancel_jobs(update.effective_user.id, action)
+
+
+async def cancel_estimate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    clear_conversation_state(update.effective_user.id)
+    close_picker(update.effective_user.id)
+    await update.callback_query.edit_message_text("❌ Изменение оценки отменено")
 
-        formatted_ws = format_workspaces(workspaces)
-        keyboard = [
-            [InlineKeyboardButton(ws["name"], callback_data=f"ws_{ws['id']}")]
-            for ws in formatted_ws
-        ]
 
-        await update.callback_query.edit_message_text(
-            "🏢 Выберите workspace:",
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+async def cancel_logging(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    clear_conversation_state(update.effective_user.id)
+    close_picker(update.effective_user.id)
+    await update.callback_query.edit_message_text("❌ Логирование времени отменено")
+
+
+@timed_handler
+async def change_workspace(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        await update.callback_query.edit_message_text("🔄 Загружаю список workspace...")
+        await open_picker(update, "ws")
     except Exception as e:
-        logger.error(f"Workspace change error: {e}")
+        logger.error("Workspace change error: %s", e)
         await update.callback_query.edit_message_text("⚠️ Ошибка при загрузке workspace")
 
 
+@timed_handler
 async def change_sprint(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
         await update.callback_query.edit_message_text("🔄 Загружаю список спринтов...")
@@ -142,27 +178,13 @@ async def change_sprint(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
             await update.callback_query.edit_message_text("❌ Сначала выберите workspace")
             return
 
-        sprints = await clickup.get_clickup_sprints(context_data["current_workspace"])
-
-        if not sprints:
-            await update.callback_query.edit_message_text("❌ Не удалось найти спринты")
-            return
-
-        formatted_sprints = format_sprints(sprints)
-        keyboard = [
-            [InlineKeyboardButton(sprint["name"], callback_data=f"sprint_{sprint['id']}")]
-            for sprint in formatted_sprints
-        ]
-
-        await update.callback_query.edit_message_text(
-            "⏳ Выберите спринт:",
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+        await open_picker(update, "sprint")
     except Exception as e:
-        logger.error(f"Sprint change error: {e}")
+        logger.error("Sprint change error: %s", e)
         await update.callback_query.edit_message_text("⚠️ Ошибка при загрузке спринтов")
 
 
+@timed_handler
 async def change_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
         await update.callback_query.edit_message_text("🔄 Загружаю список пользователей...")
@@ -173,33 +195,17 @@ async def change_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             await update.callback_query.edit_message_text("❌ Сначала выберите спринт")
             return
 
-        members = await clickup.get_clickup_list_members(context_data["current_sprint"])
-
-        if not members:
-            await update.callback_query.edit_message_text("❌ Не удалось получить пользователей")
-            return
-
-        formatted_members = format_members(members)
-        keyboard = [
-            [InlineKeyboardButton(
-                f"{member['username']} ({member['email']})" if member['email'] else member['username'],
-                callback_data=f"user_{member['id']}_{member['username']}"
-            )]
-            for member in formatted_members
-        ]
-
-        await update.callback_query.edit_message_text(
-            "👤 Выберите пользователя:",
-            reply_markup=InlineKeyboardMarkup(keyboard))
+        await open_picker(update, "user")
 
     except Exception as e:
-        logger.error(f"User change error: {e}")
+        logger.error("User change error: %s", e)
         await update.callback_query.edit_message_text("⚠️ Ошибка при загрузке пользователей")
 
 
+@timed_handler
 async def log_my_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
-        await update.callback_query.edit_message_text("🔄 Загружаю список задач...")
+        await report_progress(update, "🔄 Загружаю список задач...")
         user_id = update.effective_user.id
         context_data = get_user_context(user_id)
 
@@ -208,67 +214,48 @@ async def log_my_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             await update.callback_query.edit_message_text("❌ Конфигурация не завершена!")
             return
 
-        tasks = await clickup.get_all_user_tasks_in_sprint(
-            context_data["current_sprint"],
-            context_data["current_user"]
-        )
+        sprint_tasks = clickup.peek_cached("get_all_tasks_in_sprint", context_data["current_sprint"])
+        if sprint_tasks is not None:
+            assignee = str(context_data["current_user"])
+            tasks = [task for task in sprint_tasks if assignee in task.assignee_ids]
+        else:
+            tasks = await clickup.get_all_user_tasks_in_sprint(
+                context_data["current_sprint"],
+                context_data["current_user"]
+            )
 
         if not tasks:
             await update.callback_query.edit_message_text("❌ У пользователя нет задач в спринте")
             return
 
-        for task in tasks:
-            estimated_ms = task.get("time_estimate")
-            estimated_minutes = estimated_ms / 60000.0 if estimated_ms else 0
-            sprint_id = context_data["current_sprint"]
-            status = task.get("status", {}).get("status", "unknown")
-
-            database.cache_task({
-                "id": task["id"],
-                "name": task.get("name", ""),
-                "url": task.get("url", ""),
-                "status": status,
-                "workspace_id": context_data["current_workspace"],
-                "sprint_id": sprint_id,
-                "estimated_minutes": estimated_minutes
-            })
-
-        tasks_in_progress = [task for task in tasks
-                             if task.get("status", {}).get("status", "").lower() == "in progress"]
+        sprint_id = context_data["current_sprint"]
+        await asyncio.to_thread(cache_sprint_tasks, tasks, context_data["current_workspace"], sprint_id)
+
+        tasks_in_progress = [task for task in tasks if task.status.lower() == "in progress"]
 
         if not tasks_in_progress:
             await update.callback_query.edit_message_text(
                 "❌ Нет задач в работе. Все задачи завершены или еще не начаты.")
             return
 
-        formatted_tasks = format_tasks(tasks)
-        user_logging_state[user_id] = {
-            "tasks": formatted_tasks,
-            "workspace_id": context_data["current_workspace"],
-            "clickup_user_id": context_data["current_user"]
-        }
-
-        keyboard = [
-            [InlineKeyboardButton(
-                task["name"][:47] + "..." if len(task["name"]) > 50 else task["name"],
-                callback_data=f"task_{task['id']}"
-            )]
-            for task in formatted_tasks
-        ]
-        keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data="log_cancel")])
-
-        await update.callback_query.edit_message_text(
-            "✅ Выберите задачу для логирования времени:",
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+        index_sprint_tasks(sprint_id, tasks)
+        set_conversation_state(user_id, ConversationState(
+            action="log_time",
+            sprint_id=sprint_id,
+            workspace_id=context_data["current_workspace"],
+            clickup_user_id=context_data["current_user"],
+            task_ids=frozenset(task.id for task in tasks)
+        ))
+
+        await open_picker(update, "task")
     except Exception as e:
-        logger.error(f"Log time init error: {e}")
+        logger.error("Log time init error: %s", e)
         await update.callback_query.edit_message_text("⚠️ Ошибка при загрузке задач")
 
 
+@timed_handler
 async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     context_data = get_user_context(user_id)
 
@@ -281,59 +268,21 @@ async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id_str = context_data["current_user"]
 
     try:
-        tasks = get_user_sprint_statistics(sprint_id, user_id_str)
+        await report_progress(update, "🔄 Считаю статистику...")
+        pages = await load_report("show_stats", sprint_id, user_id_str)
 
-        if not tasks:
+        if not pages:
             await query.edit_message_text("❌ У вас нет задач в этом спринте.")
             return
 
-        message = "📊 <b>Статистика пользователя:</b>\n\n"
-
-        total_estimated = 0.0
-        total_logged = 0.0
-
-        for task in tasks:
-            estimated_minutes = task['estimated_minutes']
-            logged_minutes = task['logged_minutes']
-
-            estimated_hours = estimated_minutes / 60 if estimated_minutes else 0
-            logged_hours = logged_minutes / 60
-
-            total_estimated += estimated_hours
-            total_logged += logged_hours
-
-            task_name = task['name']
-            if len(task_name) > 50:
-                task_name = task_name[:47] + "..."
-
-            message += f"🔹 <a href='{task['url']}'>{task_name}</a>\n"
-            message += f"   Статус: {task['status']}\n"
-            message += f"   {logged_hours:.1f}h"
-
-            if estimated_minutes:
-                message += f" / {estimated_hours:.1f}h\n"
-            else:
-                message += " / NOT ESTIMATED\n"
-
-            message += "────────────────\n"
-
-        message += f"\n<b>Итого:</b> {total_logged:.1f}h"
-        if total_estimated:
-            message += f" / {total_estimated:.1f}h"
-
-        keyboard = [[InlineKeyboardButton("Вернуться в меню", callback_data="show_menu")]]
-        await query.edit_message_text(
-            message,
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+        await send_report(update, "show_stats", pages, sprint_id, user_id_str)
 
     except Exception as e:
-        logger.error(f"Ошибка при получении статистики: {e}")
+        logger.error("Ошибка при получении статистики: %s", e)
         await query.edit_message_text("❌ Ошибка при загрузке статистики")
 
 
+@timed_handler
 async def show_all_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     user_id = query.from_user.id
@@ -345,61 +294,25 @@ async def show_all_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     sprint_id = context_data["current_sprint"]
 
-    await query.edit_message_text("🔄 Загружаю задачи...")
+    await report_progress(update, "🔄 Загружаю задачи...")
 
     try:
-        tasks = get_sprint_tasks_summary(sprint_id)
+        pages = await load_report("show_all_tasks", sprint_id)
 
-        if not tasks:
+        if not pages:
             await query.edit_message_text("❌ В спринте нет задач")
             return
 
-        message = "📋 <b>Все задачи спринта:</b>\n\n"
-
-        for task in tasks:
-            task_name = task['name']
-            if len(task_name) > 50:
-                task_name = task_name[:47] + "..."
-
-            message += f"🔹 <a href='{task['url']}'>{task_name}</a>\n"
-            message += f"   Статус: {task['status']}\n"
-
-            total_minutes = sum(a['minutes'] for a in task['assignees'])
-            total_hours = total_minutes / 60
-            message += f"   {total_hours:.1f}h /"
-
-            if task['estimated_minutes']:
-                est_hours = task['estimated_minutes'] / 60
-                message += f" {est_hours}h\n"
-            else:
-                message += " NOT ESTIMATED\n"
-
-            if task['assignees']:
-                for assignee in task['assignees']:
-                    user_name = assignee['user_name'] or f"User {assignee['user_id']}"
-                    user_time = assignee['minutes'] / 60
-                    message += f"   👤 {user_name}: {user_time:.1f}h\n"
-            else:
-                message += "   Информации о логировании нет\n"
-
-            message += "────────────────\n"
-
-        keyboard = [[InlineKeyboardButton("Вернуться в меню", callback_data="show_menu")]]
-        await query.edit_message_text(
-            message,
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+        await send_report(update, "show_all_tasks", pages, sprint_id)
 
     except Exception as e:
-        logger.error(f"Ошибка при показе задач: {e}")
+        logger.error("Ошибка при показе задач: %s", e)
         await query.edit_message_text("❌ Ошибка при загрузке задач")
 
 
+@timed_handler
 async def refresh_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     context_data = get_user_context(user_id)
 
@@ -409,36 +322,28 @@ async def refresh_tasks(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     sprint_id = context_data["current_sprint"]
 
-    await query.edit_message_text("🔄 Обновление задач...")
+    await report_progress(update, "🔄 Обновление задач...")
 
     try:
+        clickup.invalidate_cached("get_all_tasks_in_sprint", sprint_id)
+        state_backend.publish_invalidation("clickup", [f"get_all_tasks_in_sprint:{sprint_id}"])
         tasks = await get_all_tasks_in_sprint(sprint_id)
 
         if not tasks:
             await query.edit_message_text("❌ В спринте нет задач")
             return
 
-        for task in tasks:
-            estimated_ms = task.get("time_estimate")
-            estimated_minutes = estimated_ms / 60000.0 if estimated_ms else 0
-
-            cache_task({
-                "id": task["id"],
-                "name": task.get("name", ""),
-                "url": task.get("url", ""),
-                "status": task.get("status", {}).get("status", "unknown"),
-                "workspace_id": context_data["current_workspace"],
-                "sprint_id": sprint_id,
-                "estimated_minutes": estimated_minutes
-            })
+        await report_progress(update, f"🔄 Сохраняю {len(tasks)} задач...")
+        await asyncio.to_thread(cache_sprint_tasks, tasks, context_data["current_workspace"], sprint_id)
 
         await query.edit_message_text("✅ Задачи успешно обновлены!")
 
     except Exception as e:
-        logger.error(f"Ошибка при обновлении задач: {e}")
+        logger.error("Ошибка при обновлении задач: %s", e)
         await query.edit_message_text("❌ Ошибка при обновлении задач")
 
 
+@timed_handler
 async def show_tasks_without_estimate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     user_id = query.from_user.id
@@ -449,63 +354,24 @@ async def show_tasks_without_estimate(update: Update, context: ContextTypes.DEFA
         return
 
     sprint_id = context_data["current_sprint"]
-    await query.edit_message_text("🔄 Загружаю задачи без оценки...")
+    await report_progress(update, "🔄 Загружаю задачи без оценки...")
 
     try:
-        tasks = get_sprint_tasks_summary(sprint_id)
-        if not tasks:
+        pages = await load_report("show_tasks_without_estimate", sprint_id)
+        if not pages:
             await query.edit_message_text("❌ В спринте нет задач")
             return
 
-        tasks_without_estimate = [
-            task for task in tasks
-            if not task.get('estimated_minutes') or task['estimated_minutes'] == 0
-        ]
-
-        if not tasks_without_estimate:
-            await query.edit_message_text("✅ В спринте нет задач без оценки!")
-            return
-
-        message = "📋 <b>Задачи спринта без оценки:</b>\n\n"
-
-        for task in tasks_without_estimate:
-            task_name = task['name']
-            if len(task_name) > 50:
-                task_name = task_name[:47] + "..."
-
-            message += f"🔹 <a href='{task['url']}'>{task_name}</a>\n"
-            message += f"   Статус: {task['status']}\n"
-
-            total_minutes = sum(a['minutes'] for a in task['assignees'])
-            total_hours = total_minutes / 60
-            message += f"   {total_hours:.1f}h / NOT ESTIMATED\n"
-
-            if task['assignees']:
-                for assignee in task['assignees']:
-                    user_name = assignee['user_name'] or f"User {assignee['user_id']}"
-                    user_time = assignee['minutes'] / 60
-                    message += f"   👤 {user_name}: {user_time:.1f}ч\n"
-            else:
-                message += "   Информации о логировании нет\n"
-
-            message += "────────────────\n"
-
-        keyboard = [[InlineKeyboardButton("Вернуться в меню", callback_data="show_menu")]]
-        await query.edit_message_text(
-            message,
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+        await send_report(update, "show_tasks_without_estimate", pages, sprint_id)
 
     except Exception as e:
-        logger.error(f"Ошибка при показе задач без оценки: {e}")
+        logger.error("Ошибка при показе задач без оценки: %s", e)
         await query.edit_message_text("❌ Ошибка при загрузке задач")
 
 
+@timed_handler
 async def change_task_estimate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
     context_data = get_user_context(user_id)
 
@@ -513,51 +379,22 @@ async def change_task_estimate(update: Update, context: ContextTypes.DEFAULT_TYP
         await query.edit_message_text("❌ Сначала выберите спринт!")
         return
 
-    sprint_id = context_data["current_sprint"]
-    await query.edit_message_text("🔄 Загружаю задачи спринта...")
+    await report_progress(update, "🔄 Загружаю задачи спринта...")
 
     try:
-        tasks = get_sprint_tasks_summary(sprint_id)
-        if not tasks:
-            await query.edit_message_text("❌ В спринте нет задач")
-            return
-
-        keyboard = []
-        for task in tasks:
-            task_name = task['name']
-            if len(task_name) > 50:
-                task_name = task_name[:47] + "..."
-
-            estimated = task.get('estimated_minutes')
-            status = f"{estimated / 60:.1f}h" if estimated and estimated > 0 else "NOT ESTIMATED"
-
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{task_name} ({status})",
-                    callback_data=f"estimate_task_{task['id']}"
-                )
-            ])
-
-        keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data="cancel_estimate")])
-
-        await query.edit_message_text(
-            "📋 Выберите задачу для изменения оценки:",
-            reply_markup=InlineKeyboardMarkup(keyboard))
-
+        await open_picker(update, "estimate_task")
     except Exception as e:
-        logger.error(f"Ошибка при загрузке задач: {e}")
+        logger.error("Ошибка при загрузке задач: %s", e)
         await query.edit_message_text("❌ Ошибка при загрузке задач")
 
 
+@timed_handler
 async def handle_estimate_task(update: Update, context: ContextTypes.DEFAULT_TYPE, task_id: str) -> None:
     query = update.callback_query
-    await query.answer()
     user_id = query.from_user.id
 
-    user_logging_state[user_id] = {
-        "action": "estimate_edit",
-        "task_id": task_id
-    }
+    set_conversation_state(user_id, ConversationState(action="estimate_edit", task_id=task_id))
+    remember_pick(user_id, "estimate_task", task_id)
 
     await query.edit_message_text(
         "Введите новую оценку для задачи в формате:\n"
@@ -565,4 +402,48 @@ async def handle_estimate_task(update: Update, context: ContextTypes.DEFAULT_TYP
         "• 90m - 90 минут\n"
         "• 2h30m - 2 часа 30 минут\n\n"
         "Или просто число (в минутах): 150"
-    )
\ No newline at end of file
+    )
+
+
+@timed_handler
+async def refresh_tasks_and_show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    await refresh_tasks(update, context)
+    await show_menu(update, context)
+
+
+BACKGROUND_JOBS = {
+    "log_my_time": log_my_time,
+    "show_stats": show_statistics,
+    "show_all_tasks": show_all_tasks,
+    "refresh_tasks": refresh_tasks_and_show_menu,
+    "show_tasks_without_estimate": show_tasks_without_estimate,
+    "change_task_estimate": change_task_estimate
+}
+
+for action, job in BACKGROUND_JOBS.items():
+    register(action, job)
+
+register("change_workspace", change_workspace)
+register("change_sprint", change_sprint)
+register("change_user", change_user)
+register("current_context", show_current_context)
+register("show_menu", show_menu)
+register("cancel_estimate", cancel_estimate)
+register("log_cancel", cancel_logging)
+
+register("ws", select_workspace, code="w")
+register("sprint", select_sprint, code="s")
+register("user", select_user, code="u")
+register("task", select_task, code="t")
+register("estimate_task", handle_estimate_task, code="e")
+register("job_cancel", cancel_job, code="c")
+register("page", show_report_page, code="p")
+register("pick", page_picker, code="k")
+
+# Buttons sent before the compact format still carry the old prefixes.
+register_legacy("ws_", "ws")
+register_legacy("sprint_", "sprint")
+register_legacy("user_", "user", lambda rest: (rest.split("_", 1)[0],))
+register_legacy("task_", "task")
+register_legacy("estimate_task_", "estimate_task")
+register_legacy("job_cancel_", "job_cancel")
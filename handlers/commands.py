@@ -1,12 +1,18 @@
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
-from services.user_manager import get_user_context, is_admin, get_shutting_down, set_shutting_down, save_user_data
+from services.user_manager import get_user_context, is_admin, get_shutting_down, set_shutting_down, save_user_data, \
+    flush_conversation_state
 from services import clickup, stop_application, update_user_context
-from utils.formatting import format_workspaces, format_sprints, format_members
 from utils.logger import logger
+from utils.metrics import timed_handler
+from utils.tracing import get_slowest_traces, recent_traces, find_trace, describe_trace, render_trace_tree
+from services.profiling import profile_for, profile_lock, memory_report, stop_memory_tracing, PROFILE_MAX_SECONDS
 import asyncio
+import html
+import io
 
 
+@timed_handler
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
     get_user_context(user_id)  # Инициализация контекста
@@ -16,14 +22,20 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         "🛠️ Перед началом работы настройте контекст /context.\n\n"
         "📊 Основные команды:\n"
         "/context - Установить контекст (workspace, user, sprint)\n"
-        "/menu - Показать меню для работы с логированием\n\n"
+        "/menu - Показать меню для работы с логированием\n"
+        "/log ID - Залогировать время в задачу\n"
+        "@имя_бота текст - Найти задачу по названию\n\n"
         "⚙️ Для администраторов:\n"
-        "/shutdown - Выключить бота"
+        "/shutdown - Выключить бота\n"
+        "/traces - Медленные запросы\n"
+        "/profile N - Профилировать N секунд\n"
+        "/memprofile - Снимок памяти"
     )
 
     await update.message.reply_text(text)
 
 
+@timed_handler
 async def shutdown(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if get_shutting_down():
         await update.message.reply_text("🔄 Бот уже выключается...")
@@ -33,11 +45,12 @@ async def shutdown(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     if not is_admin(user_id):
         await update.message.reply_text("⛔ У вас нет прав на эту команду")
-        logger.warning(f"Неавторизованная попытка выключения от {user_id}")
+        logger.warning("Неавторизованная попытка выключения от %s", user_id)
         return
 
     logger.info(f"Инициировано выключение администратором {user_id}")
     save_user_data()
+    flush_conversation_state()
     set_shutting_down(True)
 
     asyncio.create_task(stop_application())
@@ -49,6 +62,7 @@ async def shutdown(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     )
 
 
+@timed_handler
 async def show_current_context(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
         user_id = update.effective_user.id
@@ -69,10 +83,11 @@ async def show_current_context(update: Update, context: ContextTypes.DEFAULT_TYP
         )
 
     except Exception as e:
-        logger.error(f"Ошибка в current_context: {e}")
+        logger.error("Ошибка в current_context: %s", e)
         await update.message.reply_text("⚠️ Произошла ошибка при отображении контекста. Попробуйте позже.")
 
 
+@timed_handler
 async def show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
         user_id = update.effective_user.id
@@ -96,10 +111,93 @@ async def show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         )
 
     except Exception as e:
-        logger.error(f"Ошибка в show_menu: {e}")
+        logger.error("Ошибка в show_menu: %s", e)
         await update.message.reply_text("⚠️ Произошла ошибка при отображении меню. Попробуйте позже.")
 
 
+@timed_handler
+async def show_traces(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    if not is_admin(user_id):
+        await update.message.reply_text("⛔ У вас нет прав на эту команду")
+        return
+
+    if context.args:
+        trace = find_trace(context.args[0])
+        if not trace:
+            await update.message.reply_text("🔍 Трейс не найден")
+            return
+        lines = render_trace_tree(trace)
+    else:
+        lines = ["Самые медленные:"]
+        lines += [describe_trace(trace) for trace in get_slowest_traces(10)]
+        lines += ["", "Последние:"]
+        lines += [describe_trace(trace) for trace in list(recent_traces)[-10:]]
+        lines += ["", "Подробнее: /traces <trace_id>"]
+
+    text = html.escape("\n".join(lines)[:3500])
+    await update.message.reply_text(f"<pre>{text}</pre>", parse_mode="HTML")
+
+
+@timed_handler
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    if not is_admin(user_id):
+        await update.message.reply_text("⛔ У вас нет прав на эту команду")
+        return
+
+    if profile_lock.locked():
+        await update.message.reply_text("⏳ Профилирование уже идёт")
+        return
+
+    try:
+        seconds = float(context.args[0]) if context.args else 30
+    except ValueError:
+        await update.message.reply_text(f"Использование: /profile <секунды, до {PROFILE_MAX_SECONDS}>")
+        return
+
+    await update.message.reply_text(f"🔬 Профилирую {min(seconds, PROFILE_MAX_SECONDS):.0f} с живого трафика...")
+    context.application.create_task(send_profile(update, context, seconds), update=update)
+
+
+async def send_profile(update: Update, context: ContextTypes.DEFAULT_TYPE, seconds: float) -> None:
+    try:
+        stats_text, collapsed, top = await profile_for(seconds)
+    except Exception as e:
+        logger.exception("Profiling failed: %s", e)
+        await update.message.reply_text("⚠️ Не удалось выполнить профилирование")
+        return
+
+    summary = html.escape("\n".join(["Топ по суммарному времени:"] + top)[:3500])
+    await update.message.reply_text(f"<pre>{summary}</pre>", parse_mode="HTML")
+    await context.bot.send_document(
+        chat_id=update.effective_chat.id,
+        document=io.BytesIO(stats_text.encode()),
+        filename="profile.txt"
+    )
+    await context.bot.send_document(
+        chat_id=update.effective_chat.id,
+        document=io.BytesIO(collapsed.encode()),
+        filename="stacks.collapsed",
+        caption="Для flamegraph.pl или speedscope"
+    )
+
+
+@timed_handler
+async def memprofile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    if not is_admin(user_id):
+        await update.message.reply_text("⛔ У вас нет прав на эту команду")
+        return
+
+    if context.args and context.args[0] == "stop":
+        stop_memory_tracing()
+        await update.message.reply_text("🧹 tracemalloc остановлен")
+        return
+
+    text = html.escape("\n".join(memory_report())[:3500])
+    await update.message.reply_text(f"<pre>{text}</pre>", parse_mode="HTML")
+
 
 async def current_context_text(context_data, user_id):
     text = "⚙️ <b>Текущие настройки контекста</b>\n\n"
@@ -108,8 +206,8 @@ async def current_context_text(context_data, user_id):
         workspace = context_data.get("current_workspace_data")
         if not workspace:
             workspaces = await clickup.get_clickup_teams()
-            workspace = next((ws for ws in format_workspaces(workspaces)
-                              if ws["id"] == workspace_id), None)
+            found = next((ws for ws in workspaces if ws.id == workspace_id), None)
+            workspace = found._asdict() if found else None
             update_user_context(user_id, "current_workspace_data", workspace)
 
         text += f"🏢 <b>Workspace:</b> {workspace['name'] if workspace else f'ID {workspace_id}'}\n"
@@ -122,7 +220,8 @@ async def current_context_text(context_data, user_id):
             sprint = context_data.get("current_sprint_data")
             if not sprint:
                 sprints = await clickup.get_clickup_sprints(workspace_id)
-                sprint = next((s for s in format_sprints(sprints) if s["id"] == sprint_id), None)
+                found = next((s for s in sprints if s.id == sprint_id), None)
+                sprint = found._asdict() if found else None
                 update_user_context(user_id, "current_sprint_data", sprint)
 
             if sprint:
@@ -1,48 +1,55 @@
+import asyncio
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from handlers import show_menu
-from services.user_manager import get_user_context, user_logging_state
+from services.user_manager import get_user_context, update_user_context, get_conversation_state, \
+    clear_conversation_state
+from services.task_index import find_task
 from services.time_utils import parse_time_input
 from services.clickup import get_clickup_list_members, put_new_task_estimate
-from services.database import log_time_locally, get_task_time_for_user, change_task_estimate
+from services.database import log_time_locally, log_time_bulk, get_task_time_for_user, change_task_estimate
+from services.bulk_logging import parse_bulk, looks_like_entry
 from handlers.buttons import show_current_context
+from handlers.status import transient_status
+from handlers.pickers import filter_picker, close_picker
+from utils.formatting import paginate
 from utils.logger import log_exceptions
-from utils import format_members
+from utils.metrics import timed_handler
+
+MAX_FAILED_SHOWN = 20
+
 
 @log_exceptions
+@timed_handler
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     message_text = update.message.text
+    state = get_conversation_state(user_id)
 
-    if user_id in user_logging_state and user_logging_state[user_id].get("action") == "estimate_edit":
+    if state and state.action == "estimate_edit":
         duration_ms = parse_time_input(message_text)
         if not duration_ms or duration_ms <= 0:
             await update.message.reply_text("❌ Неверный формат времени!")
             return
 
         new_estimate_minutes = duration_ms / 60000.0
-        task_id = user_logging_state[user_id]["task_id"]
-
-        loading_msg = await update.message.reply_text("⏳ Обновляю оценку...")
-        success = await put_new_task_estimate(task_id, new_estimate_minutes)
-        if success:
-            change_task_estimate(task_id, new_estimate_minutes)
+        task_id = state.task_id
 
-        await context.bot.delete_message(
-            chat_id=update.effective_chat.id,
-            message_id=loading_msg.message_id
-        )
+        async with transient_status(update, context, "⏳ Обновляю оценку..."):
+            success = await put_new_task_estimate(task_id, new_estimate_minutes)
+            if success:
+                change_task_estimate(task_id, new_estimate_minutes)
 
         if success:
             await update.message.reply_text(f"✅ Оценка обновлена: {new_estimate_minutes:.1f} минут")
         else:
             await update.message.reply_text("❌ Ошибка при обновлении оценки")
 
-        del user_logging_state[user_id]
+        clear_conversation_state(user_id)
         return
 
-    if user_id in user_logging_state and "task_id" in user_logging_state[user_id]:
+    if state and state.task_id:
         duration_ms = parse_time_input(message_text)
         if not duration_ms or duration_ms <= 0:
             await update.message.reply_text(
@@ -53,51 +60,28 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
             return
 
-        task_id = user_logging_state[user_id]["task_id"]
-        clickup_user_id = user_logging_state[user_id]["clickup_user_id"]
+        task_id = state.task_id
+        clickup_user_id = state.clickup_user_id
 
-        task_exists = any(task["id"] == task_id
-                          for task in user_logging_state[user_id]["tasks"])
-
-        if not task_exists:
+        if task_id not in state.task_ids:
             await update.message.reply_text("❌ Ошибка: задача не найдена")
-            del user_logging_state[user_id]
+            clear_conversation_state(user_id)
             return
 
-        user_name = "Unknown"
-        context_data = get_user_context(user_id)
-        if context_data.get("current_user_name"):
-            user_name = context_data["current_user_name"]
-        else:
-            sprint_id = context_data.get("current_sprint")
-            if sprint_id:
-                members = await get_clickup_list_members(sprint_id)
-                member = next(
-                    (m for m in format_members(members)
-                     if str(m["id"]) == clickup_user_id),
-                    None
-                )
-                if member:
-                    user_name = member["username"]
-                    context_data["current_user_name"] = user_name
-
-        loading_msg = await update.message.reply_text("⏳ Сохраняю время...")
+        user_name = await resolve_user_name(user_id, clickup_user_id)
 
         duration_minutes = duration_ms / 60000.0
-        success = log_time_locally(
-            task_id,
-            clickup_user_id,
-            user_name,
-            duration_minutes
-        )
-
-        await context.bot.delete_message(
-            chat_id=update.effective_chat.id,
-            message_id=loading_msg.message_id
-        )
+        async with transient_status(update, context, "⏳ Сохраняю время..."):
+            success = await asyncio.to_thread(
+                log_time_locally,
+                task_id,
+                clickup_user_id,
+                user_name,
+                duration_minutes
+            )
 
         if success:
-            total_minutes = get_task_time_for_user(task_id, clickup_user_id)
+            total_minutes = await asyncio.to_thread(get_task_time_for_user, task_id, clickup_user_id)
             total_hours = total_minutes / 60.0
 
             if total_hours >= 1:
@@ -105,8 +89,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             else:
                 time_str = f"{total_minutes:.0f} мин"
 
-            task_name = next((t["name"] for t in user_logging_state[user_id]["tasks"]
-                              if t["id"] == task_id), "Задача")
+            task = find_task(state.sprint_id, task_id)
+            task_name = task.name if task else "Задача"
 
             await update.message.reply_text(
                 f"✅ Время успешно сохранено!\n"
@@ -114,17 +98,94 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"• Всего по задаче: {time_str}\n"
                 f"• Задача: {task_name}")
 
-            loading_msg = await update.message.reply_text("⏳ Загружаю меню..")
-            await show_menu(update, context)
-            await context.bot.delete_message(
-                chat_id=update.effective_chat.id,
-                message_id=loading_msg.message_id
-            )
+            async with transient_status(update, context, "⏳ Загружаю меню.."):
+                await show_menu(update, context)
         else:
             await update.message.reply_text("❌ Ошибка при сохранении времени. Попробуйте позже.")
 
-        del user_logging_state[user_id]
+        clear_conversation_state(user_id)
+        return
+
+    if "\n" in message_text.strip():
+        await handle_bulk_log(update, context, message_text)
+        return
+
+    # "Fix login 1h" is a time entry even with a picker open; a bare trailing number may be part of a filter.
+    if looks_like_entry(message_text, explicit_unit=True):
+        close_picker(user_id)
+        await handle_bulk_log(update, context, message_text)
+        return
+
+    if await filter_picker(update, message_text):
         return
 
-    else:
-        await update.message.reply_text("ℹ️ Используйте команды меню для работы с ботом")
\ No newline at end of file
+    if looks_like_entry(message_text):
+        await handle_bulk_log(update, context, message_text)
+        return
+
+    await update.message.reply_text("ℹ️ Используйте команды меню для работы с ботом")
+
+
+async def resolve_user_name(user_id: int, clickup_user_id: str) -> str:
+    context_data = get_user_context(user_id)
+    if context_data.get("current_user_name"):
+        return context_data["current_user_name"]
+
+    sprint_id = context_data.get("current_sprint")
+    if sprint_id:
+        members = await get_clickup_list_members(sprint_id)
+        member = next((m for m in members if m.id == clickup_user_id), None)
+        if member:
+            update_user_context(user_id, "current_user_name", member.username)
+            return member.username
+    return "Unknown"
+
+
+async def handle_bulk_log(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str) -> None:
+    user_id = update.effective_user.id
+    context_data = get_user_context(user_id)
+
+    required = ["current_workspace", "current_sprint", "current_user"]
+    if not all(context_data.get(key) for key in required):
+        await update.message.reply_text("❌ Конфигурация не завершена! Настройте контекст: /context")
+        return
+
+    clickup_user_id = context_data["current_user"]
+    entries = await asyncio.to_thread(parse_bulk, text, context_data["current_sprint"])
+    valid = [entry for entry in entries if entry.error is None]
+    failed = [entry for entry in entries if entry.error is not None]
+
+    totals = {}
+    if valid:
+        user_name = await resolve_user_name(user_id, clickup_user_id)
+        async with transient_status(update, context, "⏳ Сохраняю время..."):
+            totals = await asyncio.to_thread(
+                log_time_bulk,
+                [(entry.task.id, entry.minutes) for entry in valid],
+                clickup_user_id,
+                user_name
+            )
+        if totals is None:
+            await update.message.reply_text("❌ Ошибка при сохранении времени, ничего не записано. Попробуйте позже.")
+            return
+
+    lines = []
+    if valid:
+        logged_hours = sum(entry.minutes for entry in valid) / 60
+        lines.append(f"✅ Записано строк: {len(valid)}, всего {logged_hours:.1f} ч")
+        for entry in valid:
+            total_hours = totals.get(entry.task.id, 0) / 60
+            lines.append(f"• {entry.task.name[:40]} — {entry.minutes:.0f} мин (всего {total_hours:.1f} ч)")
+
+    if failed:
+        if lines:
+            lines.append("")
+        lines.append(f"⚠️ Не записано строк: {len(failed)}")
+        for entry in failed[:MAX_FAILED_SHOWN]:
+            lines.append(f"• {entry.line_number}: «{entry.text[:40]}» — {entry.error}")
+        if len(failed) > MAX_FAILED_SHOWN:
+            lines.append(f"• … и ещё {len(failed) - MAX_FAILED_SHOWN}")
+        lines.append("\nФормат: <ID или начало названия задачи> <время>, по строке на задачу")
+
+    for page in paginate("", [f"{line}\n" for line in lines]):
+        await update.message.reply_text(page)
\ No newline at end of file
@@ -0,0 +1,295 @@
+import asyncio
+from bisect import bisect_left, bisect_right
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from cachetools import LRUCache, TTLCache
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import ContextTypes
+from services import clickup
+from services.database import get_sprint_tasks_page, get_sprint_tasks_by_ids
+from services.task_index import find_task
+from services.user_manager import get_user_context, update_user_context, get_conversation_state
+from utils.config import PICKER_PAGE_SIZE, PICKER_RECENT_ITEMS
+from handlers.router import callback_data
+
+Item = Tuple[str, str, str]
+Source = Callable[[int], Awaitable[Optional[Tuple[Hashable, object, Callable[[], List[Tuple[str, str]]]]]]]
+Loader = Callable[[int, str, Optional[str], bool, int, List[str]], Awaitable[Optional[Tuple[List[Item], List[Item]]]]]
+
+
+class PickerView:
+    __slots__ = ("kind", "prefix")
+
+    def __init__(self, kind: str, prefix: str = "") -> None:
+        self.kind = kind
+        self.prefix = prefix
+
+
+class Picker:
+    __slots__ = ("title", "empty_text", "select_action", "cancel_action", "searchable", "load")
+
+    def __init__(self, title: str, empty_text: str, select_action: str, load: Loader,
+                 cancel_action: Optional[str] = None, searchable: bool = False) -> None:
+        self.title = title
+        self.empty_text = empty_text
+        self.select_action = select_action
+        self.cancel_action = cancel_action
+        self.searchable = searchable
+        self.load = load
+
+
+open_pickers = TTLCache(maxsize=10000, ttl=1800)
+sorted_sources = LRUCache(maxsize=512)
+
+
+def short_label(name: str) -> str:
+    return name[:47] + "..." if len(name) > 50 else name
+
+
+def sorted_items(key: Hashable, source: object, items: Callable[[], List[Tuple[str, str]]]):
+    cached = sorted_sources.get(key)
+    if cached is None or cached[0] is not source:
+        entries = sorted((label.casefold(), str(item_id), label) for item_id, label in items())
+        cached = sorted_sources[key] = (
+            source,
+            [entry[:2] for entry in entries],
+            entries,
+            {entry[1]: entry for entry in entries}
+        )
+    return cached[1], cached[2], cached[3]
+
+
+def memory_loader(source: Source) -> Loader:
+    async def load(user_id: int, prefix: str, cursor_id: Optional[str], backwards: bool, limit: int,
+                   recent_ids: List[str]) -> Optional[Tuple[List[Item], List[Item]]]:
+        loaded = await source(user_id)
+        if not loaded:
+            return None
+        keys, entries, by_id = sorted_items(*loaded)
+        if not entries:
+            return None
+        cursor = by_id[cursor_id][:2] if cursor_id in by_id else None
+
+        prefix = prefix.casefold()
+        recent = [by_id[item_id] for item_id in recent_ids
+                  if item_id in by_id and by_id[item_id][0].startswith(prefix)]
+        exclude = {entry[1] for entry in recent}
+
+        lo = bisect_left(keys, (prefix, ""))
+        hi = bisect_left(keys, (prefix + "\U0010ffff", "")) if prefix else len(keys)
+        rows = []
+        if backwards:
+            position = bisect_left(keys, cursor, lo, hi) if cursor else hi
+            while position > lo and len(rows) <= limit:
+                position -= 1
+                if entries[position][1] not in exclude:
+                    rows.append(entries[position])
+            rows.reverse()
+        else:
+            position = bisect_right(keys, cursor, lo, hi) if cursor else lo
+            while position < hi and len(rows) <= limit:
+                if entries[position][1] not in exclude:
+                    rows.append(entries[position])
+                position += 1
+        return recent, rows
+
+    return load
+
+
+async def workspace_source(user_id: int):
+    workspaces = await clickup.get_clickup_teams()
+    return "ws", workspaces, lambda: [(ws.id, ws.name) for ws in workspaces]
+
+
+async def sprint_source(user_id: int):
+    workspace_id = get_user_context(user_id).current_workspace
+    if not workspace_id:
+        return None
+    sprints = await clickup.get_clickup_sprints(workspace_id)
+    return ("sprint", workspace_id), sprints, lambda: [(sprint.id, sprint.name) for sprint in sprints]
+
+
+async def member_source(user_id: int):
+    sprint_id = get_user_context(user_id).current_sprint
+    if not sprint_id:
+        return None
+    members = await clickup.get_clickup_list_members(sprint_id)
+    return ("user", sprint_id), members, lambda: [
+        (member.id, f"{member.username} ({member.email})" if member.email else member.username)
+        for member in members
+    ]
+
+
+async def user_task_source(user_id: int):
+    state = get_conversation_state(user_id)
+    if not state or state.action != "log_time":
+        return None
+
+    def items() -> List[Tuple[str, str]]:
+        tasks = (find_task(state.sprint_id, task_id) for task_id in state.task_ids)
+        return [(task.id, short_label(task.name)) for task in tasks if task]
+
+    return ("task", state.sprint_id, state.clickup_user_id), state.task_ids, items
+
+
+def estimate_item(row: Tuple[str, str, Optional[float]]) -> Item:
+    name, task_id, estimated = row
+    status = f"{estimated / 60:.1f}h" if estimated and estimated > 0 else "NOT ESTIMATED"
+    return name, task_id, f"{short_label(name)} ({status})"
+
+
+def load_sprint_tasks(sprint_id: str, prefix: str, cursor_id: Optional[str], backwards: bool, limit: int,
+                      recent_ids: List[str]) -> Tuple[List[Item], List[Item]]:
+    cursor_rows = get_sprint_tasks_by_ids(sprint_id, [cursor_id]) if cursor_id else []
+    cursor = cursor_rows[0][:2] if cursor_rows else None
+    folded = prefix.casefold()
+    recent = [estimate_item(row) for row in get_sprint_tasks_by_ids(sprint_id, recent_ids)
+              if row[0].casefold().startswith(folded)]
+    rows = get_sprint_tasks_page(sprint_id, prefix, cursor, backwards, limit + 1, [item[1] for item in recent])
+    return recent, [estimate_item(row) for row in rows]
+
+
+async def sprint_task_loader(user_id: int, prefix: str, cursor_id: Optional[str], backwards: bool, limit: int,
+                             recent_ids: List[str]) -> Optional[Tuple[List[Item], List[Item]]]:
+    sprint_id = get_user_context(user_id).current_sprint
+    if not sprint_id:
+        return None
+    recent, rows = await asyncio.to_thread(load_sprint_tasks, sprint_id, prefix, cursor_id, backwards, limit, recent_ids)
+    if not recent and not rows and not prefix and not cursor_id:
+        return None
+    return recent, rows
+
+
+PICKERS: Dict[str, Picker] = {
+    "ws": Picker("🏢 Выберите workspace:", "❌ Не удалось получить список workspace", "ws",
+                 memory_loader(workspace_source)),
+    "sprint": Picker("⏳ Выберите спринт:", "❌ Не удалось найти спринты", "sprint", memory_loader(sprint_source)),
+    "user": Picker("👤 Выберите пользователя:", "❌ Не удалось получить пользователей", "user",
+                   memory_loader(member_source)),
+    "task": Picker("✅ Выберите задачу для логирования времени:", "❌ У пользователя нет задач в спринте", "task",
+                   memory_loader(user_task_source), cancel_action="log_cancel", searchable=True),
+    "estimate_task": Picker("📋 Выберите задачу для изменения оценки:", "❌ В спринте нет задач", "estimate_task",
+                            sprint_task_loader, cancel_action="cancel_estimate")
+}
+
+
+def recent_picks(user_id: int, kind: str) -> List[str]:
+    return list((get_user_context(user_id).get("recent_picks") or {}).get(kind, []))
+
+
+def remember_pick(user_id: int, kind: str, item_id: str) -> None:
+    open_pickers.pop(user_id, None)
+    picks = dict(get_user_context(user_id).get("recent_picks") or {})
+    recent = [item_id] + [other for other in picks.get(kind, []) if other != item_id]
+    picks[kind] = recent[:PICKER_RECENT_ITEMS]
+    update_user_context(user_id, "recent_picks", picks)
+
+
+def close_picker(user_id: int) -> None:
+    open_pickers.pop(user_id, None)
+
+
+async def close_picker_on_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    if update.effective_user:
+        close_picker(update.effective_user.id)
+
+
+async def render_picker(user_id: int, view: PickerView, cursor: Optional[str] = None,
+                        backwards: bool = False) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    picker = PICKERS[view.kind]
+    loaded = await picker.load(user_id, view.prefix, cursor, backwards, PICKER_PAGE_SIZE,
+                               recent_picks(user_id, view.kind))
+    if loaded is None:
+        return None
+    recent, rows = loaded
+
+    more = len(rows) > PICKER_PAGE_SIZE
+    if backwards:
+        rows, has_prev, has_next = rows[-PICKER_PAGE_SIZE:], more, True
+    else:
+        rows, has_prev, has_next = rows[:PICKER_PAGE_SIZE], cursor is not None, more
+    if has_prev:
+        recent = []
+
+    keyboard = [
+        [InlineKeyboardButton(f"🕘 {label}", callback_data=callback_data(picker.select_action, item_id))]
+        for _, item_id, label in recent
+    ]
+    keyboard += [
+        [InlineKeyboardButton(label, callback_data=callback_data(picker.select_action, item_id))]
+        for _, item_id, label in rows
+    ]
+
+    navigation = []
+    if has_prev:
+        navigation.append(InlineKeyboardButton(
+            "◀", callback_data=callback_data("pick", view.kind, "prev", rows[0][1] if rows else "", view.prefix)
+        ))
+    if has_next and rows:
+        navigation.append(InlineKeyboardButton(
+            "▶", callback_data=callback_data("pick", view.kind, "next", rows[-1][1], view.prefix)
+        ))
+    if navigation:
+        keyboard.append(navigation)
+    if view.prefix:
+        keyboard.append([InlineKeyboardButton("✖️ Сбросить фильтр", callback_data=callback_data("pick", view.kind, "clear"))])
+    if picker.searchable:
+        keyboard.append([InlineKeyboardButton("🔍 Поиск по названию", switch_inline_query_current_chat="")])
+    if picker.cancel_action:
+        keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data=picker.cancel_action)])
+
+    text = picker.title
+    if view.prefix:
+        text += f"\nФильтр: «{view.prefix}»"
+    if not rows and not recent:
+        text += "\n\nНичего не найдено"
+    elif navigation or view.prefix:
+        text += "\n\nОтправьте начало названия, чтобы отфильтровать список"
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+async def open_picker(update: Update, kind: str) -> None:
+    user_id = update.effective_user.id
+    view = open_pickers[user_id] = PickerView(kind)
+
+    rendered = await render_picker(user_id, view)
+    if rendered is None:
+        open_pickers.pop(user_id, None)
+        await update.callback_query.edit_message_text(PICKERS[kind].empty_text)
+        return
+
+    text, reply_markup = rendered
+    await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
+
+
+async def page_picker(update: Update, context: ContextTypes.DEFAULT_TYPE, kind: str, direction: str,
+                      cursor: str = "", prefix: str = "") -> None:
+    user_id = update.effective_user.id
+    paging = direction in ("next", "prev")
+    view = open_pickers[user_id] = PickerView(kind, prefix if paging else "")
+
+    rendered = None
+    if kind in PICKERS:
+        rendered = await render_picker(user_id, view, cursor if paging and cursor else None, direction == "prev")
+    if rendered is None:
+        open_pickers.pop(user_id, None)
+        await update.callback_query.edit_message_text("⌛ Список устарел, откройте его заново")
+        return
+
+    text, reply_markup = rendered
+    await update.callback_query.edit_message_text(text, reply_markup=reply_markup)
+
+
+async def filter_picker(update: Update, prefix: str) -> bool:
+    user_id = update.effective_user.id
+    view = open_pickers.get(user_id)
+    if view is None or "\n" in prefix:
+        return False
+
+    view.prefix = prefix.strip()[:64]
+    rendered = await render_picker(user_id, view)
+    if rendered is None:
+        return False
+
+    text, reply_markup = rendered
+    await update.message.reply_text(text, reply_markup=reply_markup)
+    return True
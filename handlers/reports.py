@@ -0,0 +1,190 @@
+import asyncio
+import html
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from cachetools import LRUCache
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import ContextTypes
+from services.database import get_sprint_version, get_sprint_tasks_summary, get_user_sprint_statistics
+from services.models import Task, TimeTotal
+from utils.formatting import paginate
+from utils.metrics import RENDER_CACHE
+from handlers.router import callback_data
+from handlers.throttle import remember_result
+
+SEPARATOR = "────────────────\n"
+
+render_cache = LRUCache(maxsize=1000)
+# cached_render runs in worker threads and cachetools caches are not thread-safe.
+render_lock = threading.Lock()
+
+
+def short_name(name: str) -> str:
+    return html.escape(name[:47] + "..." if len(name) > 50 else name)
+
+
+def assignee_lines(totals: List[TimeTotal], unit: str) -> List[str]:
+    if not totals:
+        return ["   Информации о логировании нет\n"]
+    lines = []
+    for total in totals:
+        user_name = html.escape(total.user_name or f"User {total.user_id}")
+        lines.append(f"   👤 {user_name}: {total.minutes / 60:.1f}{unit}\n")
+    return lines
+
+
+def render_all_tasks(tasks: List[Tuple[Task, List[TimeTotal]]]) -> List[str]:
+    blocks = []
+    for task, totals in tasks:
+        total_hours = sum(total.minutes for total in totals) / 60
+        estimate = f"{task.estimated_minutes / 60}h" if task.estimated_minutes else "NOT ESTIMATED"
+        blocks.append("".join([
+            f"🔹 <a href='{task.url}'>{short_name(task.name)}</a>\n",
+            f"   Статус: {task.status}\n",
+            f"   {total_hours:.1f}h / {estimate}\n",
+            *assignee_lines(totals, "h"),
+            SEPARATOR
+        ]))
+    return paginate("📋 <b>Все задачи спринта:</b>\n\n", blocks)
+
+
+def render_tasks_without_estimate(tasks: List[Tuple[Task, List[TimeTotal]]]) -> List[str]:
+    blocks = []
+    for task, totals in tasks:
+        total_hours = sum(total.minutes for total in totals) / 60
+        blocks.append("".join([
+            f"🔹 <a href='{task.url}'>{short_name(task.name)}</a>\n",
+            f"   Статус: {task.status}\n",
+            f"   {total_hours:.1f}h / NOT ESTIMATED\n",
+            *assignee_lines(totals, "ч"),
+            SEPARATOR
+        ]))
+    return paginate("📋 <b>Задачи спринта без оценки:</b>\n\n", blocks)
+
+
+def render_statistics(tasks: List[Tuple[Task, TimeTotal]]) -> List[str]:
+    blocks = []
+    total_estimated = 0.0
+    total_logged = 0.0
+
+    for task, total in tasks:
+        estimated_hours = task.estimated_minutes / 60 if task.estimated_minutes else 0
+        logged_hours = total.minutes / 60
+        total_estimated += estimated_hours
+        total_logged += logged_hours
+
+        estimate = f"{estimated_hours:.1f}h" if task.estimated_minutes else "NOT ESTIMATED"
+        blocks.append("".join([
+            f"🔹 <a href='{task.url}'>{short_name(task.name)}</a>\n",
+            f"   Статус: {task.status}\n",
+            f"   {logged_hours:.1f}h / {estimate}\n",
+            SEPARATOR
+        ]))
+
+    footer = f"\n<b>Итого:</b> {total_logged:.1f}h"
+    if total_estimated:
+        footer += f" / {total_estimated:.1f}h"
+    return paginate("📊 <b>Статистика пользователя:</b>\n\n", blocks, footer)
+
+
+def build_all_tasks(sprint_id: str) -> List[str]:
+    tasks = get_sprint_tasks_summary(sprint_id)
+    return render_all_tasks(tasks) if tasks else []
+
+
+def build_tasks_without_estimate(sprint_id: str) -> List[str]:
+    tasks = get_sprint_tasks_summary(sprint_id)
+    if not tasks:
+        return []
+    tasks_without_estimate = [(task, totals) for task, totals in tasks if not task.estimated_minutes]
+    if not tasks_without_estimate:
+        return ["✅ В спринте нет задач без оценки!"]
+    return render_tasks_without_estimate(tasks_without_estimate)
+
+
+def build_statistics(sprint_id: str, user_id: str) -> List[str]:
+    tasks = get_user_sprint_statistics(sprint_id, user_id)
+    return render_statistics(tasks) if tasks else []
+
+
+REPORT_BUILDERS: Dict[str, Callable[[str, Hashable], List[str]]] = {
+    "show_all_tasks": lambda sprint_id, scope: build_all_tasks(sprint_id),
+    "show_tasks_without_estimate": lambda sprint_id, scope: build_tasks_without_estimate(sprint_id),
+    "show_stats": build_statistics
+}
+
+
+def cached_render(report: str, sprint_id: str, scope: Hashable = None) -> List[str]:
+    version = get_sprint_version(sprint_id)
+    key = (report, sprint_id, scope)
+    with render_lock:
+        cached = render_cache.get(key)
+    if cached is not None and cached[0] == version and version >= 0:
+        RENDER_CACHE.inc(report, "hit")
+        return cached[1]
+
+    RENDER_CACHE.inc(report, "miss")
+    pages = REPORT_BUILDERS[report](sprint_id, scope)
+    if version >= 0:
+        with render_lock:
+            render_cache[key] = (version, pages)
+    return pages
+
+
+async def load_report(report: str, sprint_id: str, scope: Hashable = None) -> List[str]:
+    return await asyncio.to_thread(cached_render, report, sprint_id, scope)
+
+
+def page_text(pages: List[str], page: int) -> str:
+    if len(pages) == 1:
+        return pages[0]
+    return f"{pages[page]}\nСтр. {page + 1}/{len(pages)}"
+
+
+def page_markup(report: str, sprint_id: str, scope: Optional[str], page: int, total: int) -> InlineKeyboardMarkup:
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(
+            "◀", callback_data=callback_data("page", report, sprint_id, scope or "", str(page - 1))
+        ))
+    if page < total - 1:
+        navigation.append(InlineKeyboardButton(
+            "▶", callback_data=callback_data("page", report, sprint_id, scope or "", str(page + 1))
+        ))
+
+    keyboard = [navigation] if navigation else []
+    keyboard.append([InlineKeyboardButton("Вернуться в меню", callback_data="show_menu")])
+    return InlineKeyboardMarkup(keyboard)
+
+
+async def send_report(update: Update, report: str, pages: List[str], sprint_id: str,
+                      scope: Optional[str] = None) -> None:
+    user_id = update.effective_user.id
+    text = page_text(pages, 0)
+    reply_markup = page_markup(report, sprint_id, scope, 0, len(pages))
+    remember_result(user_id, report, text, reply_markup)
+    await update.callback_query.edit_message_text(
+        text,
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=reply_markup
+    )
+
+
+async def show_report_page(update: Update, context: ContextTypes.DEFAULT_TYPE, report: str, sprint_id: str,
+                           scope: str, page: str) -> None:
+    pages = await load_report(report, sprint_id, scope or None) if report in REPORT_BUILDERS else []
+    if not pages or not page.isdecimal():
+        await update.callback_query.edit_message_text(
+            "⌛ Отчёт устарел, откройте его заново",
+            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("Вернуться в меню", callback_data="show_menu")]])
+        )
+        return
+
+    page_number = max(0, min(int(page), len(pages) - 1))
+    await update.callback_query.edit_message_text(
+        page_text(pages, page_number),
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=page_markup(report, sprint_id, scope or None, page_number, len(pages))
+    )
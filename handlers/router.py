@@ -0,0 +1,141 @@
+import asyncio
+import inspect
+import itertools
+import os
+import re
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+from cachetools import TTLCache
+from services.state_backend import state_backend
+from utils.config import CALLBACK_STORE_SIZE, CALLBACK_STORE_TTL
+
+Handler = Callable[..., Awaitable[None]]
+LegacyParser = Callable[[str], Tuple[str, ...]]
+
+CALLBACK_VERSION = "1"
+ARG_SEPARATOR = "|"
+STORED_MARKER = "#"
+MAX_CALLBACK_BYTES = 64
+SAFE_ARG = re.compile(r"[A-Za-z0-9_.\-]*")
+BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+routes: Dict[str, Handler] = {}
+route_arity: Dict[str, Tuple[int, float]] = {}
+route_codes: Dict[str, str] = {}
+action_codes: Dict[str, str] = {}
+legacy_routes: Dict[str, Tuple[str, str, LegacyParser]] = {}
+
+payload_store = TTLCache(maxsize=CALLBACK_STORE_SIZE, ttl=CALLBACK_STORE_TTL)
+payload_ids = itertools.count(1)
+# Payloads rendered during one loop iteration are written to the state backend in a single batch.
+pending_payloads: Dict[str, Tuple[str, ...]] = {}
+flush_tasks: Set[asyncio.Task] = set()
+# Payloads are shared through the state backend, so keys must not collide across processes and restarts.
+payload_prefix = os.urandom(4).hex()
+
+
+def to_base36(number: int) -> str:
+    digits = []
+    while True:
+        number, remainder = divmod(number, 36)
+        digits.append(BASE36[remainder])
+        if not number:
+            return "".join(reversed(digits))
+
+
+def handler_arity(handler: Handler) -> Tuple[int, float]:
+    params = list(inspect.signature(handler).parameters.values())[2:]
+    if any(param.kind is param.VAR_POSITIONAL for param in params):
+        return 0, float("inf")
+    params = [param for param in params if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)]
+    return sum(param.default is param.empty for param in params), len(params)
+
+
+def register(action: str, handler: Handler, code: Optional[str] = None) -> None:
+    routes[action] = handler
+    route_arity[action] = handler_arity(handler)
+    if code is None:
+        return
+    if len(code) != 1 or route_codes.get(code, action) != action:
+        raise ValueError(f"Callback code {code!r} for {action} is invalid or already taken")
+    route_codes[code] = action
+    action_codes[action] = code
+
+
+def register_legacy(prefix: str, action: str, parser: LegacyParser = lambda rest: (rest,)) -> None:
+    legacy_routes[prefix.split("_", 1)[0]] = (prefix, action, parser)
+
+
+def callback_data(action: str, *args: str) -> str:
+    if not args:
+        return action
+
+    code = action_codes[action]
+    args = tuple(str(arg) for arg in args)
+    if all(SAFE_ARG.fullmatch(arg) for arg in args):
+        data = f"{CALLBACK_VERSION}{code}{ARG_SEPARATOR}{ARG_SEPARATOR.join(args)}"
+        if len(data) <= MAX_CALLBACK_BYTES:
+            return data
+
+    key = payload_prefix + to_base36(next(payload_ids))
+    payload_store[key] = args
+    store_payload(key, args)
+    return f"{CALLBACK_VERSION}{code}{STORED_MARKER}{key}"
+
+
+def store_payload(key: str, args: Tuple[str, ...]) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        state_backend.save_callback_payloads({key: args}, CALLBACK_STORE_TTL)
+        return
+
+    if not pending_payloads:
+        task = loop.create_task(flush_payloads())
+        flush_tasks.add(task)
+        task.add_done_callback(flush_tasks.discard)
+    pending_payloads[key] = args
+
+
+async def flush_payloads() -> None:
+    batch = dict(pending_payloads)
+    pending_payloads.clear()
+    await asyncio.to_thread(state_backend.save_callback_payloads, batch, CALLBACK_STORE_TTL)
+
+
+def route(action: str, args: Optional[Tuple[str, ...]]) -> Tuple[str, Optional[Handler], Tuple[str, ...]]:
+    if args is None:
+        return action, None, ()
+    low, high = route_arity[action]
+    if not low <= len(args) <= high:
+        return action, None, ()
+    return action, routes[action], args
+
+
+def load_payload(key: str) -> Optional[Tuple[str, ...]]:
+    args = payload_store.get(key)
+    if args is None:
+        args = state_backend.load_callback_payload(key)
+        if args is not None:
+            payload_store[key] = args
+    return args
+
+
+def resolve(data: str) -> Optional[Tuple[str, Optional[Handler], Tuple[str, ...]]]:
+    if data in routes:
+        return route(data, ())
+
+    if data[:1] == CALLBACK_VERSION:
+        action = route_codes.get(data[1:2])
+        if action is not None:
+            marker, body = data[2:3], data[3:]
+            if marker == ARG_SEPARATOR:
+                return route(action, tuple(body.split(ARG_SEPARATOR)))
+            if marker == STORED_MARKER:
+                return route(action, load_payload(body))
+
+    legacy = legacy_routes.get(data.split("_", 1)[0])
+    if legacy is not None and data.startswith(legacy[0]):
+        prefix, action, parser = legacy
+        return route(action, parser(data[len(prefix):]))
+
+    return None
@@ -0,0 +1,86 @@
+import asyncio
+from telegram import Update, InlineQueryResultArticle, InlineQueryResultsButton, InputTextMessageContent
+from telegram.ext import ContextTypes
+from services.conversation import ConversationState
+from services.database import search_tasks, get_cached_task
+from services.models import Task
+from services.user_manager import get_user_context, set_conversation_state
+from utils.logger import logger
+from utils.metrics import timed_handler
+from handlers.buttons import log_time_prompt
+from handlers.pickers import remember_pick
+
+INLINE_RESULTS_LIMIT = 20
+
+
+def describe_task(task: Task) -> str:
+    estimate = f"{task.estimated_minutes / 60:.1f}h" if task.estimated_minutes else "NOT ESTIMATED"
+    return f"{task.status} · {estimate}"
+
+
+@timed_handler
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    query = update.inline_query
+    context_data = get_user_context(query.from_user.id)
+    sprint_id = context_data.get("current_sprint")
+
+    if not sprint_id:
+        await query.answer(
+            [],
+            cache_time=5,
+            is_personal=True,
+            button=InlineQueryResultsButton(text="Сначала выберите спринт", start_parameter="context")
+        )
+        return
+
+    text = query.query.strip()
+    tasks = await asyncio.to_thread(search_tasks, text, sprint_id, INLINE_RESULTS_LIMIT) if text else []
+
+    results = [
+        InlineQueryResultArticle(
+            id=task.id,
+            title=task.name,
+            description=describe_task(task),
+            input_message_content=InputTextMessageContent(f"/log {task.id}")
+        )
+        for task in tasks
+    ]
+    await query.answer(results, cache_time=5, is_personal=True)
+
+
+@timed_handler
+async def log_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    context_data = get_user_context(user_id)
+
+    if not context.args:
+        await update.message.reply_text(
+            "Использование: /log <task_id>\n"
+            "Или найдите задачу прямо в чате: @имя_бота <часть названия>"
+        )
+        return
+
+    required = ["current_workspace", "current_sprint", "current_user"]
+    if not all(context_data.get(key) for key in required):
+        await update.message.reply_text("❌ Конфигурация не завершена! Настройте контекст: /context")
+        return
+
+    task_id = context.args[0]
+    task = await asyncio.to_thread(get_cached_task, task_id)
+    if not task:
+        logger.warning("User %s tried to log time to unknown task %s", user_id, task_id)
+        await update.message.reply_text("❌ Задача не найдена. Обновите задачи спринта через /menu")
+        return
+
+    state = ConversationState(
+        action="log_time",
+        task_id=task_id,
+        sprint_id=task.sprint_id or context_data["current_sprint"],
+        workspace_id=context_data["current_workspace"],
+        clickup_user_id=context_data["current_user"],
+        task_ids=frozenset([task_id])
+    )
+    set_conversation_state(user_id, state)
+    remember_pick(user_id, "task", task_id)
+
+    await update.message.reply_text(log_time_prompt(state, task_id))
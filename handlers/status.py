@@ -0,0 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
+from telegram import Update
+from telegram.ext import ContextTypes
+from utils.config import STATUS_MESSAGE_DELAY
+from utils.logger import logger
+
+
+@asynccontextmanager
+async def transient_status(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+    chat_id = update.effective_chat.id
+    sending = False
+
+    async def send_later():
+        nonlocal sending
+        await asyncio.sleep(STATUS_MESSAGE_DELAY)
+        sending = True
+        return await context.bot.send_message(chat_id=chat_id, text=text)
+
+    task = asyncio.create_task(send_later())
+    try:
+        yield
+    finally:
+        if not sending:
+            task.cancel()
+        else:
+            try:
+                message = await task
+                await context.bot.delete_message(chat_id=chat_id, message_id=message.message_id)
+            except Exception as e:
+                logger.error("Error removing status message: %s", e)
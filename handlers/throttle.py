@@ -0,0 +1,103 @@
+import time
+from typing import Dict, Hashable, Optional, Tuple
+from cachetools import TTLCache
+from telegram import Update, InlineKeyboardMarkup
+from services.user_manager import is_admin, get_user_context
+from handlers.background import running_jobs
+from utils.config import (
+    THROTTLE_BUCKET_CAPACITY,
+    THROTTLE_REFILL_PER_SECOND,
+    REFRESH_COOLDOWN,
+    VIEW_COOLDOWN
+)
+
+ACTION_COOLDOWNS: Dict[str, float] = {
+    "refresh_tasks": REFRESH_COOLDOWN,
+    "show_all_tasks": VIEW_COOLDOWN,
+    "show_tasks_without_estimate": VIEW_COOLDOWN,
+    "show_stats": VIEW_COOLDOWN
+}
+
+UNTHROTTLED_ACTIONS = {"job_cancel", "log_cancel", "cancel_estimate", "page", "pick"}
+
+user_buckets = TTLCache(maxsize=10000, ttl=600)
+last_action_at = TTLCache(maxsize=50000, ttl=max(ACTION_COOLDOWNS.values()))
+cached_results = TTLCache(maxsize=5000, ttl=max(ACTION_COOLDOWNS.values()))
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self) -> None:
+        self.tokens = float(THROTTLE_BUCKET_CAPACITY)
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(THROTTLE_BUCKET_CAPACITY, self.tokens + (now - self.updated_at) * THROTTLE_REFILL_PER_SECOND)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def action_key(user_id: int, action: str) -> Hashable:
+    context_data = get_user_context(user_id)
+    return user_id, action, context_data.get("current_sprint"), context_data.get("current_user")
+
+
+def remember_result(user_id: int, action: str, text: str, reply_markup: Optional[InlineKeyboardMarkup]) -> None:
+    if action in ACTION_COOLDOWNS:
+        cached_results[action_key(user_id, action)] = (text, reply_markup)
+
+
+async def apply_throttle(update: Update, action: str) -> bool:
+    query = update.callback_query
+    user_id = query.from_user.id
+
+    if action in UNTHROTTLED_ACTIONS or is_admin(user_id):
+        return False
+
+    if (user_id, action) in running_jobs and not running_jobs[(user_id, action)].done():
+        await query.answer("⏳ Уже выполняется, подождите...")
+        return True
+
+    bucket = user_buckets.get(user_id)
+    if bucket is None:
+        bucket = user_buckets[user_id] = TokenBucket()
+    if not bucket.take():
+        await query.answer("🐢 Слишком много нажатий, подождите немного")
+        return True
+
+    cooldown = ACTION_COOLDOWNS.get(action)
+    if cooldown is None:
+        return False
+
+    key = action_key(user_id, action)
+    now = time.monotonic()
+    started_at = last_action_at.get(key)
+    if started_at is None or now - started_at >= cooldown:
+        last_action_at[key] = now
+        return False
+
+    await answer_suppressed(update, key, int(now - started_at))
+    return True
+
+
+async def answer_suppressed(update: Update, key: Tuple, elapsed: int) -> None:
+    query = update.callback_query
+    cached = cached_results.get(key)
+
+    if cached is None:
+        await query.answer(f"✅ Уже выполнено {elapsed} с назад, данные актуальны")
+        return
+
+    await query.answer()
+    text, reply_markup = cached
+    await query.edit_message_text(
+        text,
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=reply_markup
+    )
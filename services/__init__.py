@@ -11,30 +11,37 @@ from .database import (
     init_db,
     log_time_locally,
     get_task_time_for_user,
-    cache_task,
+    cache_sprint_tasks,
     get_sprint_tasks_from_cache,
-    get_all_tasks_in_sprint_with_time,
     get_sprint_tasks_summary,
+    get_sprint_version,
     change_task_estimate,
     get_user_sprint_statistics
 )
 
-from .time_utils import parse_time_input
+from .models import Workspace, Sprint, Member, Task, TimeTotal
+from .time_utils import parse_time_input, parse_time_inputs, split_duration
 from .user_manager import (
     set_application,
     get_application,
     set_shutting_down,
     get_shutting_down,
     is_admin,
-    load_user_data,
     save_user_data,
     save_user_data_if_dirty,
+    flush_conversation_state,
+    restore_conversation_state,
+    get_conversation_state,
+    set_conversation_state,
+    clear_conversation_state,
     update_user_context,
+    update_user_context_fields,
     get_user_context,
     stop_application
 )
 
-from .tasks import auto_save_task
+from .tasks import auto_save_task, conversation_flush_task, state_sync_task, state_maintenance_task, sprint_sync_task
+from .state_backend import state_backend
 
 __all__ = [
     # ClickUp
@@ -49,15 +56,24 @@ __all__ = [
     'init_db',
     'log_time_locally',
     'get_task_time_for_user',
-    'cache_task',
+    'cache_sprint_tasks',
     'get_sprint_tasks_from_cache',
-    'get_all_tasks_in_sprint_with_time',
     'get_sprint_tasks_summary',
+    'get_sprint_version',
     'change_task_estimate',
     'get_user_sprint_statistics',
 
+    # Models
+    'Workspace',
+    'Sprint',
+    'Member',
+    'Task',
+    'TimeTotal',
+
     # Time utils
     'parse_time_input',
+    'parse_time_inputs',
+    'split_duration',
 
     # User manager
     'set_application',
@@ -65,13 +81,25 @@ __all__ = [
     'set_shutting_down',
     'get_shutting_down',
     'is_admin',
-    'load_user_data',
     'save_user_data',
     'save_user_data_if_dirty',
+    'flush_conversation_state',
+    'restore_conversation_state',
+    'get_conversation_state',
+    'set_conversation_state',
+    'clear_conversation_state',
     'update_user_context',
+    'update_user_context_fields',
     'get_user_context',
     'stop_application',
 
     # Tasks
-    'auto_save_task'
+    'auto_save_task',
+    'conversation_flush_task',
+    'state_sync_task',
+    'state_maintenance_task',
+    'sprint_sync_task',
+
+    # State backend
+    'state_backend'
 ]
\ No newline at end of file
@@ -0,0 +1,63 @@
+import re
+from typing import List, Optional
+from services.models import Task
+from services.task_index import resolve_task_ref
+from services.time_utils import split_duration
+
+MAX_LINE_MINUTES = 24 * 60
+MAX_BULK_LINES = 50
+BARE_NUMBER = re.compile(r"[0-9]+(?:[.,][0-9]+)?")
+
+
+class BulkEntry:
+    __slots__ = ("line_number", "text", "task", "minutes", "error")
+
+    def __init__(self, line_number: int, text: str) -> None:
+        self.line_number = line_number
+        self.text = text
+        self.task: Optional[Task] = None
+        self.minutes = 0.0
+        self.error: Optional[str] = None
+
+
+def looks_like_entry(line: str, explicit_unit: bool = False) -> bool:
+    line = line.strip()
+    ref, duration_ms = split_duration(line)
+    if not ref or not duration_ms or duration_ms <= 0:
+        return False
+    return not explicit_unit or not BARE_NUMBER.fullmatch(line.split()[-1])
+
+
+def parse_bulk(text: str, sprint_id: str) -> List[BulkEntry]:
+    entries = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        entry = BulkEntry(line_number, line)
+        entries.append(entry)
+        if line_number > MAX_BULK_LINES:
+            entry.error = f"не больше {MAX_BULK_LINES} строк в сообщении"
+            continue
+
+        ref, duration_ms = split_duration(line)
+        if not duration_ms or duration_ms <= 0:
+            entry.error = "не распознано время"
+            continue
+        if duration_ms / 60000.0 > MAX_LINE_MINUTES:
+            entry.error = "больше 24 ч в одной строке"
+            continue
+
+        task, candidates = resolve_task_ref(sprint_id, ref)
+        if task is None:
+            if candidates:
+                names = ", ".join(candidate.name[:30] for candidate in candidates[:3])
+                entry.error = f"неоднозначно: {names}"
+            else:
+                entry.error = "задача не найдена"
+            continue
+
+        entry.task = task
+        entry.minutes = duration_ms / 60000.0
+    return entries
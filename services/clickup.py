@@ -1,25 +1,136 @@
+import asyncio
 import httpx
 import functools
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
 from cachetools import TTLCache
-from utils.config import CLICKUP_API_TOKEN
+from utils.config import CLICKUP_API_TOKEN, CLICKUP_CACHE_SIZE
 from utils.logger import logger
-from typing import List, Dict
+from utils.metrics import CLICKUP_CACHE, CLICKUP_DURATION, PREFETCH_RESULTS, timed
+from utils.tracing import span, traced
+from services.models import (
+    Member, Sprint, Task, Workspace,
+    member_from_clickup, sprint_from_clickup, task_from_clickup, workspace_from_clickup
+)
+
+TASKS_PER_PAGE = 100
+MAX_TASK_PAGES = 50
+
+cache = TTLCache(maxsize=CLICKUP_CACHE_SIZE, ttl=300)
+inflight: Dict[Hashable, asyncio.Task] = {}
+inflight_waiters: Dict[Hashable, int] = {}
+prefetching: ContextVar[bool] = ContextVar("prefetching", default=False)
+# Set by callers that pay for requests out of a budget; awaited before every page after the first.
+page_budget: ContextVar[Optional[Callable[[], Awaitable[None]]]] = ContextVar("page_budget", default=None)
+prefetched_keys = TTLCache(maxsize=CLICKUP_CACHE_SIZE, ttl=300)
+prefetch_pending: Set[Hashable] = set()
+
+
+def record_prefetch_use(func_name: str, key: Hashable) -> None:
+    if prefetching.get():
+        return
+    if prefetched_keys.pop(key, None) or key in prefetch_pending:
+        prefetch_pending.discard(key)
+        PREFETCH_RESULTS.inc(func_name, "used")
 
-cache = TTLCache(maxsize=100, ttl=300)
 
 def cache_async(func):
+    async def fetch(key: Hashable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        try:
+            result = await func(*args, **kwargs)
+            # An invalidation while the request was in flight unregisters it; its result is stale then.
+            if result and inflight.get(key) is asyncio.current_task():
+                cache[key] = result
+                if prefetching.get():
+                    PREFETCH_RESULTS.inc(func.__name__, "warmed")
+                    if key in prefetch_pending:
+                        prefetched_keys[key] = True
+            return result
+        finally:
+            prefetch_pending.discard(key)
+            if inflight.get(key) is asyncio.current_task():
+                del inflight[key]
+
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
         key = (func.__name__, args, tuple(kwargs.items()))
         if key in cache:
-            return cache[key]
-        result = await func(*args, **kwargs)
-        cache[key] = result
-        return result
+            CLICKUP_CACHE.inc(func.__name__, "hit")
+            record_prefetch_use(func.__name__, key)
+            with span(f"clickup.{func.__name__}", cache="hit"):
+                return cache[key]
+
+        task = inflight.get(key)
+        if task is None:
+            CLICKUP_CACHE.inc(func.__name__, "miss")
+            task = inflight[key] = asyncio.ensure_future(fetch(key, args, kwargs))
+            if prefetching.get():
+                prefetch_pending.add(key)
+            outcome = "miss"
+        else:
+            CLICKUP_CACHE.inc(func.__name__, "joined")
+            record_prefetch_use(func.__name__, key)
+            outcome = "joined"
+
+        inflight_waiters[key] = inflight_waiters.get(key, 0) + 1
+        try:
+            with span(f"clickup.{func.__name__}", cache=outcome, args=repr(args)):
+                return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if inflight_waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            inflight_waiters[key] -= 1
+            if not inflight_waiters[key]:
+                del inflight_waiters[key]
     return wrapper
 
+
+def invalidate_cached(func_name: str, *args) -> None:
+    key = (func_name, args, ())
+    cache.pop(key, None)
+    inflight.pop(key, None)
+
+
+def is_cached(func_name: str, *args) -> bool:
+    return (func_name, args, ()) in cache
+
+
+def peek_cached(func_name: str, *args) -> Optional[Any]:
+    key = (func_name, args, ())
+    result = cache.get(key)
+    if result is not None:
+        CLICKUP_CACHE.inc(func_name, "hit")
+        record_prefetch_use(func_name, key)
+    return result
+
+async def fetch_list_tasks(client: httpx.AsyncClient, list_id: str, params: Dict[str, str]) -> List[Task]:
+    tasks = []
+    for page in range(MAX_TASK_PAGES):
+        charge = page_budget.get()
+        if page and charge is not None:
+            await charge()
+        response = await client.get(
+            f"https://api.clickup.com/api/v2/list/{list_id}/task",
+            params={**params, "page": page},
+            headers={"Authorization": CLICKUP_API_TOKEN},
+            timeout=15.0
+        )
+        response.raise_for_status()
+        data = response.json()
+        page_tasks = data.get("tasks", [])
+        tasks.extend(task_from_clickup(task, list_id) for task in page_tasks)
+        last_page = data.get("last_page")
+        if last_page or (last_page is None and len(page_tasks) < TASKS_PER_PAGE):
+            return tasks
+    logger.warning("List %s has more than %s task pages, the rest is skipped", list_id, MAX_TASK_PAGES)
+    return tasks
+
+
 @cache_async
-async def get_clickup_teams() -> List[Dict]:
+@timed(CLICKUP_DURATION, "get_clickup_teams")
+async def get_clickup_teams() -> List[Workspace]:
     if not CLICKUP_API_TOKEN:
         logger.error("ClickUp API token not configured!")
         return []
@@ -32,15 +143,16 @@ async def get_clickup_teams() -> List[Dict]:
             )
             response.raise_for_status()
             data = response.json()
-            return data.get("teams", [])
+            return [workspace_from_clickup(team) for team in data.get("teams", [])]
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error getting workspaces: {e.response.status_code}")
+        logger.error("HTTP error getting workspaces: %s", e.response.status_code)
     except Exception as e:
-        logger.exception(f"Error getting workspaces: {e}")
+        logger.exception("Error getting workspaces: %s", e)
     return []
 
 @cache_async
-async def get_clickup_sprints(workspace_id: str) -> List[Dict]:
+@timed(CLICKUP_DURATION, "get_clickup_sprints")
+async def get_clickup_sprints(workspace_id: str) -> List[Sprint]:
     if not CLICKUP_API_TOKEN:
         logger.error("ClickUp API token not configured!")
         return []
@@ -61,7 +173,7 @@ async def get_clickup_sprints(workspace_id: str) -> List[Dict]:
                     break
 
             if not sprint_folder:
-                logger.error(f"Sprint folder not found in workspace {workspace_id}")
+                logger.error("Sprint folder not found in workspace %s", workspace_id)
                 return []
 
             lists_response = await client.get(
@@ -71,24 +183,16 @@ async def get_clickup_sprints(workspace_id: str) -> List[Dict]:
             lists_response.raise_for_status()
             sprint_lists = lists_response.json().get("lists", [])
 
-            sprints = []
-            for list_item in sprint_lists:
-                sprints.append({
-                    "id": list_item["id"],
-                    "name": list_item.get("name", f"Sprint {list_item['id']}"),
-                    "folder_id": sprint_folder['id'],
-                    "folder_name": sprint_folder['name']
-                })
-
-            return sprints
+            return [sprint_from_clickup(list_item, sprint_folder) for list_item in sprint_lists]
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error getting sprints: {e.response.status_code}")
+        logger.error("HTTP error getting sprints: %s", e.response.status_code)
     except Exception as e:
-        logger.exception(f"Error getting sprints: {e}")
+        logger.exception("Error getting sprints: %s", e)
     return []
 
 @cache_async
-async def get_clickup_list_members(list_id: str) -> List[Dict]:
+@timed(CLICKUP_DURATION, "get_clickup_list_members")
+async def get_clickup_list_members(list_id: str) -> List[Member]:
     if not CLICKUP_API_TOKEN:
         logger.error("ClickUp API token not configured!")
         return []
@@ -102,69 +206,57 @@ async def get_clickup_list_members(list_id: str) -> List[Dict]:
             )
             response.raise_for_status()
             data = response.json()
-            return data.get("members", [])
+            return [member_from_clickup(member) for member in data.get("members", [])]
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error getting members: {e.response.status_code}")
+        logger.error("HTTP error getting members: %s", e.response.status_code)
     except httpx.RequestError as e:
-        logger.error(f"Network error getting members: {e}")
+        logger.error("Network error getting members: %s", e)
     except Exception as e:
-        logger.exception(f"Unknown error getting members: {e}")
+        logger.exception("Unknown error getting members: %s", e)
     return []
 
 @cache_async
-async def get_all_user_tasks_in_sprint(sprint_id: str, user_id: str) -> List[Dict]:
+@timed(CLICKUP_DURATION, "get_all_user_tasks_in_sprint")
+async def get_all_user_tasks_in_sprint(sprint_id: str, user_id: str) -> List[Task]:
     if not CLICKUP_API_TOKEN:
         logger.error("ClickUp API token not configured!")
         return []
 
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.clickup.com/api/v2/list/{sprint_id}/task",
-                params={
-                    "include_closed": "true",
-                    "subtasks": "true",
-                    "assignees[]": user_id
-                },
-                headers={"Authorization": CLICKUP_API_TOKEN},
-                timeout=15.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("tasks", [])
+            return await fetch_list_tasks(client, sprint_id, {
+                "include_closed": "true",
+                "subtasks": "true",
+                "assignees[]": user_id
+            })
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error getting tasks: {e.response.status_code} - {e.response.text}")
+        logger.error("HTTP error getting tasks: %s - %s", e.response.status_code, e.response.text)
     except httpx.RequestError as e:
-        logger.error(f"Network error getting tasks: {e}")
+        logger.error("Network error getting tasks: %s", e)
     except Exception as e:
-        logger.exception(f"Unknown error getting tasks: {e}")
+        logger.exception("Unknown error getting tasks: %s", e)
     return []
 
 @cache_async
-async def get_all_tasks_in_sprint(sprint_id: str) -> List[Dict]:
+@timed(CLICKUP_DURATION, "get_all_tasks_in_sprint")
+async def get_all_tasks_in_sprint(sprint_id: str) -> List[Task]:
     if not CLICKUP_API_TOKEN:
         logger.error("ClickUp API token not configured!")
         return []
 
     try:
         async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.clickup.com/api/v2/list/{sprint_id}/task",
-                params={
-                    "include_closed": "true",
-                    "subtasks": "true"
-                },
-                headers={"Authorization": CLICKUP_API_TOKEN},
-                timeout=15.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("tasks", [])
+            return await fetch_list_tasks(client, sprint_id, {
+                "include_closed": "true",
+                "subtasks": "true"
+            })
     except Exception as e:
-        logger.exception(f"Error getting tasks: {e}")
+        logger.exception("Error getting tasks: %s", e)
     return []
 
 
+@traced("clickup.put_new_task_estimate")
+@timed(CLICKUP_DURATION, "put_new_task_estimate")
 async def put_new_task_estimate(task_id: str, estimate_minutes: float) -> bool:
     if not CLICKUP_API_TOKEN:
         logger.error("ClickUp API token not configured!")
@@ -184,7 +276,7 @@ async def put_new_task_estimate(task_id: str, estimate_minutes: float) -> bool:
 
             return True
     except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error updating task estimate: {e.response.status_code} - {e.response.text}")
+        logger.error("HTTP error updating task estimate: %s - %s", e.response.status_code, e.response.text)
     except Exception as e:
-        logger.exception(f"Error updating task estimate: {e}")
+        logger.exception("Error updating task estimate: %s", e)
     return False
\ No newline at end of file
@@ -0,0 +1,90 @@
+from typing import Optional, FrozenSet, Set, Tuple
+from cachetools import TTLCache
+
+
+class ConversationState:
+    __slots__ = ("action", "task_id", "sprint_id", "workspace_id", "clickup_user_id", "task_ids")
+
+    def __init__(
+        self,
+        action: str,
+        task_id: Optional[str] = None,
+        sprint_id: Optional[str] = None,
+        workspace_id: Optional[str] = None,
+        clickup_user_id: Optional[str] = None,
+        task_ids: FrozenSet[str] = frozenset()
+    ) -> None:
+        self.action = action
+        self.task_id = task_id
+        self.sprint_id = sprint_id
+        self.workspace_id = workspace_id
+        self.clickup_user_id = clickup_user_id
+        self.task_ids = task_ids
+
+    def to_row(self) -> Tuple:
+        return (
+            self.action,
+            self.task_id,
+            self.sprint_id,
+            self.workspace_id,
+            self.clickup_user_id,
+            " ".join(self.task_ids)
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "ConversationState":
+        action, task_id, sprint_id, workspace_id, clickup_user_id, task_ids = row
+        return cls(
+            action=action,
+            task_id=task_id,
+            sprint_id=sprint_id,
+            workspace_id=workspace_id,
+            clickup_user_id=clickup_user_id,
+            task_ids=frozenset(task_ids.split()) if task_ids else frozenset()
+        )
+
+
+class ConversationStore(TTLCache):
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evicted = 0
+        self.expired = 0
+        self.dirty: Set[int] = set()
+        self.removed: Set[int] = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+        self.removed.discard(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.removed.add(key)
+        self.dirty.discard(key)
+
+    def load(self, key, value) -> None:
+        TTLCache.__setitem__(self, key, value)
+
+    def forget(self, key) -> None:
+        if key in self and key not in self.dirty:
+            TTLCache.__delitem__(self, key)
+
+    def popitem(self):
+        item = super().popitem()
+        self.evicted += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expired += len(expired)
+        for key, _ in expired:
+            self.removed.add(key)
+            self.dirty.discard(key)
+        return expired
+
+    def take_changes(self) -> Tuple[dict, Set[int]]:
+        changed = {key: self[key] for key in self.dirty if key in self}
+        removed = self.removed | (self.dirty - changed.keys())
+        self.dirty = set()
+        self.removed = set()
+        return changed, removed
@@ -1,43 +1,84 @@
+import json
+import re
 import sqlite3
 import threading
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any, Iterable, Tuple
+from services.models import Task, TimeTotal, row_factory
 from utils.config import DB_FILE
 from utils.logger import logger
-
-db_lock = threading.RLock()
-
-
+from utils.metrics import TimedLock, timed_query
+
+db_lock = TimedLock(threading.RLock())
+
+SEARCH_TERM = re.compile(r"\w+")
+SEARCH_RECENCY_WEIGHT = 2.0
+SEARCH_CANDIDATES = 200
+
+BUMP_SPRINT_VERSION = """
+    INSERT INTO sprint_versions (sprint_id, version) VALUES (?, 1)
+    ON CONFLICT(sprint_id) DO UPDATE SET version = version + 1
+"""
+
+BUMP_TASK_SPRINT_VERSION = """
+    INSERT INTO sprint_versions (sprint_id, version)
+    SELECT sprint_id, 1 FROM tasks WHERE task_id = ? AND sprint_id IS NOT NULL
+    ON CONFLICT(sprint_id) DO UPDATE SET version = version + 1
+"""
+
+UPSERT_TASK = """
+    INSERT INTO tasks (
+        task_id, name, url, status,
+        workspace_id, sprint_id,
+        estimated_minutes, last_updated
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(task_id) DO UPDATE SET
+        name = excluded.name,
+        url = excluded.url,
+        status = excluded.status,
+        workspace_id = excluded.workspace_id,
+        sprint_id = excluded.sprint_id,
+        estimated_minutes = excluded.estimated_minutes,
+        last_updated = excluded.last_updated
+    WHERE (name, url, status, workspace_id, sprint_id, estimated_minutes)
+        IS NOT (excluded.name, excluded.url, excluded.status,
+                excluded.workspace_id, excluded.sprint_id, excluded.estimated_minutes)
+"""
+
+# The integer id keeps the rowids that tasks_fts points to stable across VACUUM.
+CREATE_TASKS = """
+    CREATE TABLE IF NOT EXISTS {table}
+    (
+        id INTEGER PRIMARY KEY,
+        task_id TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        url TEXT,
+        status TEXT,
+        workspace_id TEXT,
+        sprint_id TEXT,
+        estimated_minutes REAL,
+        last_updated REAL
+    )
+"""
+
+TASK_COLUMNS = "task_id, name, url, status, workspace_id, sprint_id, estimated_minutes, last_updated"
+
+task_row = row_factory(Task)
+time_total_row = row_factory(TimeTotal)
+
+
+def task_total_row(cursor: sqlite3.Cursor, row: tuple) -> Tuple[Task, TimeTotal]:
+    return Task(*row[:6]), TimeTotal(row[0], *row[6:])
+
+
+@timed_query
 def init_db() -> None:
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
             cursor = conn.cursor()
 
-            cursor.execute("""
-                           CREATE TABLE IF NOT EXISTS tasks
-                           (
-                               task_id
-                               TEXT
-                               PRIMARY
-                               KEY,
-                               name
-                               TEXT
-                               NOT
-                               NULL,
-                               url
-                               TEXT,
-                               status
-                               TEXT,
-                               workspace_id
-                               TEXT,
-                               sprint_id
-                               TEXT,
-                               estimated_minutes
-                               REAL,
-                               last_updated
-                               REAL
-                           )
-                           """)
+            migrate_task_ids(cursor)
+            cursor.execute(CREATE_TASKS.format(table="tasks"))
 
             cursor.execute("""
                            CREATE TABLE IF NOT EXISTS task_time
@@ -74,12 +115,149 @@ def init_db() -> None:
                                )
                            """)
 
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_tasks_sprint_name
+                ON tasks (sprint_id, name COLLATE NOCASE, task_id)
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sprint_versions
+                (
+                    sprint_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS task_usage
+                (
+                    task_id TEXT PRIMARY KEY,
+                    last_used REAL NOT NULL
+                )
+            """)
+
+            init_task_search(cursor)
+
+            cursor.execute("PRAGMA journal_mode=WAL").fetchone()
+
             conn.commit()
             logger.info("Database initialized successfully")
     except sqlite3.Error as e:
-        logger.error(f"Database initialization failed: {e}")
+        logger.error("Database initialization failed: %s", e)
+
+    init_state_db(DB_FILE)
+
+
+def migrate_task_ids(cursor: sqlite3.Cursor) -> None:
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(tasks)")]
+    if not columns or "id" in columns:
+        return
+
+    logger.info("Migrating tasks to an integer primary key")
+    cursor.execute("DROP TABLE IF EXISTS tasks_fts")
+    cursor.execute(CREATE_TASKS.format(table="tasks_migrated"))
+    cursor.execute(f"INSERT INTO tasks_migrated ({TASK_COLUMNS}) SELECT {TASK_COLUMNS} FROM tasks ORDER BY rowid")
+    cursor.execute("DROP TABLE tasks")
+    cursor.execute("ALTER TABLE tasks_migrated RENAME TO tasks")
+
+
+def init_task_search(cursor: sqlite3.Cursor) -> None:
+    exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone()
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            name, sprint_id,
+            content = 'tasks', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, name, sprint_id) VALUES (new.id, new.name, new.sprint_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, sprint_id) VALUES ('delete', old.id, old.name, old.sprint_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, sprint_id ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, sprint_id) VALUES ('delete', old.id, old.name, old.sprint_id);
+            INSERT INTO tasks_fts (rowid, name, sprint_id) VALUES (new.id, new.name, new.sprint_id);
+        END
+    """)
+
+    if not exists:
+        cursor.execute("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('rank', 'bm25(1.0, 0.0)')")
+        cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+@timed_query
+def init_state_db(db_file: str) -> None:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS user_contexts
+                (
+                    user_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_state
+                (
+                    user_id INTEGER PRIMARY KEY,
+                    action TEXT NOT NULL,
+                    task_id TEXT,
+                    sprint_id TEXT,
+                    workspace_id TEXT,
+                    clickup_user_id TEXT,
+                    task_ids TEXT,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS state_invalidations
+                (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS callback_payloads
+                (
+                    key TEXT PRIMARY KEY,
+                    args TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS state_leases
+                (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+            cursor.execute("PRAGMA journal_mode=WAL").fetchone()
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error("State database initialization failed: %s", e)
 
 
+@timed_query
 def log_time_locally(task_id: str, user_id: str, user_name: str, duration_minutes: float) -> bool:
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
@@ -90,13 +268,53 @@ def log_time_locally(task_id: str, user_id: str, user_name: str, duration_minute
                              total_minutes = total_minutes + excluded.total_minutes,
                              user_name = excluded.user_name
                          """, (task_id, user_id, user_name, duration_minutes))
+            conn.execute(BUMP_TASK_SPRINT_VERSION, (task_id,))
+            conn.execute("""
+                INSERT INTO task_usage (task_id, last_used) VALUES (?, ?)
+                ON CONFLICT(task_id) DO UPDATE SET last_used = excluded.last_used
+            """, (task_id, time.time()))
             conn.commit()
             return True
     except sqlite3.Error as e:
-        logger.error(f"Error logging time: {e}")
+        logger.error("Error logging time: %s", e)
         return False
 
 
+@timed_query
+def log_time_bulk(entries: List[Tuple[str, float]], user_id: str, user_name: str) -> Optional[Dict[str, float]]:
+    task_ids = sorted({task_id for task_id, _ in entries})
+    now = time.time()
+    try:
+        with db_lock, sqlite3.connect(DB_FILE) as conn:
+            conn.executemany("""
+                INSERT INTO task_time (task_id, user_id, user_name, total_minutes)
+                VALUES (?, ?, ?, ?) ON CONFLICT(task_id, user_id) DO
+                UPDATE SET
+                    total_minutes = total_minutes + excluded.total_minutes,
+                    user_name = excluded.user_name
+            """, [(task_id, user_id, user_name, minutes) for task_id, minutes in entries])
+            conn.execute(f"""
+                INSERT INTO sprint_versions (sprint_id, version)
+                SELECT DISTINCT sprint_id, 1 FROM tasks
+                WHERE task_id IN ({', '.join('?' * len(task_ids))}) AND sprint_id IS NOT NULL
+                ON CONFLICT(sprint_id) DO UPDATE SET version = version + 1
+            """, task_ids)
+            conn.executemany("""
+                INSERT INTO task_usage (task_id, last_used) VALUES (?, ?)
+                ON CONFLICT(task_id) DO UPDATE SET last_used = excluded.last_used
+            """, [(task_id, now) for task_id in task_ids])
+            totals = dict(conn.execute(f"""
+                SELECT task_id, total_minutes FROM task_time
+                WHERE user_id = ? AND task_id IN ({', '.join('?' * len(task_ids))})
+            """, [user_id, *task_ids]).fetchall())
+            conn.commit()
+            return totals
+    except sqlite3.Error as e:
+        logger.error("Error logging %s time entries: %s", len(entries), e)
+        return None
+
+
+@timed_query
 def get_task_time_for_user(task_id: str, user_id: str) -> float:
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
@@ -110,185 +328,220 @@ def get_task_time_for_user(task_id: str, user_id: str) -> float:
             result = cursor.fetchone()
             return result[0] if result else 0.0
     except sqlite3.Error as e:
-        logger.error(f"Error fetching task time: {e}")
+        logger.error("Error fetching task time: %s", e)
         return 0.0
 
 
-def cache_task(task_data: dict) -> None:
+@timed_query
+def cache_sprint_tasks(tasks: List[Task], workspace_id: str, sprint_id: str) -> bool:
+    now = time.time()
+    rows = [
+        (task.id, task.name, task.url, task.status, workspace_id, sprint_id, task.estimated_minutes, now)
+        for task in tasks
+    ]
+
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
-            conn.execute("""
-            INSERT OR REPLACE INTO tasks (
-                task_id, name, url, status, 
-                workspace_id, sprint_id, 
-                estimated_minutes, last_updated
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                task_data["id"],
-                task_data.get("name", ""),
-                task_data.get("url", ""),
-                task_data.get("status", "unknown"),
-                task_data.get("workspace_id"),
-                task_data.get("sprint_id"),
-                task_data.get("estimated_minutes", 0),
-                time.time()
-            ))
+            conn.executemany(UPSERT_TASK, rows)
+            if conn.total_changes:
+                conn.execute(BUMP_SPRINT_VERSION, (sprint_id,))
             conn.commit()
+            return True
     except sqlite3.Error as e:
-        logger.error(f"Error caching task: {e}")
+        logger.error("Error caching %s tasks for sprint %s: %s", len(rows), sprint_id, e)
+        return False
+
 
+@timed_query
+def get_sprint_tasks_page(
+    sprint_id: str,
+    prefix: str = "",
+    cursor: Optional[Tuple[str, str]] = None,
+    backwards: bool = False,
+    limit: int = 10,
+    exclude: Iterable[str] = ()
+) -> List[Tuple[str, str, Optional[float]]]:
+    exclude = list(exclude)
+    conditions = ["sprint_id = ?"]
+    params: List[Any] = [sprint_id]
+    if prefix:
+        conditions.append("substr(casefold(name), 1, ?) = ?")
+        params.extend([len(prefix.casefold()), prefix.casefold()])
+    if cursor:
+        conditions.append(f"(name COLLATE NOCASE, task_id) {'<' if backwards else '>'} (?, ?)")
+        params.extend(cursor)
+    if exclude:
+        conditions.append(f"task_id NOT IN ({', '.join('?' * len(exclude))})")
+        params.extend(exclude)
+    order = "DESC" if backwards else "ASC"
+    params.append(limit)
 
-def get_sprint_tasks_from_cache(sprint_id: str) -> List[Dict]:
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                           SELECT task_id,
-                                  name,
-                                  url,
-                                  status,
-                                  estimated_minutes
-                           FROM tasks
-                           WHERE sprint_id = ?
-                           """, (sprint_id,))
-
-            return [{
-                "id": row[0],
-                "name": row[1],
-                "url": row[2],
-                "status": row[3],
-                "estimated_minutes": row[4]
-            } for row in cursor.fetchall()]
+            conn.create_function("casefold", 1, str.casefold, deterministic=True)
+            rows = conn.execute(f"""
+                SELECT name, task_id, estimated_minutes
+                FROM tasks
+                WHERE {' AND '.join(conditions)}
+                ORDER BY name COLLATE NOCASE {order}, task_id {order}
+                LIMIT ?
+            """, params).fetchall()
+            return rows[::-1] if backwards else rows
     except sqlite3.Error as e:
-        logger.error(f"Error fetching sprint tasks: {e}")
+        logger.error("Error fetching sprint tasks page: %s", e)
         return []
 
 
-def get_all_tasks_in_sprint_with_time(sprint_id: str) -> List[Dict]:
+@timed_query
+def get_sprint_tasks_by_ids(sprint_id: str, task_ids: List[str]) -> List[Tuple[str, str, Optional[float]]]:
+    if not task_ids:
+        return []
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                           SELECT t.task_id,
-                                  t.name,
-                                  t.url,
-                                  t.status,
-                                  t.estimated_minutes
-                           FROM tasks t
-                           WHERE t.sprint_id = ?
-                           """, (sprint_id,))
-
-            tasks = []
-            for row in cursor.fetchall():
-                task = {
-                    "id": row[0],
-                    "name": row[1],
-                    "url": row[2],
-                    "status": row[3],
-                    "estimated_minutes": row[4]
-                }
-
-                cursor.execute("""
-                               SELECT user_id,
-                                      user_name,
-                                      total_minutes
-                               FROM task_time
-                               WHERE task_id = ?
-                               """, (row[0],))
-
-                task["assignees"] = [{
-                    "user_id": a_row[0],
-                    "user_name": a_row[1],
-                    "minutes": a_row[2]
-                } for a_row in cursor.fetchall()]
-
-                tasks.append(task)
-
-            return tasks
+            rows = conn.execute(f"""
+                SELECT name, task_id, estimated_minutes
+                FROM tasks
+                WHERE sprint_id = ? AND task_id IN ({', '.join('?' * len(task_ids))})
+            """, [sprint_id, *task_ids]).fetchall()
+            order = {task_id: position for position, task_id in enumerate(task_ids)}
+            return sorted(rows, key=lambda row: order[row[1]])
     except sqlite3.Error as e:
-        logger.error(f"Error fetching sprint tasks with time: {e}")
+        logger.error("Error fetching sprint tasks by id: %s", e)
         return []
 
 
-def get_sprint_tasks_summary(sprint_id: str) -> List[Dict]:
+def search_match(text: str, sprint_id: Optional[str]) -> Optional[str]:
+    terms = SEARCH_TERM.findall(text.casefold())
+    if not terms:
+        return None
+    match = "name : (" + " ".join(f'"{term}"*' for term in terms[:8]) + ")"
+    if sprint_id and SEARCH_TERM.fullmatch(sprint_id):
+        match += f' AND sprint_id : "{sprint_id}"'
+    return match
+
+
+@timed_query
+def search_tasks(text: str, sprint_id: Optional[str] = None, limit: int = 20) -> List[Task]:
+    match = search_match(text, sprint_id)
+    if match is None:
+        return []
+
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            conn.row_factory = task_row
+            return conn.execute("""
+                WITH hits AS (
+                    SELECT rowid, rank FROM tasks_fts WHERE tasks_fts MATCH ? ORDER BY rank LIMIT ?
+                )
+                SELECT t.task_id, t.name, t.url, t.status, t.estimated_minutes, t.sprint_id
+                FROM hits
+                JOIN tasks t ON t.id = hits.rowid
+                LEFT JOIN task_usage u ON u.task_id = t.task_id
+                ORDER BY hits.rank - ? / (1 + (? - coalesce(u.last_used, 0)) / 86400.0)
+                LIMIT ?
+            """, (match, SEARCH_CANDIDATES, SEARCH_RECENCY_WEIGHT, time.time(), limit)).fetchall()
+    except sqlite3.Error as e:
+        logger.error("Error searching tasks: %s", e)
+        return []
 
-            cursor.execute("""
-                           SELECT t.task_id,
-                                  t.name,
-                                  t.url,
-                                  t.status,
-                                  t.estimated_minutes,
-                                  tt.user_id,
-                                  tt.user_name,
-                                  tt.total_minutes
-                           FROM tasks t
-                                    LEFT JOIN task_time tt ON t.task_id = tt.task_id
-                           WHERE t.sprint_id = ?
-                           ORDER BY t.task_id
-                           """, (sprint_id,))
-
-            tasks_map = {}
-            for row in cursor.fetchall():
-                task_id = row["task_id"]
-
-                if task_id not in tasks_map:
-                    tasks_map[task_id] = {
-                        "id": task_id,
-                        "name": row["name"],
-                        "url": row["url"],
-                        "status": row["status"],
-                        "estimated_minutes": row["estimated_minutes"],
-                        "assignees": []
-                    }
-
-                if row["user_id"]:
-                    tasks_map[task_id]["assignees"].append({
-                        "user_id": row["user_id"],
-                        "user_name": row["user_name"],
-                        "minutes": row["total_minutes"]
-                    })
-
-            return list(tasks_map.values())
+
+@timed_query
+def get_sprint_version(sprint_id: str) -> int:
+    try:
+        with db_lock, sqlite3.connect(DB_FILE) as conn:
+            row = conn.execute("SELECT version FROM sprint_versions WHERE sprint_id = ?", (sprint_id,)).fetchone()
+            return row[0] if row else 0
+    except sqlite3.Error as e:
+        logger.error("Error fetching sprint version: %s", e)
+        return -1
+
+
+@timed_query
+def get_cached_task(task_id: str) -> Optional[Task]:
+    try:
+        with db_lock, sqlite3.connect(DB_FILE) as conn:
+            conn.row_factory = task_row
+            return conn.execute("""
+                SELECT task_id, name, url, status, estimated_minutes, sprint_id
+                FROM tasks
+                WHERE task_id = ?
+            """, (task_id,)).fetchone()
+    except sqlite3.Error as e:
+        logger.error("Error fetching cached task: %s", e)
+        return None
+
+
+@timed_query
+def get_sprint_tasks_from_cache(sprint_id: str) -> List[Task]:
+    try:
+        with db_lock, sqlite3.connect(DB_FILE) as conn:
+            conn.row_factory = task_row
+            return conn.execute("""
+                SELECT task_id, name, url, status, estimated_minutes, sprint_id
+                FROM tasks
+                WHERE sprint_id = ?
+            """, (sprint_id,)).fetchall()
     except sqlite3.Error as e:
-        logger.error(f"Error fetching sprint summary: {e}")
+        logger.error("Error fetching sprint tasks: %s", e)
         return []
 
 
-def get_user_sprint_statistics(sprint_id: str, user_id: str) -> List[Dict]:
+@timed_query
+def get_sprint_tasks_summary(sprint_id: str) -> List[Tuple[Task, List[TimeTotal]]]:
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
-            cursor = conn.cursor()
+            conn.row_factory = task_row
+            tasks = conn.execute("""
+                SELECT task_id, name, url, status, estimated_minutes, sprint_id
+                FROM tasks
+                WHERE sprint_id = ?
+                ORDER BY task_id
+            """, (sprint_id,)).fetchall()
+
+            conn.row_factory = time_total_row
+            totals = conn.execute("""
+                SELECT tt.task_id, tt.user_id, tt.user_name, tt.total_minutes
+                FROM tasks t
+                JOIN task_time tt ON t.task_id = tt.task_id
+                WHERE t.sprint_id = ?
+            """, (sprint_id,)).fetchall()
+    except sqlite3.Error as e:
+        logger.error("Error fetching sprint summary: %s", e)
+        return []
 
-            cursor.execute("""
+    by_task: Dict[str, List[TimeTotal]] = {}
+    for total in totals:
+        if total.user_id:
+            by_task.setdefault(total.task_id, []).append(total)
+    return [(task, by_task.get(task.id, [])) for task in tasks]
+
+
+@timed_query
+def get_user_sprint_statistics(sprint_id: str, user_id: str) -> List[Tuple[Task, TimeTotal]]:
+    try:
+        with db_lock, sqlite3.connect(DB_FILE) as conn:
+            conn.row_factory = task_total_row
+            return conn.execute("""
                 SELECT t.task_id,
                        t.name,
                        t.url,
                        t.status,
                        t.estimated_minutes,
-                       tt.total_minutes AS logged_minutes
+                       t.sprint_id,
+                       tt.user_id,
+                       tt.user_name,
+                       coalesce(tt.total_minutes, 0)
                 FROM tasks t
                 JOIN task_time tt ON t.task_id = tt.task_id
                 WHERE t.sprint_id = ?
                   AND tt.user_id = ?
-            """, (sprint_id, user_id))
-
-            return [{
-                "id": row[0],
-                "name": row[1],
-                "url": row[2],
-                "status": row[3],
-                "estimated_minutes": row[4],
-                "logged_minutes": row[5] or 0
-            } for row in cursor.fetchall()]
+            """, (sprint_id, user_id)).fetchall()
     except sqlite3.Error as e:
-        logger.error(f"Ошибка при получении статистики пользователя: {e}")
+        logger.error("Ошибка при получении статистики пользователя: %s", e)
         return []
 
 
+@timed_query
 def change_task_estimate(task_id: str, new_estimate_minutes: float) -> bool:
     try:
         with db_lock, sqlite3.connect(DB_FILE) as conn:
@@ -297,8 +550,226 @@ def change_task_estimate(task_id: str, new_estimate_minutes: float) -> bool:
                 SET estimated_minutes = ?
                 WHERE task_id = ?
             """, (new_estimate_minutes, task_id))
+            conn.execute(BUMP_TASK_SPRINT_VERSION, (task_id,))
+            conn.commit()
+            return True
+    except sqlite3.Error as e:
+        logger.error("Ошибка обновления оценки: %s", e)
+        return False
+
+
+@timed_query
+def save_user_contexts(contexts: Dict[int, Dict[str, Any]], db_file: str = DB_FILE) -> bool:
+    if not contexts:
+        return True
+
+    now = time.time()
+    rows = [
+        (user_id, json.dumps(data, ensure_ascii=False, separators=(",", ":")), now)
+        for user_id, data in contexts.items()
+    ]
+
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            conn.executemany("""
+                INSERT INTO user_contexts (user_id, data, updated_at)
+                VALUES (?, ?, ?) ON CONFLICT(user_id) DO
+                UPDATE SET
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+            """, rows)
             conn.commit()
             return True
     except sqlite3.Error as e:
-        logger.error(f"Ошибка обновления оценки: {e}")
-        return False
\ No newline at end of file
+        logger.error("Error saving user contexts: %s", e)
+        return False
+
+
+@timed_query
+def load_user_context(user_id: int, db_file: str = DB_FILE) -> Optional[Dict[str, Any]]:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            row = conn.execute(
+                "SELECT data FROM user_contexts WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+    except sqlite3.Error as e:
+        logger.error("Error loading user context %s: %s", user_id, e)
+        return None
+
+
+@timed_query
+def count_user_contexts(db_file: str = DB_FILE) -> int:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            return conn.execute("SELECT COUNT(*) FROM user_contexts").fetchone()[0]
+    except sqlite3.Error as e:
+        logger.error("Error counting user contexts: %s", e)
+        return 0
+
+
+@timed_query
+def save_conversation_states(
+        states: Dict[int, tuple],
+        removed: Iterable[int],
+        ttl: float,
+        db_file: str = DB_FILE
+) -> bool:
+    expires_at = time.time() + ttl
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            conn.executemany(
+                "DELETE FROM conversation_state WHERE user_id = ?",
+                [(user_id,) for user_id in removed]
+            )
+            conn.executemany("""
+                INSERT OR REPLACE INTO conversation_state (
+                    user_id, action, task_id, sprint_id,
+                    workspace_id, clickup_user_id, task_ids, expires_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(user_id, *row, expires_at) for user_id, row in states.items()])
+            conn.commit()
+            return True
+    except sqlite3.Error as e:
+        logger.error("Error saving conversation states: %s", e)
+        return False
+
+
+@timed_query
+def load_conversation_states(db_file: str = DB_FILE) -> Dict[int, tuple]:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            conn.execute("DELETE FROM conversation_state WHERE expires_at <= ?", (time.time(),))
+            cursor = conn.execute("""
+                SELECT user_id, action, task_id, sprint_id,
+                       workspace_id, clickup_user_id, task_ids
+                FROM conversation_state
+            """)
+            states = {row[0]: row[1:] for row in cursor.fetchall()}
+            conn.commit()
+            return states
+    except sqlite3.Error as e:
+        logger.error("Error loading conversation states: %s", e)
+        return {}
+
+
+@timed_query
+def load_conversation_state(user_id: int, db_file: str = DB_FILE) -> Optional[tuple]:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            row = conn.execute("""
+                SELECT action, task_id, sprint_id,
+                       workspace_id, clickup_user_id, task_ids
+                FROM conversation_state
+                WHERE user_id = ? AND expires_at > ?
+            """, (user_id, time.time())).fetchone()
+            return tuple(row) if row else None
+    except sqlite3.Error as e:
+        logger.error("Error loading conversation state %s: %s", user_id, e)
+        return None
+
+
+@timed_query
+def save_callback_payloads(payloads: Dict[str, Tuple[str, ...]], ttl: float, db_file: str = DB_FILE) -> bool:
+    expires_at = time.time() + ttl
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO callback_payloads (key, args, expires_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(args), expires_at) for key, args in payloads.items()]
+            )
+            conn.commit()
+            return True
+    except sqlite3.Error as e:
+        logger.error("Error saving %s callback payloads: %s", len(payloads), e)
+        return False
+
+
+@timed_query
+def load_callback_payload(key: str, db_file: str = DB_FILE) -> Optional[Tuple[str, ...]]:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            row = conn.execute(
+                "SELECT args FROM callback_payloads WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            return tuple(json.loads(row[0])) if row else None
+    except sqlite3.Error as e:
+        logger.error("Error loading callback payload %s: %s", key, e)
+        return None
+
+
+@timed_query
+def publish_invalidations(kind: str, keys: Iterable[str], origin: str, db_file: str = DB_FILE) -> None:
+    now = time.time()
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            conn.executemany("""
+                INSERT INTO state_invalidations (kind, key, origin, created_at)
+                VALUES (?, ?, ?, ?)
+            """, [(kind, str(key), origin, now) for key in keys])
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error("Error publishing invalidations: %s", e)
+
+
+@timed_query
+def fetch_invalidations(after_seq: int, db_file: str = DB_FILE) -> List[tuple]:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            cursor = conn.execute("""
+                SELECT seq, kind, key, origin
+                FROM state_invalidations
+                WHERE seq > ?
+                ORDER BY seq
+            """, (after_seq,))
+            return cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error("Error fetching invalidations: %s", e)
+        return []
+
+
+@timed_query
+def last_invalidation_seq(db_file: str = DB_FILE) -> int:
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM state_invalidations").fetchone()[0]
+    except sqlite3.Error as e:
+        logger.error("Error reading invalidation sequence: %s", e)
+        return 0
+
+
+@timed_query
+def prune_state(max_age: float, db_file: str = DB_FILE) -> None:
+    now = time.time()
+    try:
+        with db_lock, sqlite3.connect(db_file) as conn:
+            conn.execute("DELETE FROM state_invalidations WHERE created_at < ?", (now - max_age,))
+            conn.execute("DELETE FROM conversation_state WHERE expires_at <= ?", (now,))
+            conn.execute("DELETE FROM callback_payloads WHERE expires_at <= ?", (now,))
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.error("Error pruning state: %s", e)
+
+
+@timed_query
+def acquire_lease(name: str, owner: str, ttl: float, db_file: str = DB_FILE) -> bool:
+    now = time.time()
+    try:
+        with db_lock, sqlite3.connect(db_file, isolation_level=None) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                INSERT INTO state_leases (name, owner, expires_at)
+                VALUES (?, ?, ?) ON CONFLICT(name) DO
+                UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at
+                WHERE state_leases.owner = excluded.owner
+                   OR state_leases.expires_at < ?
+            """, (name, owner, now + ttl, now))
+            row = conn.execute("SELECT owner FROM state_leases WHERE name = ?", (name,)).fetchone()
+            conn.execute("COMMIT")
+            return row is not None and row[0] == owner
+    except sqlite3.Error as e:
+        logger.error("Error acquiring lease %s: %s", name, e)
+        return False
@@ -0,0 +1,76 @@
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type, TypeVar
+
+Record = TypeVar("Record", bound=tuple)
+
+
+class Workspace(NamedTuple):
+    id: str
+    name: str
+    color: str
+
+
+class Sprint(NamedTuple):
+    id: str
+    name: str
+    folder_id: str
+    folder_name: str
+
+
+class Member(NamedTuple):
+    id: str
+    username: str
+    email: str
+    initials: str
+    color: str
+
+
+class Task(NamedTuple):
+    id: str
+    name: str
+    url: str
+    status: str
+    estimated_minutes: float
+    sprint_id: Optional[str] = None
+    assignee_ids: Tuple[str, ...] = ()
+
+
+class TimeTotal(NamedTuple):
+    task_id: str
+    user_id: str
+    user_name: Optional[str]
+    minutes: float
+
+
+def row_factory(record: Type[Record]) -> Callable[[Any, tuple], Record]:
+    return lambda cursor, row: record(*row)
+
+
+def workspace_from_clickup(data: Dict) -> Workspace:
+    return Workspace(str(data["id"]), data.get("name", f"Workspace {data['id']}"), data.get("color", "#000000"))
+
+
+def sprint_from_clickup(data: Dict, folder: Dict) -> Sprint:
+    return Sprint(str(data["id"]), data.get("name", f"Sprint {data['id']}"), str(folder["id"]), folder["name"])
+
+
+def member_from_clickup(data: Dict) -> Member:
+    return Member(
+        str(data.get("id")),
+        data.get("username", "Unknown"),
+        data.get("email", ""),
+        data.get("initials", "?"),
+        data.get("color", "#000000")
+    )
+
+
+def task_from_clickup(data: Dict, sprint_id: Optional[str] = None) -> Task:
+    estimated_ms = data.get("time_estimate")
+    return Task(
+        data["id"],
+        data.get("name", f"Task {data['id']}"),
+        data.get("url", ""),
+        (data.get("status") or {}).get("status", "unknown"),
+        estimated_ms / 60000.0 if estimated_ms else 0,
+        sprint_id,
+        tuple(str(member.get("id")) for member in data.get("assignees") or ())
+    )
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Awaitable, Callable, Dict
+from services import clickup
+from utils.logger import logger
+from utils.metrics import PREFETCH_RESULTS
+
+Fetch = Callable[[], Awaitable[object]]
+
+prefetch_jobs: Dict[int, asyncio.Task] = {}
+
+
+async def _warm(user_id: int, fetches: Dict[str, Fetch]) -> None:
+    clickup.prefetching.set(True)
+    results = await asyncio.gather(*(fetch() for fetch in fetches.values()), return_exceptions=True)
+    for name, result in zip(fetches, results):
+        if isinstance(result, Exception) or not result:
+            PREFETCH_RESULTS.inc(name, "failed")
+            logger.debug("Prefetch %s for user %s failed: %r", name, user_id, result)
+
+
+def cancel_prefetch(user_id: int) -> None:
+    task = prefetch_jobs.pop(user_id, None)
+    if task and not task.done():
+        task.cancel()
+
+
+def prefetch(user_id: int, fetches: Dict[str, Fetch]) -> None:
+    cancel_prefetch(user_id)
+
+    task = asyncio.create_task(_warm(user_id, fetches), name=f"prefetch:{user_id}")
+    prefetch_jobs[user_id] = task
+
+    def forget(done: asyncio.Task) -> None:
+        if prefetch_jobs.get(user_id) is done:
+            del prefetch_jobs[user_id]
+        if done.cancelled():
+            for name in fetches:
+                PREFETCH_RESULTS.inc(name, "cancelled")
+
+    task.add_done_callback(forget)
+
+
+def prefetch_workspace(user_id: int, workspace_id: str) -> None:
+    prefetch(user_id, {
+        "get_clickup_sprints": lambda: clickup.get_clickup_sprints(workspace_id)
+    })
+
+
+def prefetch_sprint(user_id: int, sprint_id: str) -> None:
+    prefetch(user_id, {
+        "get_clickup_list_members": lambda: clickup.get_clickup_list_members(sprint_id),
+        "get_all_tasks_in_sprint": lambda: clickup.get_all_tasks_in_sprint(sprint_id)
+    })
+
+
+def prefetch_user_tasks(user_id: int, sprint_id: str, clickup_user_id: str) -> None:
+    if clickup.is_cached("get_all_tasks_in_sprint", sprint_id):
+        return
+    prefetch(user_id, {
+        "get_all_user_tasks_in_sprint": lambda: clickup.get_all_user_tasks_in_sprint(sprint_id, clickup_user_id)
+    })
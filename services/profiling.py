@@ -0,0 +1,163 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from services import clickup
+from services.user_manager import user_data, user_logging_state, shared_workspaces, shared_sprints
+from utils.logger import logger
+
+PROFILE_MAX_SECONDS = 120
+SAMPLE_INTERVAL = 0.005
+
+profile_lock = asyncio.Lock()
+baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+async def profile_for(seconds: float) -> Tuple[str, str, List[str]]:
+    seconds = max(1.0, min(seconds, PROFILE_MAX_SECONDS))
+    async with profile_lock:
+        profiler = cProfile.Profile()
+        sampler = StackSampler(SAMPLE_INTERVAL)
+        started = time.perf_counter()
+
+        sampler.start()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+            sampler.stopped.set()
+            sampler.join()
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Profiling finished after {elapsed:.1f}s, {sampler.samples} stack samples")
+
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+
+    top = []
+    for (filename, line, name), (_, calls, _, cumulative, _) in sorted(
+        stats.stats.items(), key=lambda item: item[1][3], reverse=True
+    ):
+        if "asyncio" in filename or "selectors" in filename or filename.startswith("~"):
+            continue
+        top.append(f"{cumulative * 1000:9.1f} ms {calls:7d}× {name} ({filename.rsplit('/', 1)[-1]}:{line})")
+        if len(top) == 15:
+            break
+
+    return output.getvalue(), sampler.collapsed(), top
+
+
+def deep_size(obj: Any, seen: Optional[set] = None) -> int:
+    seen = set() if seen is None else seen
+    pending = [obj]
+    size = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+        elif hasattr(item, "__slots__"):
+            pending.extend(getattr(item, slot) for slot in item.__slots__ if hasattr(item, slot))
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            pending.append(vars(item))
+    return size
+
+
+def structure_sizes() -> Dict[str, Tuple[int, int]]:
+    caches = {
+        "user_data": user_data,
+        "user_logging_state": user_logging_state,
+        "clickup.cache": clickup.cache,
+        "shared_workspaces": shared_workspaces,
+        "shared_sprints": shared_sprints
+    }
+    sizes = {}
+    for name, cache in caches.items():
+        items = list(cache.items())
+        sizes[name] = (len(items), deep_size(items))
+    return sizes
+
+
+def memory_report(limit: int = 15) -> List[str]:
+    global baseline_snapshot
+
+    lines = ["Структуры:"]
+    for name, (count, size) in structure_sizes().items():
+        lines.append(f"{name}: {count} записей, {size / 1024:.1f} KiB")
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(10)
+        baseline_snapshot = tracemalloc.take_snapshot()
+        lines += ["", "tracemalloc запущен. Повторите /memprofile позже, чтобы увидеть рост."]
+        return lines
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    lines += ["", f"Отслеживается: {current / 1024 / 1024:.1f} MiB (пик {peak / 1024 / 1024:.1f} MiB)", "", "Крупнейшие:"]
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:9.1f} KiB {stat.count:7d} {frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}")
+
+    if baseline_snapshot is not None:
+        lines += ["", "Рост с первого снимка:"]
+        for stat in snapshot.compare_to(baseline_snapshot, "lineno")[:limit]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} {frame.filename.rsplit('/', 1)[-1]}:{frame.lineno}"
+            )
+    return lines
+
+
+def stop_memory_tracing() -> None:
+    global baseline_snapshot
+    baseline_snapshot = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
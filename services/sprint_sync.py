@@ -0,0 +1,200 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from cachetools import TTLCache
+from services import clickup
+from services.database import cache_sprint_tasks
+from services.models import Task
+from services.state_backend import state_backend
+from utils.config import (
+    SPRINT_SYNC_BASE_INTERVAL,
+    SPRINT_SYNC_MIN_INTERVAL,
+    SPRINT_SYNC_MAX_INTERVAL,
+    SPRINT_SYNC_IDLE_TTL,
+    SPRINT_SYNC_WORK_HOURS,
+    CLICKUP_SYNC_BUDGET_PER_MINUTE
+)
+from utils.logger import logger
+from utils.metrics import Counter, Gauge
+
+BUSY_WINDOW = 900
+ACTIVITY_FORWARD_INTERVAL = 60
+SYNC_RESULTS = Counter("sprint_sync_total", "Background sprint refreshes", ["result"])
+
+
+class SprintActivity:
+    __slots__ = (
+        "sprint_id", "workspace_id", "last_seen", "recent_users",
+        "last_synced", "next_sync", "fingerprint", "unchanged_runs", "failures"
+    )
+
+    def __init__(self, sprint_id: str, workspace_id: Optional[str]) -> None:
+        self.sprint_id = sprint_id
+        self.workspace_id = workspace_id
+        self.last_seen = time.time()
+        self.recent_users: Dict[int, float] = {}
+        self.last_synced = 0.0
+        self.next_sync = 0.0
+        self.fingerprint: Optional[int] = None
+        self.unchanged_runs = 0
+        self.failures = 0
+
+    def busy_users(self, now: float) -> int:
+        self.recent_users = {user_id: seen for user_id, seen in self.recent_users.items() if now - seen < BUSY_WINDOW}
+        return len(self.recent_users)
+
+
+class SyncBudget:
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = max(1.0, per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    async def spend(self) -> None:
+        while not self.take():
+            await asyncio.sleep((1 - self.tokens) / max(self.refill_per_second, 1 / 60))
+
+
+def parse_work_hours(spec: str) -> range:
+    start, _, end = spec.partition("-")
+    return range(int(start), int(end or 24))
+
+
+active_sprints: Dict[str, SprintActivity] = {}
+forwarded_activity = TTLCache(maxsize=10000, ttl=ACTIVITY_FORWARD_INTERVAL)
+sync_in_progress: Set[str] = set()
+budget = SyncBudget(CLICKUP_SYNC_BUDGET_PER_MINUTE)
+work_hours = parse_work_hours(SPRINT_SYNC_WORK_HOURS)
+
+Gauge("sprint_sync_active_sprints", "Sprints tracked for background refresh", lambda: len(active_sprints))
+
+
+def touch_sprint(sprint_id: Optional[str], workspace_id: Optional[str], user_id: int) -> None:
+    if not sprint_id:
+        return
+    record_activity(sprint_id, workspace_id, user_id)
+
+    # Only the lease holder syncs, so it has to hear about sprints used on other replicas.
+    if state_backend.shared and (sprint_id, user_id) not in forwarded_activity:
+        forwarded_activity[(sprint_id, user_id)] = True
+        state_backend.publish_invalidation("sprint_activity", [f"{sprint_id}:{workspace_id or ''}:{user_id}"])
+
+
+def apply_remote_activity(key: str) -> None:
+    sprint_id, workspace_id, user_id = key.split(":")
+    record_activity(sprint_id, workspace_id or None, int(user_id))
+
+
+def record_activity(sprint_id: str, workspace_id: Optional[str], user_id: int) -> None:
+    now = time.time()
+    activity = active_sprints.get(sprint_id)
+    if activity is None:
+        activity = active_sprints[sprint_id] = SprintActivity(sprint_id, workspace_id)
+        activity.next_sync = now + SPRINT_SYNC_MIN_INTERVAL
+    activity.workspace_id = workspace_id or activity.workspace_id
+    activity.last_seen = now
+    activity.recent_users[user_id] = now
+
+
+def is_working_time(moment: datetime) -> bool:
+    return moment.weekday() < 5 and moment.hour in work_hours
+
+
+def next_interval(activity: SprintActivity, now: float) -> float:
+    interval = SPRINT_SYNC_BASE_INTERVAL
+    if not is_working_time(datetime.fromtimestamp(now)):
+        interval *= 4
+
+    users = activity.busy_users(now)
+    if users >= 3:
+        interval /= 3
+    elif users:
+        interval /= 1.5
+
+    idle_hours = (now - activity.last_seen) / 3600
+    if idle_hours >= 1:
+        interval *= 1 + idle_hours
+    interval *= min(4.0, 1.5 ** activity.unchanged_runs)
+    interval *= 2 ** min(activity.failures, 5)
+
+    return max(SPRINT_SYNC_MIN_INTERVAL, min(SPRINT_SYNC_MAX_INTERVAL, interval))
+
+
+def tasks_fingerprint(tasks: List[Task]) -> int:
+    return hash(tuple(sorted(tasks)))
+
+
+async def sync_sprint(activity: SprintActivity) -> None:
+    sprint_id = activity.sprint_id
+    sync_in_progress.add(sprint_id)
+    now = time.time()
+    # The first page is paid for when the sprint is picked, further pages are charged as they are fetched.
+    clickup.page_budget.set(budget.spend)
+    try:
+        clickup.invalidate_cached("get_all_tasks_in_sprint", sprint_id)
+        tasks = await clickup.get_all_tasks_in_sprint(sprint_id)
+        if not tasks:
+            activity.failures += 1
+            SYNC_RESULTS.inc("empty")
+            return
+
+        fingerprint = tasks_fingerprint(tasks)
+        if fingerprint == activity.fingerprint:
+            activity.unchanged_runs += 1
+            SYNC_RESULTS.inc("unchanged")
+        else:
+            activity.unchanged_runs = 0
+            if not await asyncio.to_thread(cache_sprint_tasks, tasks, activity.workspace_id, sprint_id):
+                activity.failures += 1
+                SYNC_RESULTS.inc("error")
+                return
+            if activity.fingerprint is not None:
+                state_backend.publish_invalidation("clickup", [f"get_all_tasks_in_sprint:{sprint_id}"])
+            activity.fingerprint = fingerprint
+            SYNC_RESULTS.inc("changed")
+
+        activity.failures = 0
+        activity.last_synced = now
+    except Exception as e:
+        activity.failures += 1
+        SYNC_RESULTS.inc("error")
+        logger.error("Background sync of sprint %s failed: %s", sprint_id, e)
+    finally:
+        activity.next_sync = time.time() + next_interval(activity, time.time())
+        sync_in_progress.discard(sprint_id)
+
+
+def due_sprints(now: float) -> List[SprintActivity]:
+    for sprint_id in [sid for sid, a in active_sprints.items() if now - a.last_seen > SPRINT_SYNC_IDLE_TTL]:
+        del active_sprints[sprint_id]
+
+    due = [
+        activity for activity in active_sprints.values()
+        if activity.next_sync <= now and activity.sprint_id not in sync_in_progress
+    ]
+    due.sort(key=lambda activity: (-activity.busy_users(now), activity.next_sync))
+    return due
+
+
+async def sync_due_sprints() -> int:
+    picked = []
+    for activity in due_sprints(time.time()):
+        if not budget.take():
+            break
+        picked.append(activity)
+
+    if picked:
+        await asyncio.gather(*(sync_sprint(activity) for activity in picked))
+        logger.debug("Background sync refreshed %s sprints", len(picked))
+    return len(picked)
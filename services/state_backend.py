@@ -0,0 +1,113 @@
+import os
+import socket
+from typing import Dict, Any, Optional, Iterable, List, Tuple
+from services import database
+from utils.config import STATE_BACKEND, STATE_DB_FILE, DB_FILE
+from utils.logger import logger
+
+
+class StateBackend:
+    shared = False
+
+    def __init__(self, db_file: str) -> None:
+        self.db_file = db_file
+        self.origin = f"{socket.gethostname()}:{os.getpid()}"
+
+    def init(self) -> None:
+        database.init_state_db(self.db_file)
+
+    def load_user_context(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return database.load_user_context(user_id, self.db_file)
+
+    def save_user_contexts(self, contexts: Dict[int, Dict[str, Any]]) -> bool:
+        return database.save_user_contexts(contexts, self.db_file)
+
+    def count_user_contexts(self) -> int:
+        return database.count_user_contexts(self.db_file)
+
+    def load_conversation_state(self, user_id: int) -> Optional[tuple]:
+        return None
+
+    def load_conversation_states(self) -> Dict[int, tuple]:
+        return database.load_conversation_states(self.db_file)
+
+    def save_conversation_states(self, states: Dict[int, tuple], removed: Iterable[int], ttl: float) -> bool:
+        return database.save_conversation_states(states, removed, ttl, self.db_file)
+
+    def save_callback_payloads(self, payloads: Dict[str, Tuple[str, ...]], ttl: float) -> bool:
+        return database.save_callback_payloads(payloads, ttl, self.db_file)
+
+    def load_callback_payload(self, key: str) -> Optional[Tuple[str, ...]]:
+        return database.load_callback_payload(key, self.db_file)
+
+    def publish_invalidation(self, kind: str, keys: Iterable[Any]) -> None:
+        pass
+
+    def poll_invalidations(self) -> List[Tuple[str, str]]:
+        return []
+
+    def try_acquire_leadership(self, job_name: str, ttl: float) -> bool:
+        return True
+
+    def prune(self, max_age: float) -> None:
+        database.prune_state(max_age, self.db_file)
+
+
+class InProcessStateBackend(StateBackend):
+    pass
+
+
+class SQLiteSharedStateBackend(StateBackend):
+    shared = True
+
+    def __init__(self, db_file: str) -> None:
+        super().__init__(db_file)
+        self.last_seq = 0
+
+    def init(self) -> None:
+        super().init()
+        self.last_seq = database.last_invalidation_seq(self.db_file)
+
+    def save_user_contexts(self, contexts: Dict[int, Dict[str, Any]]) -> bool:
+        if not super().save_user_contexts(contexts):
+            return False
+        self.publish_invalidation("user_context", contexts.keys())
+        return True
+
+    def load_conversation_state(self, user_id: int) -> Optional[tuple]:
+        return database.load_conversation_state(user_id, self.db_file)
+
+    def save_conversation_states(self, states: Dict[int, tuple], removed: Iterable[int], ttl: float) -> bool:
+        removed = list(removed)
+        if not super().save_conversation_states(states, removed, ttl):
+            return False
+        self.publish_invalidation("conversation", list(states.keys()) + removed)
+        return True
+
+    def publish_invalidation(self, kind: str, keys: Iterable[Any]) -> None:
+        keys = list(keys)
+        if keys:
+            database.publish_invalidations(kind, keys, self.origin, self.db_file)
+
+    def poll_invalidations(self) -> List[Tuple[str, str]]:
+        rows = database.fetch_invalidations(self.last_seq, self.db_file)
+        if not rows:
+            return []
+        self.last_seq = rows[-1][0]
+        return [(kind, key) for _, kind, key, origin in rows if origin != self.origin]
+
+    def try_acquire_leadership(self, job_name: str, ttl: float) -> bool:
+        return database.acquire_lease(job_name, self.origin, ttl, self.db_file)
+
+
+def create_state_backend() -> StateBackend:
+    if STATE_BACKEND == "sqlite":
+        logger.info(f"Using shared SQLite state backend: {STATE_DB_FILE}, data: {DB_FILE} (both must be on shared storage)")
+        return SQLiteSharedStateBackend(STATE_DB_FILE)
+
+    if STATE_BACKEND != "memory":
+        logger.error("Unknown STATE_BACKEND '%s', falling back to in-process state", STATE_BACKEND)
+    return InProcessStateBackend(DB_FILE)
+
+
+state_backend = create_state_backend()
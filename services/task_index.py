@@ -0,0 +1,61 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from cachetools import TTLCache
+from services.models import Task
+from services.database import get_cached_task, get_sprint_tasks_from_cache, get_sprint_version, search_tasks
+
+# sprint_id -> (sprint version, task index). Any write to the sprint's tasks bumps the version,
+# so refreshes and the background sync make the index stale.
+sprint_task_index = TTLCache(maxsize=256, ttl=3600)
+# Bulk parsing reads the index from worker threads: the cache is guarded and an index dict is never
+# mutated after it is published, so a reader can keep iterating the dict it got.
+index_lock = threading.Lock()
+
+
+def index_sprint_tasks(sprint_id: str, tasks: Iterable[Task]) -> Dict[str, Task]:
+    with index_lock:
+        version, index = sprint_task_index.get(sprint_id) or (-1, {})
+        index = dict(index)
+        index.update((task.id, task) for task in tasks)
+        sprint_task_index[sprint_id] = (version, index)
+    return index
+
+
+def find_task(sprint_id: Optional[str], task_id: str) -> Optional[Task]:
+    with index_lock:
+        entry = sprint_task_index.get(sprint_id)
+    if entry is not None and task_id in entry[1]:
+        return entry[1][task_id]
+    return get_cached_task(task_id)
+
+
+def sprint_tasks(sprint_id: str) -> Dict[str, Task]:
+    version = get_sprint_version(sprint_id)
+    with index_lock:
+        entry = sprint_task_index.get(sprint_id)
+    if entry is not None and entry[0] == version and version >= 0:
+        return entry[1]
+
+    index = {task.id: task for task in get_sprint_tasks_from_cache(sprint_id)}
+    if version >= 0:
+        with index_lock:
+            sprint_task_index[sprint_id] = (version, index)
+    return index
+
+
+def resolve_task_ref(sprint_id: str, ref: str) -> Tuple[Optional[Task], List[Task]]:
+    tasks = sprint_tasks(sprint_id)
+    ref = ref.strip().lstrip("#")
+    if ref in tasks:
+        return tasks[ref], []
+
+    folded = ref.casefold()
+    candidates = [task for task in tasks.values() if task.name.casefold().startswith(folded)]
+    exact = [task for task in candidates if task.name.casefold() == folded]
+    if len(exact) == 1:
+        return exact[0], []
+    if not candidates:
+        candidates = search_tasks(ref, sprint_id, limit=3)
+    if len(candidates) == 1:
+        return candidates[0], []
+    return None, candidates
@@ -1,5 +1,56 @@
 from telegram.ext import ContextTypes
-from services.user_manager import save_user_data_if_dirty
+from services.user_manager import (
+    save_user_data_if_dirty,
+    user_data_memory_stats,
+    user_logging_state,
+    flush_conversation_state,
+    apply_invalidation
+)
+from services.state_backend import state_backend
+from services.clickup import invalidate_cached
+from services.sprint_sync import sync_due_sprints, apply_remote_activity
+from utils.config import SPRINT_SYNC_TICK
+from utils.logger import logger
 
 async def auto_save_task(ctx: ContextTypes.DEFAULT_TYPE):
-    save_user_data_if_dirty()
\ No newline at end of file
+    save_user_data_if_dirty()
+
+    stats = user_data_memory_stats()
+    logger.info(
+        f"User contexts in memory: {stats['loaded_users']}, "
+        f"~{stats['bytes_per_user']:.0f} B/user, shared data {stats['shared_bytes']} B"
+    )
+
+    user_logging_state.expire()
+    logger.info(
+        f"Conversation states: {len(user_logging_state)}, "
+        f"expired {user_logging_state.expired}, evicted {user_logging_state.evicted}"
+    )
+
+
+async def conversation_flush_task(ctx: ContextTypes.DEFAULT_TYPE):
+    flush_conversation_state()
+
+
+async def state_sync_task(ctx: ContextTypes.DEFAULT_TYPE):
+    for kind, key in state_backend.poll_invalidations():
+        if kind == "clickup":
+            func_name, _, arg = key.partition(":")
+            invalidate_cached(func_name, arg)
+        elif kind == "sprint_activity":
+            apply_remote_activity(key)
+        else:
+            apply_invalidation(kind, key)
+
+
+async def state_maintenance_task(ctx: ContextTypes.DEFAULT_TYPE):
+    if not state_backend.try_acquire_leadership("state_maintenance", ttl=900):
+        return
+    state_backend.prune(max_age=3600)
+
+
+async def sprint_sync_task(ctx: ContextTypes.DEFAULT_TYPE):
+    # One replica syncs for the whole deployment, so the ClickUp budget is the total rate.
+    if not state_backend.try_acquire_leadership("sprint_sync", ttl=SPRINT_SYNC_TICK * 4):
+        return
+    await sync_due_sprints()
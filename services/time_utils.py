@@ -1,24 +1,82 @@
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from utils.config import WORKDAY_HOURS
+
+DAY_UNITS = ("days", "day", "d", "дней", "дня", "день", "дн", "д")
+HOUR_UNITS = ("hours", "hour", "hrs", "hr", "h", "часов", "часа", "час", "ч")
+MINUTE_UNITS = ("minutes", "minute", "mins", "min", "m", "минуты", "минута", "минут", "мин", "м")
+
+NUMBER = r"[0-9]+(?:[.,][0-9]+)?"
+DAYS = f"(?:{'|'.join(DAY_UNITS)})"
+HOURS = f"(?:{'|'.join(HOUR_UNITS)})"
+MINUTES = f"(?:{'|'.join(MINUTE_UNITS)})"
+END_OF_UNIT = r"(?![a-zа-яё])"
+
+DURATION = (
+    rf"(?P<plain>{NUMBER})"
+    rf"|(?P<hh>[0-9]+):(?P<mm>[0-5][0-9])"
+    rf"|(?=[0-9])(?:(?P<d>{NUMBER})\s*{DAYS}{END_OF_UNIT}\s*)?"
+    rf"(?:(?P<h>{NUMBER})\s*{HOURS}{END_OF_UNIT}\s*(?P<tail>[0-5]?[0-9](?![0-9.,]))?\s*)?"
+    rf"(?:(?P<m>{NUMBER})\s*{MINUTES}{END_OF_UNIT})?"
+)
+
+# Most inputs are one number with at most one unit ("90", "1.5h", "30 мин"); they skip the full grammar.
+SINGLE_UNIT_RE = re.compile(rf"\s*({NUMBER})\s*([a-zа-яё]*)\s*", re.IGNORECASE)
+UNIT_MINUTES = {
+    "": 1.0,
+    **{unit: WORKDAY_HOURS * 60 for unit in DAY_UNITS},
+    **{unit: 60.0 for unit in HOUR_UNITS},
+    **{unit: 1.0 for unit in MINUTE_UNITS}
+}
+
+DURATION_RE = re.compile(rf"\s*(?:{DURATION})\s*", re.IGNORECASE)
+TRAILING_DURATION_RE = re.compile(rf"(?P<rest>.*?)\s+(?:{DURATION})\s*", re.IGNORECASE | re.DOTALL)
+
+
+def to_float(number: Optional[str]) -> float:
+    if not number:
+        return 0.0
+    return float(number.replace(",", ".") if "," in number else number)
+
+
+def match_to_ms(match: re.Match) -> Optional[int]:
+    plain, hh, mm, days, hours, tail, minutes = match.group("plain", "hh", "mm", "d", "h", "tail", "m")
+    if plain is not None:
+        total = to_float(plain)
+    elif hh is not None:
+        total = int(hh) * 60 + int(mm)
+    elif days or hours or minutes:
+        total = to_float(days) * WORKDAY_HOURS * 60 + to_float(hours) * 60 + to_float(tail) + to_float(minutes)
+    else:
+        return None
+    return int(total * 60 * 1000)
+
+
+@lru_cache(maxsize=4096)
+def _parse(time_str: str) -> Optional[int]:
+    if time_str.isascii() and time_str.isdigit():
+        return int(time_str) * 60 * 1000
+    single = SINGLE_UNIT_RE.fullmatch(time_str)
+    if single:
+        number, unit = single.groups()
+        factor = UNIT_MINUTES.get(unit.lower())
+        if factor is not None:
+            return int(to_float(number) * factor * 60 * 1000)
+    match = DURATION_RE.fullmatch(time_str)
+    return match_to_ms(match) if match else None
+
 
 def parse_time_input(time_str: str) -> Optional[int]:
-    try:
-        total_minutes = 0
-
-        if 'h' in time_str:
-            hours_part = time_str.split('h')[0]
-            hours = float(hours_part)
-            total_minutes += hours * 60
-
-        if 'm' in time_str:
-            minutes_part = time_str.split('m')[0]
-            if 'h' in minutes_part:
-                minutes_part = minutes_part.split('h')[-1]
-            minutes = float(minutes_part)
-            total_minutes += minutes
-
-        if 'h' not in time_str and 'm' not in time_str:
-            total_minutes = float(time_str)
-
-        return int(total_minutes * 60 * 1000)
-    except ValueError:
-        return None
\ No newline at end of file
+    return _parse(time_str)
+
+
+def parse_time_inputs(time_strs: Iterable[str]) -> List[Optional[int]]:
+    return [_parse(time_str) for time_str in time_strs]
+
+
+def split_duration(text: str) -> Tuple[str, Optional[int]]:
+    match = TRAILING_DURATION_RE.fullmatch(text)
+    if not match or not match.group("rest").strip():
+        return text, None
+    return match.group("rest").strip(), match_to_ms(match)
@@ -1,23 +1,137 @@
 import json
 import os
+import sys
 import hashlib
 import asyncio
 import threading
-from typing import Dict, Any, Set
-from utils.config import DATA_FILE, ADMIN_SALT
-from utils.logger import logger
+from typing import Dict, Any, Set, Optional
+from cachetools import LRUCache
+from utils.config import (
+    DATA_FILE,
+    ADMIN_SALT,
+    USER_CONTEXT_CACHE_SIZE,
+    CONVERSATION_TTL,
+    CONVERSATION_MAX_STATES,
+    CONTEXT_LOCK_STRIPES
+)
+from utils.logger import logger, stop_logging
+from services.state_backend import state_backend
+from services.conversation import ConversationStore, ConversationState
 
 application = None
 shutting_down = False
-user_data_dirty = False
-user_logging_state = {}
+dirty_users: Set[int] = set()
+user_logging_state = ConversationStore(maxsize=CONVERSATION_MAX_STATES, ttl=CONVERSATION_TTL)
 data_lock = threading.RLock()
-user_data = {}
+context_locks = [threading.RLock() for _ in range(CONTEXT_LOCK_STRIPES)]
 
-def load_initial_user_data() -> Dict[int, Dict[str, Any]]:
-    global user_data
-    user_data = load_user_data()
-    return user_data
+shared_workspaces: Dict[str, Dict[str, Any]] = {}
+shared_sprints: Dict[str, Dict[str, Any]] = {}
+
+
+def user_lock(user_id: int) -> threading.RLock:
+    return context_locks[hash(user_id) % len(context_locks)]
+
+
+class UserContext:
+    __slots__ = (
+        "current_workspace",
+        "current_sprint",
+        "current_user",
+        "current_user_name",
+        "current_workspace_data",
+        "current_sprint_data",
+        "recent_picks"
+    )
+
+    def __init__(self) -> None:
+        for key in self.__slots__:
+            setattr(self, key, None)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UserContext":
+        context = cls()
+        for key in cls.__slots__:
+            context[key] = data.get(key)
+        return context
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "current_workspace_data":
+            value = share_object(shared_workspaces, value)
+        elif key == "current_sprint_data":
+            value = share_object(shared_sprints, value)
+        setattr(self, key, value)
+
+
+def share_object(registry: Dict[str, Dict[str, Any]], value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not value or "id" not in value:
+        return value
+
+    existing = registry.get(value["id"])
+    if existing == value:
+        return existing
+
+    registry[value["id"]] = value
+    return value
+
+
+class UserContextCache(LRUCache):
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize=maxsize)
+        # Evicted unsaved contexts wait here for flush_evicted_contexts, which writes them outside data_lock.
+        self.evicted_dirty: Dict[int, UserContext] = {}
+
+    def popitem(self):
+        user_id, context = super().popitem()
+        if user_id in dirty_users:
+            dirty_users.discard(user_id)
+            self.evicted_dirty[user_id] = context
+        return user_id, context
+
+
+user_data = UserContextCache(maxsize=USER_CONTEXT_CACHE_SIZE)
+
+def load_initial_user_data() -> int:
+    migrate_legacy_user_data()
+    return state_backend.count_user_contexts()
+
+
+def user_data_memory_stats() -> Dict[str, Any]:
+    with data_lock:
+        contexts = list(user_data.values())
+
+    per_user = 0
+    for context in contexts:
+        per_user += sys.getsizeof(context)
+        for key in ("current_workspace", "current_sprint", "current_user", "current_user_name"):
+            value = getattr(context, key)
+            if value is not None:
+                per_user += sys.getsizeof(value)
+
+    shared = sum(
+        sys.getsizeof(obj) + sum(sys.getsizeof(v) for v in obj.values())
+        for obj in list(shared_workspaces.values()) + list(shared_sprints.values())
+    )
+
+    with data_lock:
+        dirty = len(dirty_users) + len(user_data.evicted_dirty)
+
+    return {
+        "loaded_users": len(contexts),
+        "dirty_users": dirty,
+        "bytes_per_user": per_user / len(contexts) if contexts else 0,
+        "shared_bytes": shared
+    }
 
 
 def set_application(app) -> None:
@@ -54,65 +168,191 @@ def is_admin(user_id: int) -> bool:
     return user_hash in ADMIN_HASHES
 
 
+def flush_evicted_contexts() -> None:
+    with data_lock:
+        evicted = dict(user_data.evicted_dirty)
+    if not evicted:
+        return
+
+    snapshot = {}
+    for user_id, context in evicted.items():
+        with user_lock(user_id):
+            snapshot[user_id] = context.to_dict()
+
+    if not state_backend.save_user_contexts(snapshot):
+        logger.error("Error saving %s evicted contexts, will retry", len(snapshot))
+        return
+    with data_lock:
+        for user_id, context in evicted.items():
+            if user_data.evicted_dirty.get(user_id) is context:
+                del user_data.evicted_dirty[user_id]
+
+
 def save_user_data() -> None:
-    global user_data_dirty
-    try:
+    flush_evicted_contexts()
+    with data_lock:
+        if not dirty_users:
+            return
+        contexts = {user_id: user_data[user_id] for user_id in dirty_users if user_id in user_data}
+        dirty_users.clear()
+
+    snapshot = {}
+    for user_id, context in contexts.items():
+        with user_lock(user_id):
+            snapshot[user_id] = context.to_dict()
+
+    if not state_backend.save_user_contexts(snapshot):
+        logger.error("Error saving user data for %s users, will retry", len(snapshot))
         with data_lock:
-            with open(DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(user_data, f, indent=2, ensure_ascii=False)
-            user_data_dirty = False
-    except Exception as e:
-        logger.error(f"Error saving user data: {e}")
+            dirty_users.update(user_id for user_id in snapshot if user_id in user_data)
 
 
 def save_user_data_if_dirty() -> None:
-    global user_data_dirty
-    if user_data_dirty:
+    if dirty_users or user_data.evicted_dirty:
         save_user_data()
 
 
+def write_user_context(user_id: int, context: UserContext, cached: bool) -> None:
+    if state_backend.save_user_contexts({user_id: context.to_dict()}):
+        with data_lock:
+            dirty_users.discard(user_id)
+        return
+
+    logger.error("Error saving context for user %s", user_id)
+    if cached:
+        with data_lock:
+            dirty_users.add(user_id)
+
+
 def update_user_context(user_id: int, key: str, value: Any) -> None:
-    global user_data, user_data_dirty
+    update_user_context_fields(user_id, **{key: value})
 
-    with data_lock:
+
+def update_user_context_fields(user_id: int, **fields: Any) -> None:
+    while True:
         context = get_user_context(user_id)
-        if context.get(key) != value:
-            context[key] = value
-            user_data[user_id] = context
-            user_data_dirty = True
-            logger.debug(f"Updated context for {user_id}: {key} = {value}")
+        with user_lock(user_id):
+            with data_lock:
+                current = user_data.get(user_id)
+            # Evicted and reloaded since the read: the change belongs on the live object.
+            if current is not None and current is not context:
+                continue
+
+            changed = {key: value for key, value in fields.items() if context.get(key) != value}
+            for key, value in changed.items():
+                context[key] = value
+            if not changed:
+                return
+
+            with data_lock:
+                cached = user_data.get(user_id) is context
+                # Other replicas read contexts from the shared store, so there the change is written through at once.
+                deferred = cached and not state_backend.shared
+                if deferred:
+                    dirty_users.add(user_id)
+            if not deferred:
+                write_user_context(user_id, context, cached)
+            break
+
+    logger.debug("Updated context for %s: %s", user_id, changed)
+
+
+def get_user_context(user_id: int) -> UserContext:
+    with data_lock:
+        context = user_data.get(user_id)
+    if context is not None:
+        return context
 
+    with user_lock(user_id):
+        with data_lock:
+            context = user_data.get(user_id)
+            if context is None:
+                # Evicted before its flush finished: the unsaved object is newer than the stored row.
+                context = user_data.evicted_dirty.pop(user_id, None)
+                if context is not None:
+                    user_data[user_id] = context
+                    dirty_users.add(user_id)
+        if context is None:
+            stored = state_backend.load_user_context(user_id)
+            context = UserContext.from_dict(stored) if stored is not None else UserContext()
+
+            with data_lock:
+                user_data[user_id] = context
+                if stored is None:
+                    dirty_users.add(user_id)
+                    logger.info("Created new context for user %s", user_id)
+
+    flush_evicted_contexts()
+    return context
+
+
+def flush_conversation_state() -> None:
+    changed, removed = user_logging_state.take_changes()
+    if not changed and not removed:
+        return
 
-def get_user_context(user_id: int) -> Dict[str, Any]:
-    with data_lock:
-        if user_id not in user_data:
-            user_data[user_id] = {
-                "current_workspace": None,
-                "current_sprint": None,
-                "current_user": None,
-                "current_user_name": None,
-                "current_sprint_data": None,
-                "current_workspace_data": None
-            }
-            global user_data_dirty
-            user_data_dirty = True
-            logger.info(f"Created new context for user {user_id}")
+    rows = {user_id: state.to_row() for user_id, state in changed.items()}
+    if not state_backend.save_conversation_states(rows, removed, CONVERSATION_TTL):
+        logger.error("Error saving %s conversation states, will retry", len(rows))
+        user_logging_state.dirty.update(rows)
+        user_logging_state.removed.update(removed)
+
+
+def set_conversation_state(user_id: int, state: ConversationState) -> None:
+    user_logging_state[user_id] = state
+    if state_backend.shared:
+        flush_conversation_state()
+
+
+def clear_conversation_state(user_id: int) -> None:
+    user_logging_state.pop(user_id, None)
+    if state_backend.shared:
+        user_logging_state.removed.add(user_id)
+        flush_conversation_state()
 
-        return user_data[user_id]
 
+def get_conversation_state(user_id: int) -> Optional[ConversationState]:
+    state = user_logging_state.get(user_id)
+    if state is None and state_backend.shared:
+        row = state_backend.load_conversation_state(user_id)
+        if row:
+            state = ConversationState.from_row(row)
+            user_logging_state.load(user_id, state)
+    return state
 
 
-def load_user_data() -> Dict[int, Dict[str, Any]]:
+def apply_invalidation(kind: str, key: str) -> None:
+    if kind == "user_context":
+        user_id = int(key)
+        with data_lock:
+            if user_id not in dirty_users:
+                user_data.pop(user_id, None)
+    elif kind == "conversation":
+        user_logging_state.forget(int(key))
+
+
+def restore_conversation_state() -> int:
+    states = state_backend.load_conversation_states()
+    for user_id, row in states.items():
+        user_logging_state[user_id] = ConversationState.from_row(row)
+    user_logging_state.take_changes()
+    return len(states)
+
+
+def migrate_legacy_user_data() -> None:
     if not os.path.exists(DATA_FILE):
-        return {}
+        return
 
     try:
         with open(DATA_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            return {int(k): v for k, v in data.items()}
     except Exception as e:
-        logger.error(f"Ошибка загрузки данных: {e}")
-        return {}
+        logger.error("Ошибка загрузки данных: %s", e)
+        return
+
+    if state_backend.save_user_contexts({int(k): v for k, v in data.items()}):
+        os.replace(DATA_FILE, f"{DATA_FILE}.migrated")
+        logger.info(f"Migrated {len(data)} user contexts from {DATA_FILE}")
 
 
 async def stop_application() -> None:
@@ -133,7 +373,8 @@ async def stop_application() -> None:
                 task.cancel()
             await asyncio.sleep(0.5)
     except Exception as e:
-        logger.error(f"Error stopping application: {e}")
+        logger.error("Error stopping application: %s", e)
     finally:
         logger.info("Application stopped")
+        stop_logging()
         os._exit(0)
\ No newline at end of file
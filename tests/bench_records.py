@@ -0,0 +1,65 @@
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from services import database, task_index
+from services.models import task_from_clickup
+from handlers.reports import render_all_tasks
+
+TASKS = 1000
+SPRINT_ID = "901204567890"
+
+
+def clickup_payload():
+    return [
+        {
+            "id": f"86c{n:05x}",
+            "name": f"Задача {n}: доработать экран оплаты и отчёт по клиентам",
+            "url": f"https://app.clickup.com/t/86c{n:05x}",
+            "status": {"status": "in progress" if n % 3 else "open", "color": "#d3d3d3", "type": "custom"},
+            "time_estimate": 3600000 * (n % 5) or None,
+            "assignees": [{"id": 81234567, "username": "ivan", "email": "ivan@example.com", "color": "#7b68ee"}],
+            "tags": [], "custom_fields": [], "description": "", "priority": None,
+        }
+        for n in range(TASKS)
+    ]
+
+
+def measure(label, func):
+    gc.collect()
+    tracemalloc.start()
+    started = tracemalloc.take_snapshot()
+    result = func()
+    retained = tracemalloc.take_snapshot().compare_to(started, "filename")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    wall = time.perf_counter()
+    func()
+    wall = time.perf_counter() - wall
+    kib = sum(stat.size_diff for stat in retained) / 1024
+    print(f"{label:32s} retained {kib:7.0f} KiB   peak {peak / 1024:7.0f} KiB   {wall * 1000:6.1f} ms")
+    return result
+
+
+def main():
+    payload = measure("raw ClickUp JSON", clickup_payload)
+    with tempfile.TemporaryDirectory() as directory:
+        database.DB_FILE = os.path.join(directory, "bench.db")
+        database.init_db()
+
+        tasks = measure("parse ClickUp tasks", lambda: [task_from_clickup(task, SPRINT_ID) for task in payload])
+        database.cache_sprint_tasks(tasks, "ws", SPRINT_ID)
+        for user_id, user_name in (("81234567", "ivan"), ("81234568", "olga")):
+            database.log_time_bulk([(task.id, 30.0) for task in tasks[::2]], user_id, user_name)
+
+        measure("task index for log time", lambda: task_index.index_sprint_tasks(SPRINT_ID, tasks))
+        measure("get_sprint_tasks_from_cache", lambda: database.get_sprint_tasks_from_cache(SPRINT_ID))
+        summary = measure("get_sprint_tasks_summary", lambda: database.get_sprint_tasks_summary(SPRINT_ID))
+        measure("render all tasks", lambda: render_all_tasks(summary))
+        measure("summary plus render", lambda: render_all_tasks(database.get_sprint_tasks_summary(SPRINT_ID)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import tempfile
+import timeit
+from handlers import router
+from services.state_backend import state_backend
+
+ROUNDS = 20000
+
+
+async def handler(update, context, *args):
+    pass
+
+
+BUTTONS = [
+    ("sprint", ("901204567890",), "sprint_901204567890"),
+    ("user", ("81234567",), "user_81234567_ivan_petrov"),
+    ("estimate_task", ("86c1abcde",), "estimate_task_86c1abcde"),
+    ("pick", ("estimate_task", "next", "86c1abcde", ""), None),
+    ("pick", ("estimate_task", "next", "86c1abcde", "ревью"), None),
+    ("page", ("show_tasks_without_estimate", "901204567890", "", "3"), None),
+]
+
+
+def per_call_ns(func):
+    return min(timeit.repeat(func, number=ROUNDS, repeat=5)) / ROUNDS * 1e9
+
+
+def main():
+    for action, code in [("sprint", "s"), ("user", "u"), ("estimate_task", "e"), ("pick", "k"), ("page", "p")]:
+        router.register(action, handler, code=code)
+        router.register_legacy(f"{action}_", action, lambda rest: tuple(rest.split("_")[:1]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        state_backend.db_file = os.path.join(directory, "state.db")
+        state_backend.init()
+
+        print(f"{'button':52s} {'bytes':>5s} {'render':>8s} {'resolve':>8s}  (ns per call)")
+        for action, args, legacy in BUTTONS:
+            data = router.callback_data(action, *args)
+            if data[2] == "#":
+                render = asyncio.run(render_stored(action, args))
+            else:
+                render = per_call_ns(lambda: router.callback_data(action, *args))
+            resolve = per_call_ns(lambda: router.resolve(data))
+            print(f"{data:52s} {len(data.encode()):5d} {render:8.0f} {resolve:8.0f}")
+            if legacy:
+                resolve = per_call_ns(lambda: router.resolve(legacy))
+                print(f"{'  legacy ' + legacy:52s} {len(legacy):5d} {'':8s} {resolve:8.0f}")
+
+        data = router.callback_data("pick", "estimate_task", "next", "86c1abcde", "ревью")
+        router.payload_store.clear()
+        cold_read = lambda: (router.payload_store.clear(), router.resolve(data))
+        cold = min(timeit.repeat(cold_read, number=100, repeat=5)) / 100 * 1e9
+        print(f"{'stored payload, read from the state backend':52s} {'':5s} {'':8s} {cold:8.0f}")
+
+
+async def render_stored(action, args):
+    render = min(timeit.repeat(lambda: router.callback_data(action, *args), number=100, repeat=5)) / 100 * 1e9
+    await asyncio.gather(*router.flush_tasks)
+
+    # A picker page renders up to three stored buttons; they share one write made off the loop.
+    for _ in range(3):
+        router.callback_data(action, *args)
+    started = timeit.default_timer()
+    await asyncio.gather(*router.flush_tasks)
+    print(f"  batch of 3 payloads written in {(timeit.default_timer() - started) * 1000:.2f} ms off the loop")
+    return render
+
+
+if __name__ == "__main__":
+    main()
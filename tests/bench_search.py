@@ -0,0 +1,65 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from services import database
+from services.models import Task
+
+TASKS = 100_000
+SPRINTS = 100
+WORDS = [
+    "ревью", "оплата", "релиз", "отчёт", "миграция", "интеграция", "клиент", "заказ", "экспорт", "импорт",
+    "login", "payment", "refactor", "checkout", "webhook", "invoice", "search", "profile", "cache", "report"
+]
+QUERIES = ["рев", "оплата клиент", "релиз", "webhook", "pay inv", "миграция экспорт", "cache", "ref"]
+ROUNDS = 50
+
+
+def seed(rng):
+    per_sprint = TASKS // SPRINTS
+    for sprint in range(SPRINTS):
+        tasks = [
+            Task(f"t{sprint}-{n}", " ".join(rng.choices(WORDS, k=rng.randint(2, 6))) + f" #{n}", "", "open", 0)
+            for n in range(per_sprint)
+        ]
+        database.cache_sprint_tasks(tasks, "ws", f"s{sprint}")
+
+
+def timings(sprint_id):
+    results = []
+    for _ in range(ROUNDS):
+        for query in QUERIES:
+            started = time.perf_counter()
+            database.search_tasks(query, sprint_id)
+            results.append((time.perf_counter() - started) * 1000)
+    return results
+
+
+def report(label, results):
+    results.sort()
+    p95 = results[int(len(results) * 0.95)]
+    print(f"{label:14s} median {statistics.median(results):6.2f} ms   p95 {p95:6.2f} ms   max {results[-1]:6.2f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        database.DB_FILE = os.path.join(directory, "bench.db")
+        database.init_db()
+        started = time.perf_counter()
+        seed(random.Random(47))
+        print(f"seeded {TASKS} tasks in {time.perf_counter() - started:.1f} s")
+
+        report("all sprints", timings(None))
+        report("one sprint", timings("s7"))
+
+        before = [task.id for task in database.search_tasks("оплата клиент", "s7")]
+        with sqlite3.connect(database.DB_FILE) as conn:
+            conn.execute("VACUUM")
+        after = [task.id for task in database.search_tasks("оплата клиент", "s7")]
+        print("results unchanged after VACUUM:", before == after)
+
+
+if __name__ == "__main__":
+    main()
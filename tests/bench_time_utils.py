@@ -0,0 +1,24 @@
+import timeit
+from services.time_utils import parse_time_input, _parse
+from tests.test_time_utils import legacy_parse
+
+INPUTS = ["150", "90m", "1.5h", "45 мин", "2h30m", "1:30", "1ч 30м"]
+ROUNDS = 20000
+
+
+def per_call_ns(func, text):
+    return min(timeit.repeat(lambda: func(text), number=ROUNDS, repeat=5)) / ROUNDS * 1e9
+
+
+def main():
+    print(f"{'input':10s} {'legacy':>8s} {'cold':>8s} {'cached':>8s}  (ns per call)")
+    for text in INPUTS:
+        legacy = per_call_ns(legacy_parse, text) if legacy_parse(text) is not None else float("nan")
+        cold = per_call_ns(_parse.__wrapped__, text)
+        parse_time_input(text)
+        cached = per_call_ns(parse_time_input, text)
+        print(f"{text:10s} {legacy:8.0f} {cold:8.0f} {cached:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
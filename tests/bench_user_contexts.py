@@ -0,0 +1,66 @@
+import json
+import os
+import random
+import tempfile
+import time
+from services import database
+
+USERS = 10_000
+
+
+def make_context(rng, user_id):
+    workspace_id, sprint_id = str(rng.randint(1, 5)), str(rng.randint(900000000, 900000050))
+    return {
+        "current_workspace": workspace_id,
+        "current_sprint": sprint_id,
+        "current_user": str(81000000 + user_id),
+        "current_user_name": f"user{user_id}",
+        "current_workspace_data": {"id": workspace_id, "name": f"Workspace {workspace_id}", "color": "#7b68ee"},
+        "current_sprint_data": {"id": sprint_id, "name": f"Sprint {sprint_id}", "folder_id": "1", "folder_name": "Q4"},
+        "recent_picks": {"task": [f"86c{n:05x}" for n in range(3)]}
+    }
+
+
+def timed(label, func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:32s} {best * 1000:8.1f} ms")
+
+
+def main():
+    rng = random.Random(26)
+    contexts = {user_id: make_context(rng, user_id) for user_id in range(USERS)}
+    user_ids = list(contexts)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "state.db")
+        json_file = os.path.join(directory, "user_contexts.json")
+        database.init_state_db(db_file)
+
+        def rewrite_json():
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump({str(k): v for k, v in contexts.items()}, f, ensure_ascii=False, indent=2)
+
+        def load_json():
+            with open(json_file, encoding="utf-8") as f:
+                json.load(f)
+
+        timed("legacy JSON rewrite per change", rewrite_json)
+        timed("flush of all 10k users", lambda: database.save_user_contexts(contexts, db_file), repeat=3)
+        for dirty in (1, 10, 100):
+            batch = {user_id: contexts[user_id] for user_id in rng.sample(user_ids, dirty)}
+            timed(f"flush of {dirty} dirty users", lambda: database.save_user_contexts(batch, db_file))
+
+        timed("legacy JSON load of all 10k", load_json)
+        timed("lazy load of all 10k, one by one",
+              lambda: [database.load_user_context(user_id, db_file) for user_id in user_ids], repeat=1)
+        sample = rng.sample(user_ids, 100)
+        timed("lazy load of 100 users",
+              lambda: [database.load_user_context(user_id, db_file) for user_id in sample])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+from handlers import background
+
+
+class FakeQuery:
+    def __init__(self):
+        self.texts = []
+
+    async def answer(self, text=None):
+        pass
+
+    async def edit_message_text(self, text, reply_markup=None):
+        self.texts.append(text)
+
+
+def make_update(user_id):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=user_id), callback_query=FakeQuery())
+
+
+def make_context():
+    application = SimpleNamespace(create_task=lambda coroutine, update=None, name=None: asyncio.create_task(coroutine))
+    return SimpleNamespace(application=application)
+
+
+def test_jobs_of_one_user_run_one_at_a_time():
+    events = []
+
+    def job(name):
+        async def run(update, context):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+        return run
+
+    async def scenario():
+        update, context = make_update(1), make_context()
+        await background.run_in_background(update, context, "a", job("a"))
+        await background.run_in_background(update, context, "b", job("b"))
+        await asyncio.gather(*background.running_jobs.values())
+
+    asyncio.run(scenario())
+    assert events == ["a start", "a end", "b start", "b end"]
+    assert not background.user_job_locks
+
+
+def test_user_cancel_is_swallowed_and_shutdown_cancel_propagates():
+    async def forever(update, context):
+        await asyncio.sleep(3600)
+
+    async def scenario(by_user):
+        update = make_update(2)
+        await background.run_in_background(update, make_context(), "slow", forever)
+        task = background.running_jobs[(2, "slow")]
+        await asyncio.sleep(0)
+        if by_user:
+            assert background.cancel_jobs(2) == 1
+        else:
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task.cancelled(), update.callback_query.texts
+
+    assert asyncio.run(scenario(True)) == (False, ["❌ Операция отменена"])
+    assert asyncio.run(scenario(False)) == (True, ["❌ Операция отменена"])
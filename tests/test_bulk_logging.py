@@ -0,0 +1,38 @@
+import pytest
+from services import database, task_index
+from services.bulk_logging import MAX_BULK_LINES, parse_bulk
+from services.models import Task
+
+
+@pytest.fixture(autouse=True)
+def sprint(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "tasks.db"))
+    task_index.sprint_task_index.clear()
+    database.init_db()
+    database.cache_sprint_tasks([
+        Task("a1", "Ревью оплаты", "", "open", 0),
+        Task("a2", "Релиз 2.0", "", "open", 0),
+        Task("a3", "Релиз 2.1", "", "open", 0),
+    ], "ws", "s1")
+
+
+def test_lines_are_resolved_or_reported():
+    entries = parse_bulk("ревью оплаты 1h 30m\n\n#a2 45 мин\nрелиз 1ч\nнечто 2h\nревью", "s1")
+    assert [(entry.line_number, entry.task and entry.task.id, entry.minutes) for entry in entries] == [
+        (1, "a1", 90), (3, "a2", 45), (4, None, 0), (5, None, 0), (6, None, 0)
+    ]
+    assert entries[2].error.startswith("неоднозначно")
+    assert entries[3].error == "задача не найдена"
+    assert entries[4].error == "не распознано время"
+
+
+def test_lines_over_the_limit_are_reported():
+    entries = parse_bulk("\n".join(["#a1 10m"] * (MAX_BULK_LINES + 2)), "s1")
+    assert len(entries) == MAX_BULK_LINES + 2
+    assert [entry.error for entry in entries[MAX_BULK_LINES:]] == [f"не больше {MAX_BULK_LINES} строк в сообщении"] * 2
+
+
+def test_tasks_cached_after_the_index_was_built_are_found():
+    assert parse_bulk("миграция 1h", "s1")[0].error == "задача не найдена"
+    database.cache_sprint_tasks([Task("a4", "Миграция базы", "", "open", 0)], "ws", "s1")
+    assert parse_bulk("миграция 1h", "s1")[0].task.id == "a4"
@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+from handlers import buttons
+from services.conversation import ConversationState, ConversationStore
+
+
+class FakeQuery:
+    def __init__(self):
+        self.texts = []
+
+    async def edit_message_text(self, text, reply_markup=None):
+        self.texts.append(text)
+
+
+def test_store_is_bounded_and_expires():
+    store = ConversationStore(maxsize=2, ttl=60)
+    for user_id in (1, 2, 3):
+        store[user_id] = ConversationState("log_time")
+    assert sorted(store) == [2, 3] and store.evicted == 1
+
+    store.expire(store.timer() + 61)
+    assert not store and store.expired == 2
+
+
+def select(state, task_id, monkeypatch):
+    monkeypatch.setattr(buttons, "get_conversation_state", lambda user_id: state)
+    saved = []
+    monkeypatch.setattr(buttons, "set_conversation_state", lambda user_id, value: saved.append(value.task_id))
+    monkeypatch.setattr(buttons, "remember_pick", lambda *args: None)
+    monkeypatch.setattr(buttons, "log_time_prompt", lambda state, task_id: f"prompt {task_id}")
+    query = FakeQuery()
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=1), callback_query=query)
+    asyncio.run(buttons.select_task(update, None, task_id))
+    return query.texts, saved
+
+
+def test_select_task_accepts_only_listed_tasks(monkeypatch):
+    state = ConversationState("log_time", task_ids=frozenset({"a1", "a2"}))
+    assert select(state, "a2", monkeypatch) == (["prompt a2"], ["a2"])
+    assert select(state, "zz", monkeypatch) == (["❌ Ошибка: задача не найдена"], [])
+
+
+def test_select_task_without_state_reports_a_stale_list(monkeypatch):
+    assert select(None, "a1", monkeypatch) == (["⌛ Список устарел, откройте его заново"], [])
@@ -0,0 +1,42 @@
+import pytest
+from services import user_manager
+from services.conversation import ConversationState, ConversationStore
+from services.state_backend import state_backend
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_backend, "db_file", str(tmp_path / "state.db"))
+    state_backend.init()
+    monkeypatch.setattr(user_manager, "user_logging_state", ConversationStore(maxsize=10, ttl=60))
+
+
+def test_changes_and_removals_are_tracked():
+    store = ConversationStore(maxsize=10, ttl=60)
+    store[1] = ConversationState("log_time")
+    store[2] = ConversationState("log_time")
+    del store[2]
+    store.load(3, ConversationState("log_time"))
+
+    changed, removed = store.take_changes()
+    assert list(changed) == [1] and removed == {2}
+    assert store.take_changes() == ({}, set())
+
+    store.expire(store.timer() + 61)
+    assert store.take_changes() == ({}, {1, 3})
+
+
+def test_flushed_state_is_restored_after_a_restart(monkeypatch):
+    state = ConversationState("log_time", task_id="a1", sprint_id="s1", clickup_user_id="u1",
+                              task_ids=frozenset({"a1", "a2"}))
+    user_manager.set_conversation_state(7, state)
+    user_manager.set_conversation_state(8, ConversationState("log_time"))
+    user_manager.flush_conversation_state()
+    user_manager.clear_conversation_state(8)
+    user_manager.flush_conversation_state()
+
+    monkeypatch.setattr(user_manager, "user_logging_state", ConversationStore(maxsize=10, ttl=60))
+    assert user_manager.restore_conversation_state() == 1
+    restored = user_manager.get_conversation_state(7)
+    assert restored.to_row()[:5] == state.to_row()[:5] and restored.task_ids == state.task_ids
+    assert user_manager.get_conversation_state(8) is None
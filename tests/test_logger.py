@@ -0,0 +1,24 @@
+import logging
+import queue
+from utils.logger import NonBlockingQueueHandler, RepeatedErrorFilter
+
+
+def make_record(msg, *args, level=logging.ERROR):
+    return logging.LogRecord("bot", level, __file__, 1, msg, args, None)
+
+
+def test_repeated_errors_with_different_arguments_are_suppressed():
+    dedup = RepeatedErrorFilter(window=60)
+    assert dedup.filter(make_record("Error loading user context %s: %s", 1, "locked"))
+    assert not dedup.filter(make_record("Error loading user context %s: %s", 2, "locked"))
+    assert dedup.filter(make_record("Error saving user contexts: %s", "locked"))
+    assert dedup.filter(make_record("Loaded %s", 3, level=logging.INFO))
+
+
+def test_message_is_formatted_when_queued():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    state = {"step": 1}
+    record = make_record("state %s", state)
+    handler.enqueue(handler.prepare(record))
+    state["step"] = 2
+    assert handler.queue.get_nowait().getMessage() == "state {'step': 1}"
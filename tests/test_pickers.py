@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from handlers import pickers
+from services import database
+from services.models import Task
+
+NAMES = ["Альфа", "бета", "Бета 2", "Гамма", "дельта", "Дельта 2", "Эпсилон"]
+
+
+def collect(load, prefix="", recent_ids=(), limit=2):
+    pages, cursor = [], None
+    while True:
+        recent, rows = asyncio.run(load(1, prefix, cursor, False, limit, list(recent_ids)))
+        pages.append([item[2] for item in rows[:limit]])
+        if len(rows) <= limit:
+            return recent, pages
+        cursor = rows[limit - 1][1]
+
+
+def test_memory_loader_pages_with_keyset_cursors():
+    items = [(str(n), name) for n, name in enumerate(NAMES)]
+
+    async def source(user_id):
+        return "test", items, lambda: items
+
+    load = pickers.memory_loader(source)
+    recent, pages = collect(load, recent_ids=["3"])
+    assert [item[2] for item in recent] == ["Гамма"]
+    assert pages == [["Альфа", "бета"], ["Бета 2", "дельта"], ["Дельта 2", "Эпсилон"]]
+
+    assert collect(load, prefix="де")[1] == [["дельта", "Дельта 2"]]
+
+    _, back = asyncio.run(load(1, "", "4", True, 2, []))
+    assert [item[2] for item in back] == ["бета", "Бета 2", "Гамма"]
+
+
+def test_sprint_task_pages_follow_the_same_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "tasks.db"))
+    database.init_db()
+    database.cache_sprint_tasks([Task(str(n), name, "", "open", 60) for n, name in enumerate(NAMES)], "ws", "s1")
+
+    def load(user_id, prefix, cursor, backwards, limit, recent_ids):
+        return asyncio.to_thread(pickers.load_sprint_tasks, "s1", prefix, cursor, backwards, limit, recent_ids)
+
+    recent, pages = collect(load, recent_ids=["3"])
+    assert [item[1] for item in recent] == ["3"]
+    # NOCASE folds ASCII only, so Cyrillic names sort by code point here; paging must still see every task once.
+    names = [label.split(" (")[0] for page in pages for label in page]
+    assert names == sorted(set(NAMES) - {"Гамма"})
+    assert all(len(page) == 2 for page in pages)
+
+
+@pytest.mark.parametrize("cursor", ["missing", ""])
+def test_unknown_cursor_starts_from_the_beginning(cursor):
+    async def source(user_id):
+        return "cursor", NAMES, lambda: [(str(n), name) for n, name in enumerate(NAMES)]
+
+    _, rows = asyncio.run(pickers.memory_loader(source)(1, "", cursor or None, False, 2, []))
+    assert [item[2] for item in rows] == ["Альфа", "бета", "Бета 2"]
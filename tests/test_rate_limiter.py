@@ -0,0 +1,53 @@
+import asyncio
+import time
+from bot.rate_limiter import OutboundRateLimiter, SlidingWindowLimiter
+
+
+def test_pending_edit_is_coalesced_into_the_newer_one():
+    calls = []
+
+    async def call(text):
+        calls.append(text)
+        return True
+
+    async def scenario():
+        limiter = OutboundRateLimiter()
+        limiter.chat_limiters[5] = SlidingWindowLimiter(1, 0.05)
+        request = lambda endpoint, text, **data: limiter.process_request(
+            call, (text,), {}, endpoint, {"chat_id": 5, **data}, None
+        )
+        await request("sendMessage", "send")
+        await asyncio.gather(
+            request("editMessageText", "old", message_id=1),
+            request("deleteMessage", "delete", message_id=2),
+            request("editMessageText", "new", message_id=1)
+        )
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert calls == ["send", "delete", "new"]
+    assert limiter.coalesced == 1
+    assert list(limiter.edit_generations.keys()) == [(5, 1)]
+
+
+def test_private_chat_allows_a_burst():
+    async def scenario():
+        limiter = OutboundRateLimiter(chat_per_second=1, chat_burst=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.process_request(lambda: asyncio.sleep(0, True), (), {}, "sendMessage", {"chat_id": 7}, None)
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_refund_releases_the_reserved_slot():
+    async def scenario():
+        limiter = SlidingWindowLimiter(3, 60.0)
+        first = await limiter.acquire()
+        await limiter.acquire()
+        limiter.refund(first)
+        return limiter.calls, first
+
+    calls, first = asyncio.run(scenario())
+    assert len(calls) == 1 and first not in calls
@@ -0,0 +1,26 @@
+from handlers import reports
+from services import database
+from services.models import Task
+
+
+def test_render_is_reused_until_the_sprint_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "tasks.db"))
+    database.init_db()
+    reports.render_cache.clear()
+    database.cache_sprint_tasks([Task("a1", "Ревью", "", "open", 60)], "ws", "s1")
+
+    builds = []
+    monkeypatch.setitem(reports.REPORT_BUILDERS, "show_all_tasks",
+                        lambda sprint_id, scope: builds.append(sprint_id) or [f"render {len(builds)}"])
+
+    assert reports.cached_render("show_all_tasks", "s1") == ["render 1"]
+    assert reports.cached_render("show_all_tasks", "s1") == ["render 1"]
+
+    database.cache_sprint_tasks([Task("a1", "Ревью", "", "open", 60)], "ws", "s1")
+    assert reports.cached_render("show_all_tasks", "s1") == ["render 1"]
+
+    database.log_time_locally("a1", "u1", "ivan", 30)
+    assert reports.cached_render("show_all_tasks", "s1") == ["render 2"]
+    database.cache_sprint_tasks([Task("a1", "Ревью кода", "", "open", 60)], "ws", "s1")
+    assert reports.cached_render("show_all_tasks", "s1") == ["render 3"]
+    assert builds == ["s1"] * 3
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from handlers import router
+from services.state_backend import state_backend
+
+
+async def paged(update, context, kind, direction, cursor="", prefix=""):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def routes(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_backend, "db_file", str(tmp_path / "state.db"))
+    state_backend.init()
+    monkeypatch.setattr(router, "routes", {})
+    monkeypatch.setattr(router, "route_arity", {})
+    monkeypatch.setattr(router, "route_codes", {})
+    monkeypatch.setattr(router, "action_codes", {})
+    router.register("pick", paged, code="k")
+
+
+def test_inline_args():
+    data = router.callback_data("pick", "ws", "next", "42")
+    assert data == "1k|ws|next|42"
+    assert router.resolve(data) == ("pick", paged, ("ws", "next", "42"))
+
+
+@pytest.mark.parametrize("data", ["pick", "1k|ws", "1k|ws|next|42|abc|extra"])
+def test_wrong_argument_count_is_stale(data):
+    assert router.resolve(data) == ("pick", None, ())
+
+
+def test_stored_payload_survives_restart():
+    data = router.callback_data("pick", "task", "next", "42", "Ревью кода")
+    assert data.startswith("1k#")
+    router.payload_store.clear()
+    assert router.resolve(data) == ("pick", paged, ("task", "next", "42", "Ревью кода"))
+
+
+def test_unknown_payload_is_stale():
+    assert router.resolve("1k#missing") == ("pick", None, ())
+
+
+def test_payloads_rendered_together_are_written_in_one_batch(monkeypatch):
+    batches = []
+    monkeypatch.setattr(state_backend, "save_callback_payloads", lambda payloads, ttl: batches.append(dict(payloads)))
+
+    async def scenario():
+        keys = [router.callback_data("pick", "task", "next", str(n), "Ревью") for n in range(3)]
+        assert not batches
+        await asyncio.gather(*router.flush_tasks)
+        return keys
+
+    keys = asyncio.run(scenario())
+    assert len(batches) == 1
+    assert sorted(batches[0]) == sorted(key[3:] for key in keys)
@@ -0,0 +1,39 @@
+import sqlite3
+import pytest
+from services import database
+from services.models import Task
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.db")
+    monkeypatch.setattr(database, "DB_FILE", path)
+    return path
+
+
+def test_legacy_text_keyed_tasks_are_migrated(db_file):
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("""
+            CREATE TABLE tasks (task_id TEXT PRIMARY KEY, name TEXT NOT NULL, url TEXT, status TEXT,
+                                workspace_id TEXT, sprint_id TEXT, estimated_minutes REAL, last_updated REAL)
+        """)
+        conn.execute("INSERT INTO tasks VALUES ('a1', 'Ревью оплаты', '', 'open', 'ws', 's1', 60, 0)")
+
+    database.init_db()
+
+    with sqlite3.connect(db_file) as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(tasks)")]
+    assert columns[:2] == ["id", "task_id"]
+    assert [task.id for task in database.search_tasks("ревью", "s1")] == ["a1"]
+
+
+def test_search_survives_vacuum(db_file):
+    database.init_db()
+    database.cache_sprint_tasks([Task(f"t{n}", f"Задача {n}", "", "open", 0) for n in range(50)], "ws", "s1")
+    database.cache_sprint_tasks([Task("x", "Оплата клиента", "", "open", 0)], "ws", "s2")
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("DELETE FROM tasks WHERE sprint_id = 's1'")
+        conn.commit()
+        conn.execute("VACUUM")
+
+    assert [task.id for task in database.search_tasks("оплата")] == ["x"]
@@ -0,0 +1,43 @@
+import asyncio
+import httpx
+from services import clickup
+from services.sprint_sync import SyncBudget
+
+
+def paged_transport(pages):
+    def handler(request):
+        page = int(request.url.params["page"])
+        tasks = [{"id": f"{page}-{n}", "name": f"Task {n}"} for n in range(pages[page])]
+        return httpx.Response(200, json={"tasks": tasks, "last_page": page == len(pages) - 1})
+    return httpx.MockTransport(handler)
+
+
+def test_every_extra_page_is_charged_to_the_budget(monkeypatch):
+    monkeypatch.setattr(clickup, "CLICKUP_API_TOKEN", "token")
+    charged = []
+
+    async def charge():
+        charged.append(True)
+
+    async def scenario():
+        clickup.page_budget.set(charge)
+        async with httpx.AsyncClient(transport=paged_transport([100, 100, 37])) as client:
+            return await clickup.fetch_list_tasks(client, "list", {})
+
+    tasks = asyncio.run(scenario())
+    assert len(tasks) == 237
+    assert len(charged) == 2
+
+
+def test_budget_spend_waits_for_a_token():
+    budget = SyncBudget(per_minute=600)
+    assert budget.take()
+    budget.tokens = 0.5
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await budget.spend()
+        return loop.time() - started
+
+    assert 0.03 < asyncio.run(scenario()) < 0.5
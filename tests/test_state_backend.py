@@ -0,0 +1,51 @@
+import time
+import pytest
+from services.state_backend import InProcessStateBackend, SQLiteSharedStateBackend
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    db_file = str(tmp_path / "state.db")
+    first, second = SQLiteSharedStateBackend(db_file), SQLiteSharedStateBackend(db_file)
+    second.origin += "-second"
+    first.init()
+    second.init()
+    return first, second
+
+
+def test_invalidations_reach_other_replicas_only(replicas):
+    first, second = replicas
+    first.save_user_contexts({1: {"current_sprint": "s1"}})
+    first.publish_invalidation("clickup", ["get_all_tasks_in_sprint:s1"])
+
+    assert first.poll_invalidations() == []
+    assert second.poll_invalidations() == [("user_context", "1"), ("clickup", "get_all_tasks_in_sprint:s1")]
+    assert second.poll_invalidations() == []
+    assert second.load_user_context(1) == {"current_sprint": "s1"}
+
+
+def test_conversation_state_is_shared(replicas):
+    first, second = replicas
+    first.save_conversation_states({5: ("log_time", "a1", "s1", "ws", "u1", "a1 a2")}, [], ttl=60)
+    assert second.load_conversation_state(5) == ("log_time", "a1", "s1", "ws", "u1", "a1 a2")
+    first.save_conversation_states({}, [5], ttl=60)
+    assert second.load_conversation_state(5) is None
+
+
+def test_lease_is_held_renewed_and_taken_over_after_expiry(replicas):
+    first, second = replicas
+    assert first.try_acquire_leadership("sprint_sync", ttl=0.2)
+    assert not second.try_acquire_leadership("sprint_sync", ttl=0.2)
+    assert first.try_acquire_leadership("sprint_sync", ttl=0.2)
+
+    time.sleep(0.3)
+    assert second.try_acquire_leadership("sprint_sync", ttl=0.2)
+    assert not first.try_acquire_leadership("sprint_sync", ttl=0.2)
+
+
+def test_in_process_backend_always_leads(tmp_path):
+    backend = InProcessStateBackend(str(tmp_path / "state.db"))
+    backend.init()
+    assert backend.try_acquire_leadership("sprint_sync", ttl=1)
+    backend.publish_invalidation("clickup", ["x"])
+    assert backend.poll_invalidations() == []
@@ -0,0 +1,76 @@
+import random
+import pytest
+from services.time_utils import parse_time_input, parse_time_inputs, split_duration, _parse
+from utils.config import WORKDAY_HOURS
+
+
+def legacy_parse(time_str):
+    try:
+        total_minutes = 0
+        if 'h' in time_str:
+            total_minutes += float(time_str.split('h')[0]) * 60
+        if 'm' in time_str:
+            minutes_part = time_str.split('m')[0]
+            if 'h' in minutes_part:
+                minutes_part = minutes_part.split('h')[-1]
+            total_minutes += float(minutes_part)
+        if 'h' not in time_str and 'm' not in time_str:
+            total_minutes = float(time_str)
+        return int(total_minutes * 60 * 1000)
+    except ValueError:
+        return None
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("150", 150), ("  30  ", 30), ("1.5h", 90), ("1,5h", 90), ("0.25h", 15), ("90m", 90), ("2h30m", 150),
+    ("1h 30m", 90), ("1h 30", 90), ("1ч30", 90), ("1hour30min", 90), ("1:30", 90), ("0:45", 45),
+    ("1H", 60), ("45 min", 45), ("1 hour", 60), ("2 hours 5 mins", 125), ("90 мин", 90), ("2ч", 120),
+    ("2 часа 15 минут", 135), ("1 ч 30 м", 90), ("1d", WORKDAY_HOURS * 60), ("1д 2ч", WORKDAY_HOURS * 60 + 120)
+])
+def test_parses(text, minutes):
+    assert parse_time_input(text) == int(minutes * 60 * 1000)
+
+
+@pytest.mark.parametrize("text", ["", "abc", "h", "1x", "-5", "1h1h", "5m 1h", "1:75", "1.5.5h", ".5h", "١٢", "１２"])
+def test_rejects(text):
+    assert parse_time_input(text) is None
+
+
+def test_batch_matches_single():
+    texts = ["1h", "bad", "90", "1:15"]
+    assert parse_time_inputs(texts) == [parse_time_input(text) for text in texts]
+
+
+def test_split_duration():
+    assert split_duration("ревью 1 ч 30 мин") == ("ревью", 90 * 60000)
+    assert split_duration("оплата 2 1h") == ("оплата 2", 60 * 60000)
+    assert split_duration("релиз 2 30") == ("релиз 2", 30 * 60000)
+    assert split_duration("1h") == ("1h", None)
+    assert split_duration("задача") == ("задача", None)
+
+
+def test_spellings_agree():
+    rng = random.Random(3)
+    for _ in range(5000):
+        hours, minutes = rng.randint(0, 12), rng.randint(0, 59)
+        expected = (hours * 60 + minutes) * 60000
+        for text in (f"{hours}h{minutes}m", f"{hours}h {minutes}m", f"{hours}:{minutes:02d}", f"{hours}ч {minutes}мин",
+                     f"{hours} часа {minutes} минут", f"{hours * 60 + minutes}", f"{hours * 60 + minutes}m"):
+            assert parse_time_input(text) == expected, text
+
+
+def test_agrees_with_legacy_parser():
+    rng = random.Random(4)
+    for _ in range(5000):
+        hours, minutes = rng.randint(0, 12), rng.randint(0, 59)
+        for text in (f"{hours}h{minutes}m", f"{hours * 60 + minutes}", f"{hours}.5h", f"{minutes}m"):
+            assert parse_time_input(text) == legacy_parse(text), text
+
+
+def test_fuzz_never_raises():
+    rng = random.Random(5)
+    alphabet = "0123456789.,: hmdчмдинасутyourHMD-١"
+    for _ in range(50000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        result = _parse.__wrapped__(text)
+        assert result is None or (isinstance(result, int) and result >= 0), text
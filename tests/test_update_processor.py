@@ -0,0 +1,37 @@
+import asyncio
+from telegram import CallbackQuery, Update, User
+from bot.update_processor import PerUserUpdateProcessor
+
+
+def make_update(update_id, user_id):
+    user = User(id=user_id, first_name="user", is_bot=False)
+    return Update(update_id, callback_query=CallbackQuery(str(update_id), user, "chat", data="show_menu"))
+
+
+def test_updates_of_one_user_run_in_order_while_users_run_concurrently():
+    events = []
+    running = {"now": 0, "max": 0}
+
+    async def handle(name, delay):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        events.append(f"{name} start")
+        await asyncio.sleep(delay)
+        events.append(f"{name} end")
+        running["now"] -= 1
+
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent_updates=2)
+        await asyncio.gather(
+            processor.process_update(make_update(1, 10), handle("a1", 0.03)),
+            processor.process_update(make_update(2, 10), handle("a2", 0)),
+            processor.process_update(make_update(3, 20), handle("b1", 0.01)),
+            processor.process_update(make_update(4, 30), handle("c1", 0.01)),
+        )
+        return processor
+
+    processor = asyncio.run(scenario())
+    assert events.index("a1 end") < events.index("a2 start")
+    assert events.index("b1 start") < events.index("a1 end")
+    assert running["max"] == 2
+    assert processor.total_pending == 0 and not processor._key_locks
@@ -0,0 +1,58 @@
+import threading
+import pytest
+from services import user_manager
+from services.state_backend import state_backend
+
+
+@pytest.fixture(autouse=True)
+def contexts(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_backend, "db_file", str(tmp_path / "state.db"))
+    state_backend.init()
+    monkeypatch.setattr(user_manager, "user_data", user_manager.UserContextCache(maxsize=2))
+    monkeypatch.setattr(user_manager, "dirty_users", set())
+
+
+def test_changes_are_deferred_and_flushed():
+    user_manager.update_user_context(1, "current_sprint", "s1")
+    assert 1 in user_manager.dirty_users
+    user_manager.save_user_data()
+    assert not user_manager.dirty_users
+    assert state_backend.load_user_context(1)["current_sprint"] == "s1"
+
+
+def test_evicted_dirty_context_is_saved_outside_the_data_lock(monkeypatch):
+    user_manager.update_user_context(1, "current_sprint", "s1")
+    user_manager.update_user_context(2, "current_sprint", "s2")
+    user_manager.save_user_data()
+    user_manager.update_user_context(1, "current_sprint", "s1b")
+
+    lock_free = []
+    save = state_backend.save_user_contexts
+
+    def checked_save(contexts):
+        probe = threading.Thread(target=lambda: lock_free.append(
+            user_manager.data_lock.acquire(blocking=False) and (user_manager.data_lock.release() or True)
+        ))
+        probe.start()
+        probe.join()
+        return save(contexts)
+
+    monkeypatch.setattr(state_backend, "save_user_contexts", checked_save)
+    user_manager.get_user_context(2)
+    user_manager.get_user_context(3)
+
+    assert 1 not in user_manager.user_data
+    assert not user_manager.user_data.evicted_dirty
+    assert state_backend.load_user_context(1)["current_sprint"] == "s1b"
+    assert lock_free and all(lock_free)
+
+
+def test_reloaded_user_gets_the_unsaved_evicted_context(monkeypatch):
+    monkeypatch.setattr(state_backend, "save_user_contexts", lambda contexts: False)
+    user_manager.update_user_context(1, "current_sprint", "s1")
+    user_manager.get_user_context(2)
+    user_manager.get_user_context(3)
+    assert 1 in user_manager.user_data.evicted_dirty
+
+    assert user_manager.get_user_context(1).current_sprint == "s1"
+    assert 1 in user_manager.dirty_users
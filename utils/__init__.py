@@ -3,16 +3,61 @@ from .config import (
     CLICKUP_API_TOKEN,
     ADMIN_SALT,
     DB_FILE,
-    DATA_FILE
+    DATA_FILE,
+    USER_CONTEXT_CACHE_SIZE,
+    CONVERSATION_TTL,
+    CONVERSATION_MAX_STATES,
+    CONVERSATION_FLUSH_INTERVAL,
+    CONTEXT_LOCK_STRIPES,
+    STATE_BACKEND,
+    STATE_DB_FILE,
+    STATE_SYNC_INTERVAL,
+    BOT_MODE,
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_DELETE_ON_STOP,
+    MAX_CONCURRENT_UPDATES,
+    MAX_BACKGROUND_JOBS,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_CHAT_RATE,
+    TELEGRAM_CHAT_BURST,
+    TELEGRAM_GROUP_RATE,
+    TELEGRAM_MAX_RETRIES,
+    STATUS_MESSAGE_DELAY,
+    THROTTLE_BUCKET_CAPACITY,
+    THROTTLE_REFILL_PER_SECOND,
+    REFRESH_COOLDOWN,
+    VIEW_COOLDOWN,
+    METRICS_HOST,
+    METRICS_PORT,
+    TRACE_BUFFER_SIZE,
+    TRACE_SLOWEST_KEEP,
+    TRACE_EXPORT_FILE,
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_RATES,
+    LOG_ERROR_WINDOW,
+    SPRINT_SYNC_TICK,
+    SPRINT_SYNC_BASE_INTERVAL,
+    SPRINT_SYNC_MIN_INTERVAL,
+    SPRINT_SYNC_MAX_INTERVAL,
+    SPRINT_SYNC_IDLE_TTL,
+    SPRINT_SYNC_WORK_HOURS,
+    CLICKUP_SYNC_BUDGET_PER_MINUTE,
+    CLICKUP_CACHE_SIZE,
+    CALLBACK_STORE_SIZE,
+    CALLBACK_STORE_TTL,
+    PICKER_PAGE_SIZE,
+    PICKER_RECENT_ITEMS,
+    WORKDAY_HOURS
 )
 
-from .logger import logger
-from .formatting import (
-    format_members,
-    format_sprints,
-    format_workspaces,
-    format_tasks
-)
+from .logger import logger, stop_logging
 
 __all__ = [
     'TELEGRAM_BOT_TOKEN',
@@ -20,9 +65,57 @@ __all__ = [
     'ADMIN_SALT',
     'DB_FILE',
     'DATA_FILE',
+    'USER_CONTEXT_CACHE_SIZE',
+    'CONVERSATION_TTL',
+    'CONVERSATION_MAX_STATES',
+    'CONVERSATION_FLUSH_INTERVAL',
+    'CONTEXT_LOCK_STRIPES',
+    'STATE_BACKEND',
+    'STATE_DB_FILE',
+    'STATE_SYNC_INTERVAL',
+    'BOT_MODE',
+    'WEBHOOK_URL',
+    'WEBHOOK_PATH',
+    'WEBHOOK_LISTEN',
+    'WEBHOOK_PORT',
+    'WEBHOOK_SECRET',
+    'WEBHOOK_MAX_CONNECTIONS',
+    'WEBHOOK_DELETE_ON_STOP',
+    'MAX_CONCURRENT_UPDATES',
+    'MAX_BACKGROUND_JOBS',
+    'TELEGRAM_GLOBAL_RATE',
+    'TELEGRAM_CHAT_RATE',
+    'TELEGRAM_CHAT_BURST',
+    'TELEGRAM_GROUP_RATE',
+    'TELEGRAM_MAX_RETRIES',
+    'STATUS_MESSAGE_DELAY',
+    'THROTTLE_BUCKET_CAPACITY',
+    'THROTTLE_REFILL_PER_SECOND',
+    'REFRESH_COOLDOWN',
+    'VIEW_COOLDOWN',
+    'METRICS_HOST',
+    'METRICS_PORT',
+    'TRACE_BUFFER_SIZE',
+    'TRACE_SLOWEST_KEEP',
+    'TRACE_EXPORT_FILE',
+    'LOG_LEVEL',
+    'LOG_FORMAT',
+    'LOG_QUEUE_SIZE',
+    'LOG_SAMPLE_RATES',
+    'LOG_ERROR_WINDOW',
+    'SPRINT_SYNC_TICK',
+    'SPRINT_SYNC_BASE_INTERVAL',
+    'SPRINT_SYNC_MIN_INTERVAL',
+    'SPRINT_SYNC_MAX_INTERVAL',
+    'SPRINT_SYNC_IDLE_TTL',
+    'SPRINT_SYNC_WORK_HOURS',
+    'CLICKUP_SYNC_BUDGET_PER_MINUTE',
+    'CLICKUP_CACHE_SIZE',
+    'CALLBACK_STORE_SIZE',
+    'CALLBACK_STORE_TTL',
+    'PICKER_PAGE_SIZE',
+    'PICKER_RECENT_ITEMS',
+    'WORKDAY_HOURS',
     'logger',
-    'format_members',
-    'format_sprints',
-    'format_workspaces',
-    'format_tasks'
+    'stop_logging'
 ]
\ No newline at end of file
@@ -6,5 +6,58 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 CLICKUP_API_TOKEN = os.getenv('CLICKUP_API_TOKEN')
 ADMIN_SALT = os.getenv('ADMIN_SALT', 'default_secret_salt')
-DB_FILE = "timelogger.db"
-DATA_FILE = "user_contexts.json"
\ No newline at end of file
+# With STATE_BACKEND=sqlite every replica must point DB_FILE (logged time, cached tasks) and
+# STATE_DB_FILE at the same file on shared storage; a per-replica DB_FILE splits the logged time.
+DB_FILE = os.getenv('DB_FILE', 'timelogger.db')
+DATA_FILE = "user_contexts.json"
+USER_CONTEXT_CACHE_SIZE = int(os.getenv('USER_CONTEXT_CACHE_SIZE', '1000'))
+CONVERSATION_TTL = int(os.getenv('CONVERSATION_TTL', '1800'))
+CONVERSATION_MAX_STATES = int(os.getenv('CONVERSATION_MAX_STATES', '10000'))
+CONVERSATION_FLUSH_INTERVAL = int(os.getenv('CONVERSATION_FLUSH_INTERVAL', '5'))
+CONTEXT_LOCK_STRIPES = int(os.getenv('CONTEXT_LOCK_STRIPES', '64'))
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'memory').lower()
+STATE_DB_FILE = os.getenv('STATE_DB_FILE', DB_FILE)
+STATE_SYNC_INTERVAL = float(os.getenv('STATE_SYNC_INTERVAL', '2'))
+BOT_MODE = os.getenv('BOT_MODE', 'polling').lower()
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '8443'))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))
+WEBHOOK_DELETE_ON_STOP = os.getenv('WEBHOOK_DELETE_ON_STOP', 'true').lower() == 'true'
+MAX_CONCURRENT_UPDATES = int(os.getenv('MAX_CONCURRENT_UPDATES', '16'))
+MAX_BACKGROUND_JOBS = int(os.getenv('MAX_BACKGROUND_JOBS', '4'))
+TELEGRAM_GLOBAL_RATE = int(os.getenv('TELEGRAM_GLOBAL_RATE', '30'))
+TELEGRAM_CHAT_RATE = int(os.getenv('TELEGRAM_CHAT_RATE', '1'))
+TELEGRAM_CHAT_BURST = int(os.getenv('TELEGRAM_CHAT_BURST', '3'))
+TELEGRAM_GROUP_RATE = int(os.getenv('TELEGRAM_GROUP_RATE', '20'))
+TELEGRAM_MAX_RETRIES = int(os.getenv('TELEGRAM_MAX_RETRIES', '3'))
+STATUS_MESSAGE_DELAY = float(os.getenv('STATUS_MESSAGE_DELAY', '0.7'))
+THROTTLE_BUCKET_CAPACITY = int(os.getenv('THROTTLE_BUCKET_CAPACITY', '10'))
+THROTTLE_REFILL_PER_SECOND = float(os.getenv('THROTTLE_REFILL_PER_SECOND', '0.5'))
+REFRESH_COOLDOWN = float(os.getenv('REFRESH_COOLDOWN', '30'))
+VIEW_COOLDOWN = float(os.getenv('VIEW_COOLDOWN', '5'))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9464'))
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '200'))
+TRACE_SLOWEST_KEEP = int(os.getenv('TRACE_SLOWEST_KEEP', '20'))
+TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE', '')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+LOG_ERROR_WINDOW = float(os.getenv('LOG_ERROR_WINDOW', '60'))
+SPRINT_SYNC_TICK = float(os.getenv('SPRINT_SYNC_TICK', '15'))
+SPRINT_SYNC_BASE_INTERVAL = float(os.getenv('SPRINT_SYNC_BASE_INTERVAL', '300'))
+SPRINT_SYNC_MIN_INTERVAL = float(os.getenv('SPRINT_SYNC_MIN_INTERVAL', '60'))
+SPRINT_SYNC_MAX_INTERVAL = float(os.getenv('SPRINT_SYNC_MAX_INTERVAL', '3600'))
+SPRINT_SYNC_IDLE_TTL = float(os.getenv('SPRINT_SYNC_IDLE_TTL', '21600'))
+SPRINT_SYNC_WORK_HOURS = os.getenv('SPRINT_SYNC_WORK_HOURS', '9-19')
+CLICKUP_SYNC_BUDGET_PER_MINUTE = float(os.getenv('CLICKUP_SYNC_BUDGET_PER_MINUTE', '20'))
+CLICKUP_CACHE_SIZE = int(os.getenv('CLICKUP_CACHE_SIZE', '500'))
+CALLBACK_STORE_SIZE = int(os.getenv('CALLBACK_STORE_SIZE', '50000'))
+CALLBACK_STORE_TTL = int(os.getenv('CALLBACK_STORE_TTL', '86400'))
+PICKER_PAGE_SIZE = int(os.getenv('PICKER_PAGE_SIZE', '8'))
+PICKER_RECENT_ITEMS = int(os.getenv('PICKER_RECENT_ITEMS', '3'))
+WORKDAY_HOURS = float(os.getenv('WORKDAY_HOURS', '8'))
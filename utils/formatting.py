@@ -1,52 +1,26 @@
-from typing import List, Dict
+from typing import List
 
-def format_members(members: List[Dict]) -> List[Dict]:
-    formatted = []
-    for member in members:
-        formatted.append({
-            "id": member.get("id"),
-            "username": member.get("username", "Unknown"),
-            "email": member.get("email", ""),
-            "initials": member.get("initials", "?"),
-            "color": member.get("color", "#000000")
-        })
-    return formatted
+TELEGRAM_TEXT_LIMIT = 4096
+PAGE_MARKER_RESERVE = 32
 
 
-def format_sprints(sprints: List[Dict]) -> List[Dict]:
-    return [
-        {
-            "id": sprint["id"],
-            "name": sprint["name"],
-            "folder_id": sprint["folder_id"],
-            "folder_name": sprint["folder_name"]
-        }
-        for sprint in sprints
-    ]
+def text_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
 
 
-def format_workspaces(workspaces: List[Dict]) -> List[Dict]:
-    return [
-        {
-            "id": ws["id"],
-            "name": ws.get("name", f"Workspace {ws['id']}"),
-            "color": ws.get("color", "#000000")
-        }
-        for ws in workspaces
-    ]
+def paginate(header: str, blocks: List[str], footer: str = "", limit: int = TELEGRAM_TEXT_LIMIT) -> List[str]:
+    budget = limit - PAGE_MARKER_RESERVE - text_length(header)
+    pages: List[List[str]] = []
+    current: List[str] = []
+    size = 0
 
+    for block in (blocks + [footer] if footer else blocks):
+        block_size = text_length(block)
+        if current and size + block_size > budget:
+            pages.append(current)
+            current, size = [], 0
+        current.append(block)
+        size += block_size
+    pages.append(current)
 
-def format_tasks(tasks: List[Dict]) -> List[Dict]:
-    formatted = []
-    for task in tasks:
-        estimated_ms = task.get("time_estimate")
-        estimated_minutes = estimated_ms / 60000.0 if estimated_ms else 0
-
-        formatted.append({
-            "id": task["id"],
-            "name": task.get("name", f"Task {task['id']}"),
-            "url": task.get("url", ""),
-            "status": task.get("status", {}).get("status", "unknown"),
-            "estimated_minutes": estimated_minutes
-        })
-    return formatted
\ No newline at end of file
+    return [header + "".join(page) for page in pages]
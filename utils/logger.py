@@ -1,14 +1,149 @@
+import atexit
 import functools
+import json
 import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+from utils.config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES, LOG_ERROR_WINDOW
 
-def setup_logger() -> logging.Logger:
-    logging.basicConfig(
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        level=logging.INFO
-    )
-    return logging.getLogger(__name__)
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        for key, value in record.__dict__.items():
+            if key.startswith("ctx_"):
+                entry[key[4:]] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, level_rates: Dict[int, float]) -> None:
+        super().__init__()
+        self.level_rates = level_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is None:
+            rate = self.level_rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RepeatedErrorFilter(logging.Filter):
+    def __init__(self, window: float, max_keys: int = 1000) -> None:
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self.seen: Dict[Tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.ERROR or self.window <= 0:
+            return True
+
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, str(record.msg), exc_type)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+
+            suppressed = entry[1] if entry is not None else 0
+            if len(self.seen) >= self.max_keys:
+                self.seen = {k: v for k, v in self.seen.items() if now - v[0] < self.window}
+            self.seen[key] = [now, 0]
+
+        if suppressed:
+            record.msg = f"{record.msg} [ещё {suppressed} таких за {self.window:.0f} с]"
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments may be mutated after the call returns, so the message is formatted here.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        level, _, rate = item.partition(":")
+        levelno = logging.getLevelName(level.strip().upper())
+        if isinstance(levelno, int):
+            rates[levelno] = float(rate)
+    return rates
+
+
+def setup_logger() -> Tuple[logging.Logger, logging.handlers.QueueListener, NonBlockingQueueHandler]:
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+    queue_handler.addFilter(RepeatedErrorFilter(LOG_ERROR_WINDOW))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+
+    return logging.getLogger(__name__), listener, queue_handler
+
+logger, log_listener, log_queue_handler = setup_logger()
+
+
+logging_stopped = threading.Event()
+
+
+def stop_logging() -> None:
+    if logging_stopped.is_set():
+        return
+    logging_stopped.set()
+    log_listener.stop()
+
+
+atexit.register(stop_logging)
 
-logger = setup_logger()
 
 def log_exceptions(func):
     @functools.wraps(func)
@@ -16,5 +151,5 @@ def log_exceptions(func):
         try:
             return await func(*args, **kwargs)
         except Exception as e:
-            logger.exception(f"Exception in {func.__name__}: {e}")
-    return async_wrapper
\ No newline at end of file
+            logger.exception("Exception in %s: %s", func.__name__, e)
+    return async_wrapper
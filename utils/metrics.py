@@ -0,0 +1,233 @@
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from utils.logger import logger
+from utils.tracing import annotate, span, traced
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+registry: List["Metric"] = []
+
+
+def format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def expose(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, description, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def expose(self) -> List[str]:
+        lines = super().expose()
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, callback: Optional[Callable[[], float]] = None) -> None:
+        super().__init__(name, description)
+        self.callback = callback
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def expose(self) -> List[str]:
+        lines = super().expose()
+        try:
+            value = self.callback() if self.callback else self.value
+        except Exception as e:
+            logger.error("Error reading gauge %s: %s", self.name, e)
+            return lines
+        lines.append(f"{self.name} {value}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(label_values)
+            if series is None:
+                series = self.values[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def expose(self) -> List[str]:
+        lines = super().expose()
+        for label_values, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = format_labels(self.labels, label_values, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+def timed(histogram: Histogram, *label_values):
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, *label_values)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *label_values)
+        return wrapper
+    return decorator
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in registry:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+HANDLER_DURATION = Histogram("bot_handler_duration_seconds", "Telegram handler latency", ["handler"])
+CLICKUP_DURATION = Histogram("clickup_request_duration_seconds", "ClickUp API call latency", ["endpoint"])
+CLICKUP_CACHE = Counter("clickup_cache_requests_total", "ClickUp response cache lookups", ["function", "result"])
+RENDER_CACHE = Counter("report_render_cache_total", "Rendered report lookups by sprint data version", ["report", "result"])
+PREFETCH_RESULTS = Counter("clickup_prefetch_total", "Speculative ClickUp fetches and their outcome", ["function", "result"])
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "SQLite query duration including lock wait", ["query"])
+DB_LOCK_WAIT = Histogram("db_lock_wait_seconds", "Time spent waiting for db_lock", ["query"])
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between scheduled and actual event loop wake-ups",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+current_query: ContextVar[str] = ContextVar("current_query", default="other")
+
+
+def timed_handler(func):
+    return traced(f"handler.{func.__name__}")(timed(HANDLER_DURATION, func.__name__)(func))
+
+
+def timed_query(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = current_query.set(func.__name__)
+        started = time.perf_counter()
+        try:
+            with span(f"db.{func.__name__}"):
+                return func(*args, **kwargs)
+        finally:
+            DB_QUERY_DURATION.observe(time.perf_counter() - started, func.__name__)
+            current_query.reset(token)
+    return wrapper
+
+
+class TimedLock:
+    def __init__(self, lock) -> None:
+        self.lock = lock
+
+    def __enter__(self):
+        started = time.perf_counter()
+        self.lock.acquire()
+        waited = time.perf_counter() - started
+        DB_LOCK_WAIT.observe(waited, current_query.get())
+        annotate(lock_wait_ms=round(waited * 1000, 2))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.lock.release()
+
+
+async def monitor_event_loop_lag(interval: float = 1.0) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - interval))
+
+
+async def handle_metrics_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status, body = "200 OK", render_metrics().encode()
+        else:
+            status, body = "404 Not Found", b"not found\n"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.error("Metrics request error: %s", e)
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    server = await asyncio.start_server(handle_metrics_request, host, port)
+    logger.info(f"Metrics endpoint: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,226 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+from utils.config import TRACE_BUFFER_SIZE, TRACE_SLOWEST_KEEP, TRACE_EXPORT_FILE
+from utils.logger import logger
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end", "attributes", "token")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[int], attributes: Dict[str, Any]) -> None:
+        self.trace = trace
+        self.span_id = next(span_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.token = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        current_span.reset(self.token)
+        if self.parent_id is None:
+            finish_trace(self.trace)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "offset_ms": round((self.start - self.trace.root.start) * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+            "attributes": self.attributes
+        }
+
+
+class NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+class Trace:
+    __slots__ = ("trace_id", "started_at", "root", "spans")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.trace_id = os.urandom(8).hex()
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self.root = Span(self, name, None, attributes)
+        self.spans.append(self.root)
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 2),
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+span_ids = itertools.count(1)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+NOOP_SPAN = NoopSpan()
+MAX_SPANS_PER_TRACE = 500
+
+recent_traces: Deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+slowest_traces: List[tuple] = []
+slowest_lock = threading.Lock()
+export_queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+exporter_thread: Optional[threading.Thread] = None
+
+
+def start_trace(name: str, **attributes) -> Span:
+    parent = current_span.get()
+    if parent is not None:
+        attributes["parent_trace"] = parent.trace.trace_id
+    return Trace(name, attributes).root
+
+
+def span(name: str, **attributes):
+    parent = current_span.get()
+    if parent is None or len(parent.trace.spans) >= MAX_SPANS_PER_TRACE:
+        return NOOP_SPAN
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    parent.trace.spans.append(child)
+    return child
+
+
+def annotate(**attributes) -> None:
+    active = current_span.get()
+    if active is not None:
+        active.attributes.update(attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    active = current_span.get()
+    return active.trace.trace_id if active is not None else None
+
+
+def traced(name: str):
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def finish_trace(trace: Trace) -> None:
+    recent_traces.append(trace)
+
+    with slowest_lock:
+        entry = (trace.duration, trace.trace_id, trace)
+        if len(slowest_traces) < TRACE_SLOWEST_KEEP:
+            heapq.heappush(slowest_traces, entry)
+        elif entry[0] > slowest_traces[0][0]:
+            heapq.heapreplace(slowest_traces, entry)
+
+    if TRACE_EXPORT_FILE:
+        ensure_exporter()
+        export_queue.put(json.dumps(trace.to_dict(), ensure_ascii=False, default=str))
+
+
+def ensure_exporter() -> None:
+    global exporter_thread
+    if exporter_thread is None:
+        exporter_thread = threading.Thread(target=export_traces, name="trace-exporter", daemon=True)
+        exporter_thread.start()
+
+
+def export_traces() -> None:
+    while True:
+        line = export_queue.get()
+        if line is None:
+            return
+        try:
+            with open(TRACE_EXPORT_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                while not export_queue.empty():
+                    line = export_queue.get_nowait()
+                    if line is None:
+                        return
+                    f.write(line + "\n")
+        except OSError as e:
+            logger.error("Error exporting traces: %s", e)
+
+
+def get_slowest_traces(limit: int = TRACE_SLOWEST_KEEP) -> List[Trace]:
+    with slowest_lock:
+        return [entry[2] for entry in sorted(slowest_traces, reverse=True)[:limit]]
+
+
+def find_trace(trace_id: str) -> Optional[Trace]:
+    for trace in reversed(recent_traces):
+        if trace.trace_id.startswith(trace_id):
+            return trace
+    with slowest_lock:
+        for _, _, trace in slowest_traces:
+            if trace.trace_id.startswith(trace_id):
+                return trace
+    return None
+
+
+def describe_trace(trace: Trace) -> str:
+    attributes = " ".join(f"{key}={value}" for key, value in trace.root.attributes.items())
+    return f"{trace.duration * 1000:8.1f} ms  {trace.trace_id}  {trace.root.name} {attributes}"
+
+
+def render_trace_tree(trace: Trace) -> List[str]:
+    children: Dict[Optional[int], List[Span]] = {}
+    for item in list(trace.spans):
+        children.setdefault(item.parent_id, []).append(item)
+
+    lines = [describe_trace(trace)]
+    stack = [(child, 1) for child in reversed(children.get(trace.root.span_id, []))]
+    while stack:
+        item, depth = stack.pop()
+        attributes = " ".join(f"{key}={value}" for key, value in item.attributes.items())
+        offset = (item.start - trace.root.start) * 1000
+        lines.append(f"{'  ' * depth}+{offset:.0f} {item.name} {item.duration * 1000:.1f} ms {attributes}".rstrip())
+        stack.extend((child, depth + 1) for child in reversed(children.get(item.span_id, [])))
+    return lines